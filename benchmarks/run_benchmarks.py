@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite - Stage timings and peak memory for every analysis entry point
+Generates seeded synthetic data at each requested size, then times the
+load, aggregate, plot and export stages of BorderKillingsAnalyzer,
+generate_visualizations.py and generate_model_data.py. Results are written
+as JSON so two runs can be diffed or compared with --compare
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.synthetic import (make_workbook_frame, write_incidents, write_workbook,
+                                  yearly_stats)
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+DEFAULT_OUTPUT = PROJECT_ROOT / 'benchmarks' / 'results.json'
+# Past these sizes the stage is skipped: writing the .xlsx / a single-file Plotly map is impractical
+DEFAULT_MAX_EXCEL_ROWS = 100000
+DEFAULT_MAX_MAP_POINTS = 100000
+
+
+def measure(func, repeat=1, setup=None, memory=True):
+    """Best-of-`repeat` wall time and the traced peak allocation of one call
+
+    `setup` runs before every call and is excluded from both numbers. The
+    peak covers this process only (not render worker processes).
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        timings.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                func()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return min(timings), peak_mb
+
+
+class BenchmarkRun:
+    """Collects one record per (size, stage)"""
+
+    def __init__(self, repeat=1, memory=True):
+        self.repeat = repeat
+        self.memory = memory
+        self.records = []
+
+    def stage(self, size, name, func, setup=None):
+        try:
+            seconds, peak_mb = measure(func, self.repeat, setup, self.memory)
+            record = {'size': size, 'stage': name, 'status': 'ok',
+                      'seconds': round(seconds, 6),
+                      'peak_mb': None if peak_mb is None else round(peak_mb, 3)}
+        except Exception as e:
+            record = {'size': size, 'stage': name, 'status': f'error: {type(e).__name__}: {e}',
+                      'seconds': None, 'peak_mb': None}
+        self.records.append(record)
+        self._report(record)
+
+    def skip(self, size, name, reason):
+        record = {'size': size, 'stage': name, 'status': f'skipped: {reason}',
+                  'seconds': None, 'peak_mb': None}
+        self.records.append(record)
+        self._report(record)
+
+    @staticmethod
+    def _report(record):
+        if record['status'] == 'ok':
+            memory = '' if record['peak_mb'] is None else f"{record['peak_mb']:>10.1f} MB"
+            print(f"{record['size']:>10,} {record['stage']:<28} {record['seconds']:>10.4f} s {memory}")
+        else:
+            print(f"{record['size']:>10,} {record['stage']:<28} {record['status']}")
+
+
+def bench_analyzer(run, size, frame, workdir, max_excel_rows):
+    """Workbook load (cold parse and warm cache), aggregation and chart rendering"""
+    from src.analysis.border_killings_analysis import BorderKillingsAnalyzer
+    from src.analysis.rendering import render_charts
+
+    workbook = workdir / 'border-inc.xlsx'
+    cache_dir = workdir / 'ingest_cache'
+    if size <= max_excel_rows and write_workbook(frame, workbook):
+        analyzer = BorderKillingsAnalyzer(workbook, cache_dir=cache_dir)
+        run.stage(size, 'analyzer.load_cold', analyzer.load_data,
+                  setup=lambda: shutil.rmtree(cache_dir, ignore_errors=True))
+        run.stage(size, 'analyzer.load_warm', analyzer.load_data)
+    else:
+        run.skip(size, 'analyzer.load_cold', f'more than {max_excel_rows} rows')
+        run.skip(size, 'analyzer.load_warm', f'more than {max_excel_rows} rows')
+
+    # Result caching off: every run must recompute rather than replay a hit
+    analyzer = BorderKillingsAnalyzer(workbook, cache_size=0)
+
+    def reset():
+        analyzer.data_cleaned = frame
+        analyzer._aggregates = None
+
+    def aggregate():
+        analyzer.analyze_by_ruling_party_india(plot=False)
+        analyzer.analyze_by_ruling_party_bangladesh(plot=False)
+        analyzer.calculate_average_killings()
+
+    run.stage(size, 'analyzer.aggregate', aggregate, setup=reset)
+    plots_dir = workdir / 'plots'
+    run.stage(size, 'analyzer.plot',
+              lambda: render_charts(analyzer.chart_specs(), plots_dir, skip_unchanged=False))
+
+
+def bench_visualizations(run, size, frame, workdir, seed, max_map_points):
+    """Incident streaming load, tile export, Plotly map and trend export"""
+    from src.analysis.generate_visualizations import load_locations, write_map, write_trend
+    from src.analysis.spatial_tiles import write_tiles
+
+    incidents_path = write_incidents(size, workdir / 'incidents.jsonl', seed)
+    docs_dir = workdir / 'docs'
+    loaded = {}
+
+    def load():
+        loaded['data'] = load_locations(incidents_path)
+
+    run.stage(size, 'visualizations.load', load)
+    incidents = loaded['data']['incidents']
+    run.stage(size, 'visualizations.tiles', lambda: write_tiles(incidents, docs_dir))
+    if size <= max_map_points:
+        run.stage(size, 'visualizations.map', lambda: write_map({'incidents': incidents}, docs_dir))
+    else:
+        run.skip(size, 'visualizations.map', f'more than {max_map_points} points')
+    stats = yearly_stats(frame)
+    run.stage(size, 'visualizations.trend', lambda: write_trend({'yearly_stats': stats}, docs_dir))
+
+
+def bench_models(run, size, frame, workdir):
+    """Holdout model scoring, JSON export and the baseline backtest
+
+    The yearly series has one point per year whatever the row count, so
+    these stages measure per-row aggregation plus a fixed modelling cost.
+    """
+    import generate_model_data
+    from src.analysis.backtesting import run_backtest
+
+    forecast_cache = workdir / 'model_forecasts'
+    result = {}
+
+    def performance():
+        series = frame.groupby('Years')['Killed'].sum().sort_index().astype(float)
+        result['performance'] = generate_model_data.compute_model_performance(
+            cache_dir=forecast_cache, series=series)
+        result['series'] = series
+
+    run.stage(size, 'models.fit', performance,
+              setup=lambda: shutil.rmtree(forecast_cache, ignore_errors=True))
+    run.stage(size, 'models.export',
+              lambda: generate_model_data.save_data(workdir / 'model_comparison_data.json',
+                                                    result['performance']))
+    run.stage(size, 'models.backtest',
+              lambda: run_backtest(result['series'], include_statsmodels=False))
+
+
+def environment():
+    """Versions and machine details stored next to the results"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=PROJECT_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+    }
+
+
+def compare(current, baseline_path):
+    """Print the time and memory ratio of every stage against a previous run"""
+    with open(baseline_path, 'r') as f:
+        baseline = {(r['size'], r['stage']): r for r in json.load(f)['results']}
+
+    print(f"\n=== COMPARISON WITH {baseline_path} ===")
+    for record in current:
+        old = baseline.get((record['size'], record['stage']))
+        if not old or record['seconds'] is None or not old['seconds']:
+            continue
+        ratio = record['seconds'] / old['seconds']
+        line = f"{record['size']:>10,} {record['stage']:<28} time x{ratio:.2f}"
+        if record['peak_mb'] is not None and old.get('peak_mb'):
+            line += f"   memory x{record['peak_mb'] / old['peak_mb']:.2f}"
+        print(line)
+
+
+SUITES = ('analyzer', 'visualizations', 'models')
+
+
+def main(argv=None):
+    """Run the benchmark suite"""
+    parser = argparse.ArgumentParser(description='Benchmark every analysis entry point on synthetic data')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='Row/incident counts to benchmark (e.g. 100 ... 10000000)')
+    parser.add_argument('--suites', nargs='+', choices=SUITES, default=list(SUITES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help='Timed runs per stage (best is kept)')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc peak-memory run')
+    parser.add_argument('--max-excel-rows', type=int, default=DEFAULT_MAX_EXCEL_ROWS)
+    parser.add_argument('--max-map-points', type=int, default=DEFAULT_MAX_MAP_POINTS)
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT), help='Results JSON file')
+    parser.add_argument('--compare', help='Previous results JSON to compare against')
+    args = parser.parse_args(argv)
+
+    run = BenchmarkRun(repeat=args.repeat, memory=not args.no_memory)
+    print(f"{'size':>10} {'stage':<28} {'time':>12} {'peak':>13}")
+    for size in args.sizes:
+        frame = make_workbook_frame(size, args.seed)
+        with tempfile.TemporaryDirectory(prefix='bk-bench-') as tmp:
+            workdir = Path(tmp)
+            if 'analyzer' in args.suites:
+                bench_analyzer(run, size, frame, workdir, args.max_excel_rows)
+            if 'visualizations' in args.suites:
+                bench_visualizations(run, size, frame, workdir, args.seed, args.max_map_points)
+            if 'models' in args.suites:
+                bench_models(run, size, frame, workdir)
+
+    results = {
+        'environment': environment(),
+        'config': {'sizes': args.sizes, 'suites': args.suites, 'seed': args.seed,
+                   'repeat': args.repeat, 'memory': not args.no_memory},
+        'results': run.records,
+    }
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        compare(run.records, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Synthetic Data - Seeded, schema-faithful stand-ins for the project datasets
+Generates workbook rows (Years, Killed, Injured, ..., Rulling_Party,
+Rulling_Party_India) and incident locations along the border at any scale,
+so benchmarks can go far beyond the ~53 yearly rows shipped in data/
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+FIRST_YEAR = 1972
+LAST_YEAR = 2024
+BANGLADESH_PARTIES = ('BAL', 'BNP', 'others')
+INDIA_PARTIES = ('Congress', 'BJP', 'others')
+# Column names as they appear in data/border-inc.xlsx (trailing non-breaking spaces included)
+COUNT_COLUMNS = ('Killed', 'Injured\xa0', 'Abducted', 'Missing\xa0', 'Rape\xa0',
+                 'Looting\xa0', 'Push\xa0In\xa0', 'Other\xa0')
+# Rough bounding box of the India-Bangladesh border
+LAT_RANGE = (21.6, 26.6)
+LON_RANGE = (88.0, 92.7)
+EXCEL_MAX_ROWS = 1048575  # one row is the header
+JSONL_CHUNK_ROWS = 100000
+
+
+def _party_by_year(rng):
+    """One ruling party per year and country, held for multi-year terms"""
+    years = np.arange(FIRST_YEAR, LAST_YEAR + 1)
+    terms = {}
+    for column, parties in (('Rulling_Party', BANGLADESH_PARTIES), ('Rulling_Party_India', INDIA_PARTIES)):
+        labels, year = [], FIRST_YEAR
+        while year <= LAST_YEAR:
+            length = int(rng.integers(1, 8))
+            labels.extend([parties[int(rng.integers(len(parties)))]] * length)
+            year += length
+        terms[column] = np.array(labels[:len(years)], dtype=object)
+    return years, terms
+
+
+def make_workbook_frame(n_rows, seed=0):
+    """Workbook-shaped frame with `n_rows` rows spread over the real year range"""
+    rng = np.random.default_rng(seed)
+    years, terms = _party_by_year(rng)
+    year_index = np.sort(rng.integers(0, len(years), n_rows))
+    frame = pd.DataFrame({'Years': years[year_index]})
+    for column in COUNT_COLUMNS:
+        # Killed is always reported; the other counts are mostly missing, as in the workbook
+        values = rng.poisson(25 if column == 'Killed' else 5, n_rows)
+        if column == 'Killed':
+            frame[column] = values.astype(np.int64)
+        else:
+            frame[column] = np.where(rng.random(n_rows) < 0.3, values, np.nan)
+    frame['Total'] = frame[list(COUNT_COLUMNS)].sum(axis=1).astype(np.int64)
+    for column, labels in terms.items():
+        frame[column] = labels[year_index]
+    return frame
+
+
+def write_workbook(frame, path):
+    """Write the frame as an .xlsx workbook; returns False past Excel's row limit"""
+    if len(frame) > EXCEL_MAX_ROWS:
+        return False
+    frame.to_excel(path, index=False)
+    return True
+
+
+def _incident_chunk(rng, start, n):
+    lat = rng.uniform(*LAT_RANGE, n)
+    lon = rng.uniform(*LON_RANGE, n)
+    days = rng.integers(np.datetime64(f'{FIRST_YEAR}-01-01').astype(np.int64),
+                        np.datetime64(f'{LAST_YEAR}-12-31').astype(np.int64), n)
+    dates = np.datetime_as_string(days.astype('datetime64[D]'))
+    site = rng.integers(0, 500, n)
+    for i in range(n):
+        yield {
+            'name': f'Incident {start + i}',
+            'date': str(dates[i]),
+            'location': f'Border site {site[i]}',
+            'lat': round(float(lat[i]), 4),
+            'lon': round(float(lon[i]), 4),
+            'description': 'Synthetic incident.',
+        }
+
+
+def write_incidents(n, path, seed=0):
+    """Stream `n` incidents to a .jsonl file in chunks (never all in memory)"""
+    rng = np.random.default_rng(seed)
+    with open(path, 'w') as f:
+        for start in range(0, n, JSONL_CHUNK_ROWS):
+            count = min(JSONL_CHUNK_ROWS, n - start)
+            f.write(''.join(json.dumps(inc) + '\n' for inc in _incident_chunk(rng, start, count)))
+    return path
+
+
+def yearly_stats(frame):
+    """`yearly_stats` entries like the ones in border_killing_locations.json"""
+    totals = frame.groupby('Years')['Killed'].sum()
+    return [{'year': int(year), 'killed': int(killed)} for year, killed in totals.items()]
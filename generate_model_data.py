@@ -1,40 +1,154 @@
 #!/usr/bin/env python3
 """
 Generate model comparison data for visualization
-Extracts model performance metrics and creates JSON data for charts
+Fits every forecasting model on the yearly series, scores them on the notebook's
+95/5 holdout and creates JSON data for charts
 """
 
+import argparse
+import hashlib
 import json
+import sys
+import time
 from pathlib import Path
 
-# Model performance data from the notebook analysis
-model_performance = {
-    'Naive': {'MAE': 5.50, 'MSE': 50.50, 'RMSE': 7.11, 'MAPE': 20.63, 'R²': -1.02},
-    'ARIMA': {'MAE': 12.90, 'MSE': 179.70, 'RMSE': 13.41, 'MAPE': 68.25, 'R²': -6.29},
-    'Moving Avg': {'MAE': 13.33, 'MSE': 202.44, 'RMSE': 14.23, 'MAPE': 71.77, 'R²': -7.21},
-    'Average': {'MAE': 16.96, 'MSE': 312.28, 'RMSE': 17.67, 'MAPE': 89.91, 'R²': -11.66},
-    'ARIMA_alt': {'MAE': 17.38, 'MSE': 323.20, 'RMSE': 17.98, 'MAPE': 91.48, 'R²': -12.10},
-    'Auto-ARIMA': {'MAE': 19.05, 'MSE': 396.30, 'RMSE': 19.91, 'MAPE': 101.15, 'R²': -15.07},
-    'SES': {'MAE': 21.76, 'MSE': 498.03, 'RMSE': 22.32, 'MAPE': 113.92, 'R²': -19.19},
-    'Holt': {'MAE': 23.23, 'MSE': 560.33, 'RMSE': 23.67, 'MAPE': 120.85, 'R²': -21.72},
-    'Holt-Winters': {'MAE': 19.83, 'MSE': 583.49, 'RMSE': 24.16, 'MAPE': 113.30, 'R²': -22.65},
-    'SARIMA': {'MAE': 25.84, 'MSE': 710.57, 'RMSE': 26.66, 'MAPE': 135.63, 'R²': -27.81},
-    'LSTM': {'MAE': 27.26, 'MSE': 766.64, 'RMSE': 27.69, 'MAPE': 141.33, 'R²': -30.08},
-    'Exponential Trend': {'MAE': 38.71, 'MSE': 1512.86, 'RMSE': 38.90, 'MAPE': 197.49, 'R²': -60.33},
-    'Linear Trend': {'MAE': 42.75, 'MSE': 1845.58, 'RMSE': 42.96, 'MAPE': 218.18, 'R²': -73.82}
-}
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.analysis.backtesting import (METRIC_NAMES, STATSMODELS_MODELS, baseline_forecasts,
+                                      fit_forecast, load_yearly_series, score_forecasts)
+from src.analysis.json_export import prune_hashed_siblings, typed_column, write_json_stream
+from src.analysis.lstm_forecast import torch_available
+from src.analysis.model_search import DEFAULT_TIMEOUT, describe, tune_models
+
+DEFAULT_DATA_PATH = PROJECT_ROOT / 'data' / 'border-inc.xlsx'
+FORECAST_CACHE_DIR = PROJECT_ROOT / '.cache' / 'model_forecasts'
+TRAIN_FRACTION = 0.95
+# Bump when fitting code changes so cached forecasts are not reused
+FORECAST_CACHE_VERSION = 1
 
 # Categorize models
-arima_models = ['ARIMA', 'ARIMA_alt', 'Auto-ARIMA', 'SARIMA']
-other_models = [m for m in model_performance.keys() if m not in arima_models]
+arima_models = ['ARIMA', 'ARIMA_alt', 'Auto-ARIMA', 'SARIMA', 'Auto-SARIMA']
+top_other_models = ['Naive', 'Moving Avg', 'Average', 'SES', 'Holt', 'Auto-ETS', 'LSTM']
+CATEGORY_COLORS = {'arima': '#667eea', 'other': '#764ba2'}
+# Models only fitted on request, with the option that adds them; the dashboard
+# names the ones missing from a run instead of dropping them silently
+OPTIONAL_MODELS = {'Auto-ARIMA': '--tune', 'Auto-SARIMA': '--tune', 'Auto-ETS': '--tune',
+                   'LSTM': '--lstm'}
+COMPACT_FORMAT = 'model-comparison/compact-v1'
+# Reported next to the accuracy metrics of each model
+FIT_SECONDS = 'Fit_Seconds'
+
+def split_series(series, train_fraction=TRAIN_FRACTION):
+    """Train/test split used by the notebook (first 95% of years for training)"""
+    train_size = int(len(series) * train_fraction)
+    return series.iloc[:train_size], series.iloc[train_size:]
+
+def _forecast_cache_key(name, kind, params, train, horizon):
+    """Hash of everything a fitted model's forecasts depend on"""
+    payload = json.dumps({
+        'model': name,
+        'kind': kind,
+        'params': params,
+        'train': np.asarray(train, dtype=np.float64).tolist(),
+        'horizon': horizon,
+        'version': FORECAST_CACHE_VERSION,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def cached_fit_forecast(name, kind, params, train, horizon, cache_dir=FORECAST_CACHE_DIR):
+    """Forecasts of one fitted model, reused while its data and hyperparameters match
+
+    Returns (forecast, fit seconds, cache hit); a hit reports the fit time
+    recorded when the forecasts were computed.
+    """
+    cache_path = Path(cache_dir) / f'{_forecast_cache_key(name, kind, params, train, horizon)}.json'
+    try:
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+        return np.asarray(cached['forecast'], dtype=np.float64), float(cached['fit_seconds']), True
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    started = time.perf_counter()
+    forecast = fit_forecast(kind, params, np.asarray(train, dtype=np.float64), horizon)
+    fit_seconds = time.perf_counter() - started
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, 'w') as f:
+            json.dump({'model': name, 'forecast': [None if np.isnan(v) else float(v) for v in forecast],
+                       'fit_seconds': round(fit_seconds, 3)}, f)
+    except OSError as e:
+        print(f"Warning: could not cache forecasts for {name}: {e}")
+    return forecast, round(fit_seconds, 3), False
+
+def compute_forecasts(series, cache_dir=FORECAST_CACHE_DIR, extra_models=None):
+    """Holdout forecasts of every model as {name: array}, the actual values and {name: fit seconds}
+
+    Baselines are computed together in one batched pass, whose time each
+    of them reports; only the fitted statsmodels models go through the
+    per-model cache. extra_models (e.g. tuned winners from model_search.py)
+    are fitted like STATSMODELS_MODELS.
+    """
+    train, test = split_series(series)
+    y = series.to_numpy(dtype=np.float64)
+    horizon = len(test)
 
-def generate_chart_data():
+    started = time.perf_counter()
+    forecasts = {name: values[0] for name, values in
+                 baseline_forecasts(y, [len(train)], horizon).items()}
+    baseline_seconds = round(time.perf_counter() - started, 3)
+    fit_seconds = dict.fromkeys(forecasts, baseline_seconds)
+
+    refitted = []
+    for name, (kind, params) in {**STATSMODELS_MODELS, **(extra_models or {})}.items():
+        forecast, seconds, hit = cached_fit_forecast(name, kind, params, train.to_numpy(), horizon, cache_dir)
+        forecasts[name] = forecast
+        fit_seconds[name] = seconds
+        if not hit:
+            refitted.append(f"{name} ({seconds:.2f}s)")
+    if refitted:
+        print(f"Refitted models: {', '.join(refitted)}")
+    return forecasts, test.to_numpy(dtype=np.float64), fit_seconds
+
+def compute_model_performance(data_path=DEFAULT_DATA_PATH, cache_dir=FORECAST_CACHE_DIR, series=None,
+                              extra_models=None):
+    """Score every model on the holdout with one vectorized metrics pass
+
+    Each model's metrics are followed by its Fit_Seconds.
+    """
+    if series is None:
+        series = load_yearly_series(data_path)
+    forecasts, actual, fit_seconds = compute_forecasts(series, cache_dir, extra_models)
+    names = list(forecasts)
+    metrics = score_forecasts(np.stack([forecasts[m] for m in names]), actual)
+    return {
+        name: {**{metric: round(float(value), 2) for metric, value in zip(METRIC_NAMES, row)},
+               FIT_SECONDS: fit_seconds[name]}
+        for name, row in zip(names, metrics)
+        if not np.isnan(row).all()
+    }
+
+def not_computed(model_performance):
+    """{name: option that adds it} of the optional models missing from model_performance"""
+    return {m: option for m, option in OPTIONAL_MODELS.items() if m not in model_performance}
+
+def generate_chart_data(model_performance=None):
     """Generate data for Chart.js visualizations"""
-    
+    if model_performance is None:
+        model_performance = compute_model_performance()
+
+    # Models that could not be fitted here (e.g. missing optional dependencies) are left out
+    arima = [m for m in arima_models if m in model_performance]
+    top_others = [m for m in top_other_models if m in model_performance]
+
     # Sort models by RMSE for better visualization
     sorted_models = sorted(model_performance.items(), key=lambda x: x[1]['RMSE'])
     model_names = [m[0] for m in sorted_models]
-    
+
     # Prepare data for different chart types
     chart_data = {
         'rmse_comparison': {
@@ -49,14 +163,14 @@ def generate_chart_data():
         },
         'arima_vs_others': {
             'arima_models': {
-                'labels': arima_models,
-                'rmse': [model_performance[m]['RMSE'] for m in arima_models],
-                'mae': [model_performance[m]['MAE'] for m in arima_models]
+                'labels': arima,
+                'rmse': [model_performance[m]['RMSE'] for m in arima],
+                'mae': [model_performance[m]['MAE'] for m in arima]
             },
             'top_others': {
-                'labels': ['Naive', 'Moving Avg', 'Average', 'SES', 'Holt', 'LSTM'],
-                'rmse': [model_performance[m]['RMSE'] for m in ['Naive', 'Moving Avg', 'Average', 'SES', 'Holt', 'LSTM']],
-                'mae': [model_performance[m]['MAE'] for m in ['Naive', 'Moving Avg', 'Average', 'SES', 'Holt', 'LSTM']]
+                'labels': top_others,
+                'rmse': [model_performance[m]['RMSE'] for m in top_others],
+                'mae': [model_performance[m]['MAE'] for m in top_others]
             }
         },
         'performance_metrics': {
@@ -67,29 +181,121 @@ def generate_chart_data():
                 'mape': [model_performance[m]['MAPE'] for m in model_names[:5]]
             }
         },
-        'full_data': model_performance
+        'full_data': model_performance,
+        'not_computed': not_computed(model_performance)
     }
-    
+
     return chart_data
 
-def save_data():
+def generate_compact_data(model_performance=None):
+    """Deduplicated, column-oriented version of the chart data
+
+    Every model name appears once in a shared label table (sorted by RMSE);
+    metric columns are typed arrays aligned with it and chart groupings are
+    lists of label indices. index.html expands it back into the chart layout.
+    """
+    if model_performance is None:
+        model_performance = compute_model_performance()
+
+    model_names = [m for m, _ in sorted(model_performance.items(), key=lambda x: x[1]['RMSE'])]
+    position = {m: i for i, m in enumerate(model_names)}
+    return {
+        'format': COMPACT_FORMAT,
+        'labels': model_names,
+        'metrics': {metric: typed_column([model_performance[m].get(metric, np.nan) for m in model_names])
+                    for metric in METRIC_NAMES + (FIT_SECONDS,)},
+        'groups': {
+            'arima': [position[m] for m in arima_models if m in position],
+            'top_others': [position[m] for m in top_other_models if m in position],
+        },
+        'top_n': 5,
+        'colors': CATEGORY_COLORS,
+        'not_computed': not_computed(model_performance),
+    }
+
+DEFAULT_OUTPUT_PATH = Path(__file__).parent / 'model_comparison_data.json'
+COMPACT_MANIFEST_NAME = 'model_comparison_manifest.json'
+
+def save_data(output_path=DEFAULT_OUTPUT_PATH, model_performance=None):
     """Save chart data to JSON file"""
-    chart_data = generate_chart_data()
-    output_path = Path(__file__).parent / 'model_comparison_data.json'
-    
+    chart_data = generate_chart_data(model_performance)
+
     with open(output_path, 'w') as f:
         json.dump(chart_data, f, indent=2)
-    
+
     print(f"Model comparison data saved to {output_path}")
     return chart_data
 
-if __name__ == "__main__":
-    data = save_data()
+def save_compact_data(output_path=DEFAULT_OUTPUT_PATH, model_performance=None,
+                      gzip_copy=True, brotli_copy=False, hashed_name=True):
+    """Stream the compact layout to disk and point the manifest at it
+
+    With hashed_name the data file gets a content-hash name that can be
+    served with a far-future cache lifetime; only the tiny manifest next to
+    it needs revalidating.
+    """
+    compact = generate_compact_data(model_performance)
+    data_path, sha256 = write_json_stream(compact, output_path, gzip_copy=gzip_copy,
+                                          brotli_copy=brotli_copy, hashed_name=hashed_name)
+    if hashed_name:
+        prune_hashed_siblings(data_path)
+
+    manifest_path = Path(output_path).parent / COMPACT_MANIFEST_NAME
+    with open(manifest_path, 'w') as f:
+        json.dump({'format': COMPACT_FORMAT, 'data': data_path.name, 'sha256': sha256}, f, indent=2)
+
+    print(f"Compact model comparison data saved to {data_path}")
+    return compact
+
+def main(argv=None):
+    """Regenerate the dashboard data and print the model ranking"""
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description='Generate model comparison data for index.html')
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT_PATH), help='Path of the JSON output')
+    parser.add_argument('--compact', action='store_true',
+                        help='Also write the compact, content-hashed layout and its manifest')
+    parser.add_argument('--brotli', action='store_true',
+                        help='Also write a .br sibling of the compact file (needs the brotli package)')
+    parser.add_argument('--no-gzip', action='store_true', help='Skip the .gz sibling of the compact file')
+    parser.add_argument('--tune', action='store_true',
+                        help='Search ARIMA/SARIMA/ETS hyperparameters and add the winners as Auto-* models')
+    parser.add_argument('--tune-samples', type=int, default=None,
+                        help='Random search over N candidates instead of the full grid')
+    parser.add_argument('--tune-timeout', type=float, default=DEFAULT_TIMEOUT, help='Seconds allowed per fit')
+    parser.add_argument('--lstm', action='store_true', help='Also fit the LSTM (needs PyTorch)')
+    args = parser.parse_args(argv)
+
+    series = load_yearly_series(DEFAULT_DATA_PATH)
+    extra_models = {}
+    if args.tune:
+        search = tune_models(series, TRAIN_FRACTION, strategy='random' if args.tune_samples else 'grid',
+                             n_samples=args.tune_samples, timeout=args.tune_timeout)
+        extra_models.update(search.auto_models())
+        for name, (kind, params) in extra_models.items():
+            print(f"{name}: {describe(kind, params)}")
+    if args.lstm:
+        if torch_available():
+            # One forward pass predicts the whole holdout
+            extra_models['LSTM'] = ('lstm', {'horizon': len(split_series(series)[1])})
+        else:
+            print("PyTorch not installed; skipping the LSTM")
+    model_performance = compute_model_performance(series=series, extra_models=extra_models)
+    data = save_data(Path(args.output), model_performance)
+    if args.compact:
+        save_compact_data(Path(args.output), model_performance,
+                          gzip_copy=not args.no_gzip, brotli_copy=args.brotli)
+
     print("\nModel Performance Summary:")
     print("=" * 60)
-    df = pd.DataFrame(model_performance).T
+    df = pd.DataFrame(data['full_data']).T
     df = df.sort_values('RMSE')
     print(df.to_string())
     print("\nTop 5 Models by RMSE:")
-    print(df.head(5)[['RMSE', 'MAE', 'MAPE']].to_string())
+    print(df.head(5)[['RMSE', 'MAE', 'MAPE', FIT_SECONDS]].to_string())
+    if data['not_computed']:
+        print("\nNot computed (left out of the dashboard): "
+              + ', '.join(f"{m} ({option})" for m, option in data['not_computed'].items()))
 
+if __name__ == "__main__":
+    main()
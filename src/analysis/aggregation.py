@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Grouped Aggregation Engine - One vectorized pass per grouping key
+Factorizes each categorical key once and computes sum, count and mean for
+every value column with np.bincount over integer codes; min/max are derived
+from the same codes on first request. ChunkedAggregates merges per-batch
+results so tables larger than memory can be aggregated in bounded batches
+"""
+
+import numpy as np
+import pandas as pd
+
+STATS = ('sum', 'count', 'mean', 'min', 'max')
+
+
+class GroupedAggregates:
+    """Sum/count/mean/min/max of value columns for several grouping keys"""
+
+    def __init__(self, frame, keys, values):
+        """Aggregate `values` columns of `frame` by each column in `keys`"""
+        self.keys = list(keys)
+        self.values = list(values)
+        self.n_rows = len(frame)
+        self._integer_values = [pd.api.types.is_integer_dtype(frame[v]) for v in self.values]
+
+        # Values are shared by every key, so convert them to float columns once
+        self._columns = [frame[v].to_numpy(dtype=np.float64, na_value=np.nan) for v in self.values]
+        self._results = {key: self._aggregate(frame[key]) for key in self.keys}
+
+    def _aggregate(self, key_series):
+        """Compute sum, count and mean of every column from one factorization"""
+        codes, labels = pd.factorize(key_series, sort=True)
+        valid = codes >= 0  # groupby drops missing keys, so do we
+        n_groups, n_values = len(labels), len(self.values)
+
+        # Rows per group is shared by every column without missing values
+        group_sizes = np.bincount(codes[valid], minlength=n_groups)
+        sums = np.empty((n_groups, n_values))
+        counts = np.empty((n_groups, n_values), dtype=np.int64)
+        for j, column in enumerate(self._columns):
+            present = valid & ~np.isnan(column)
+            if present.all():
+                sums[:, j] = np.bincount(codes, weights=column, minlength=n_groups)
+                counts[:, j] = group_sizes
+            else:
+                sums[:, j] = np.bincount(codes[present], weights=column[present], minlength=n_groups)
+                counts[:, j] = np.bincount(codes[present], minlength=n_groups)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+
+        return {
+            'labels': labels,
+            'codes': codes,
+            'group_sizes': group_sizes,
+            'sum': sums,
+            'count': counts,
+            'mean': means,
+        }
+
+    def _extremes(self, key):
+        """Compute min/max for a key on first use; most reports never need them"""
+        result = self._results[key]
+        if 'min' in result:
+            return
+        codes, group_sizes = result['codes'], result['group_sizes']
+        n_groups, n_values = len(result['labels']), len(self.values)
+        mins = np.full((n_groups, n_values), np.nan)
+        maxs = np.full((n_groups, n_values), np.nan)
+
+        valid_rows = np.flatnonzero(codes >= 0)
+        if len(valid_rows):
+            # Sort rows by group once, then reduce each contiguous run. Narrow
+            # codes let numpy use an O(n) radix sort for the stable argsort.
+            valid_codes = codes[valid_rows]
+            if n_groups <= np.iinfo(np.uint16).max:
+                valid_codes = valid_codes.astype(np.uint16)
+            order = valid_rows[np.argsort(valid_codes, kind='stable')]
+            starts = np.concatenate(([0], np.cumsum(group_sizes)[:-1]))
+            for j, column in enumerate(self._columns):
+                ordered = column[order]
+                missing = np.isnan(ordered)
+                mins[:, j] = np.minimum.reduceat(np.where(missing, np.inf, ordered), starts)
+                maxs[:, j] = np.maximum.reduceat(np.where(missing, -np.inf, ordered), starts)
+            empty = result['count'] == 0
+            mins[empty] = np.nan
+            maxs[empty] = np.nan
+        result['min'] = mins
+        result['max'] = maxs
+
+    def labels(self, key):
+        """Sorted group labels for a key"""
+        return self._results[key]['labels']
+
+    def stat(self, key, value, stat):
+        """Return one statistic of `value` grouped by `key` as a Series"""
+        if stat in ('min', 'max'):
+            self._extremes(key)
+        result = self._results[key]
+        j = self.values.index(value)
+        column = result[stat][:, j]
+        if stat in ('sum', 'min', 'max') and self._integer_values[j] and not np.isnan(column).any():
+            column = column.astype(np.int64)
+        return pd.Series(column, index=pd.Index(result['labels'], name=key), name=value)
+
+    def table(self, key, value):
+        """Return all statistics of `value` grouped by `key` as a DataFrame"""
+        return pd.DataFrame({s: self.stat(key, value, s) for s in STATS})
+
+
+class ChunkedAggregates(GroupedAggregates):
+    """GroupedAggregates combined from row batches that are never held together
+
+    Each batch is reduced on its own and the partial sum/count/min/max per
+    group are merged, which is associative, so batch size and order do not
+    affect the result. Sums of integral values (all counts in these sheets)
+    are exact in float64 up to 2**53 and therefore identical to the
+    in-memory path; other float sums may differ in the last bits.
+    """
+
+    def __init__(self, keys, values):
+        self.keys = list(keys)
+        self.values = list(values)
+        self.n_rows = 0
+        self._integer_values = [True] * len(self.values)
+        self._partials = {key: {} for key in self.keys}  # label -> [sum, count, min, max] arrays
+        self._results = None
+
+    @classmethod
+    def from_aggregates(cls, aggregates):
+        """Running aggregates that start from existing ones, e.g. to add() new rows
+
+        aggregates itself is left untouched.
+        """
+        chunked = cls(aggregates.keys, aggregates.values)
+        if isinstance(aggregates, ChunkedAggregates):
+            return chunked.merge(aggregates)
+        return chunked._fold_grouped(aggregates)
+
+    def add(self, frame):
+        """Fold one batch of rows into the running aggregates"""
+        if not len(frame):
+            return self
+        return self._fold_grouped(GroupedAggregates(frame, self.keys, self.values))
+
+    def _fold_grouped(self, batch):
+        """Fold the per-group results of an in-memory GroupedAggregates"""
+        self.n_rows += batch.n_rows
+        self._integer_values = [a and b for a, b in zip(self._integer_values, batch._integer_values)]
+        for key in self.keys:
+            batch._extremes(key)
+            result = batch._results[key]
+            for g, label in enumerate(result['labels']):
+                self._fold(key, label, (result['sum'][g], result['count'][g],
+                                        result['min'][g], result['max'][g]))
+        self._results = None
+        return self
+
+    def merge(self, other):
+        """Combine with another ChunkedAggregates over the same keys/values"""
+        self.n_rows += other.n_rows
+        self._integer_values = [a and b for a, b in zip(self._integer_values, other._integer_values)]
+        for key in self.keys:
+            for label, incoming in other._partials[key].items():
+                self._fold(key, label, incoming)
+        self._results = None
+        return self
+
+    def _fold(self, key, label, incoming):
+        """Associative combine of one group's (sum, count, min, max) arrays"""
+        current = self._partials[key].get(label)
+        if current is None:
+            self._partials[key][label] = [np.array(a, copy=True) for a in incoming]
+            return
+        current[0] += incoming[0]
+        current[1] += incoming[1]
+        current[2] = np.fmin(current[2], incoming[2])
+        current[3] = np.fmax(current[3], incoming[3])
+
+    def _finalize(self):
+        """Stack the partials into the sorted per-key layout GroupedAggregates uses"""
+        self._results = {}
+        n_values = len(self.values)
+        for key in self.keys:
+            partial = self._partials[key]
+            labels = pd.Index(list(partial))
+            order = labels.argsort()
+            labels = labels[order]
+            stacked = [partial[label] for label in labels]
+
+            def column(i, dtype=np.float64):
+                if not stacked:
+                    return np.empty((0, n_values), dtype=dtype)
+                return np.vstack([parts[i] for parts in stacked]).astype(dtype)
+
+            sums, counts = column(0), column(1, np.int64)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means = sums / counts
+            self._results[key] = {
+                'labels': labels.to_numpy(),
+                'sum': sums,
+                'count': counts,
+                'mean': means,
+                'min': column(2),
+                'max': column(3),
+            }
+
+    def _extremes(self, key):
+        """min/max are merged batch by batch, so nothing is left to compute"""
+
+    def labels(self, key):
+        if self._results is None:
+            self._finalize()
+        return super().labels(key)
+
+    def stat(self, key, value, stat):
+        if self._results is None:
+            self._finalize()
+        return super().stat(key, value, stat)
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Rolling-Origin Backtesting - Every forecasting model over every origin and horizon
+Cheap baselines are computed for all origins at once from a strided window
+matrix; statsmodels fits are fanned out over a process pool
+"""
+
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+BASELINE_MODELS = ('Naive', 'Average', 'Moving Avg', 'SES', 'Linear Trend', 'Exponential Trend')
+
+# name -> (kind, keyword arguments); kept as plain data so specs pickle cheaply
+STATSMODELS_MODELS = {
+    'Holt': ('ets', {'trend': 'add'}),
+    'Holt-Winters': ('ets', {'trend': 'add', 'seasonal': 'add', 'seasonal_periods': 12}),
+    'ARIMA': ('arima', {'order': (5, 1, 0)}),
+    'ARIMA_alt': ('arima', {'order': (2, 1, 2)}),
+    'SARIMA': ('arima', {'order': (1, 1, 1), 'seasonal_order': (1, 1, 1, 12)}),
+}
+
+MOVING_AVERAGE_WINDOW = 3
+SES_ALPHA_GRID = np.linspace(0.01, 0.99, 99)
+METRIC_NAMES = ('MAE', 'MSE', 'RMSE', 'MAPE', 'R²')
+
+
+def load_yearly_series(data_path=None):
+    """Yearly total killings indexed by year, read through the ingest cache"""
+    try:
+        from .ingest_cache import read_excel_cached
+    except ImportError:
+        from ingest_cache import read_excel_cached
+    if data_path is None:
+        data_path = Path(__file__).parent.parent.parent / "data" / "border-inc.xlsx"
+    frame = read_excel_cached(data_path)
+    return frame.groupby('Years')['Killed'].sum().sort_index().astype(float)
+
+
+def window_matrix(y, origins, window=None):
+    """Training windows ending just before each origin, one row per origin
+
+    With window=None every row holds the full history (expanding window),
+    left-padded with NaN; otherwise rows are the last `window` observations.
+    The result is a read-only strided view, so no per-origin copies are made.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    width = len(y) if window is None else window
+    padded = np.concatenate((np.full(width, np.nan), y))
+    views = sliding_window_view(padded, width)
+    # Row r of `views` ends at y[r - 1]; origin t needs the window ending at y[t - 1]
+    return views[np.asarray(origins)]
+
+
+def actual_matrix(y, origins, horizon):
+    """Observed values y[t], ..., y[t + horizon - 1] for each origin, NaN past the end"""
+    y = np.asarray(y, dtype=np.float64)
+    padded = np.concatenate((y, np.full(horizon, np.nan)))
+    return sliding_window_view(padded, horizon)[np.asarray(origins)]
+
+
+def _last_valid(windows):
+    """Last non-NaN value in every row (windows are NaN only on the left)"""
+    return windows[:, -1]
+
+
+def _trend_fit(windows):
+    """Per-row OLS intercept/slope over x = 0..width-1, ignoring NaN padding"""
+    x = np.arange(windows.shape[1], dtype=np.float64)
+    present = ~np.isnan(windows)
+    n = present.sum(axis=1)
+    xs = np.where(present, x, 0.0)
+    ys = np.where(present, windows, 0.0)
+    sx, sy = xs.sum(axis=1), ys.sum(axis=1)
+    sxx, sxy = (xs * xs).sum(axis=1), (xs * ys).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+        intercept = (sy - slope * sx) / n
+    return intercept, slope
+
+
+def _ses_grid(windows, alphas=SES_ALPHA_GRID):
+    """Simple exponential smoothing with alpha picked per row by one-step SSE
+
+    All rows and all candidate alphas are filtered together, so the loop is
+    over window positions only.
+    """
+    n_rows, width = windows.shape
+    level = np.full((len(alphas), n_rows), np.nan)
+    sse = np.zeros((len(alphas), n_rows))
+    a = alphas[:, None]
+    for j in range(width):
+        obs = windows[:, j]
+        has_obs = ~np.isnan(obs)
+        started = ~np.isnan(level)
+        error = np.where(started & has_obs, obs - level, 0.0)
+        sse += error * error
+        updated = np.where(started, level + a * error, obs)
+        level = np.where(has_obs, updated, level)
+    best = np.argmin(sse, axis=0)
+    return level[best, np.arange(n_rows)]
+
+
+def baseline_forecasts(y, origins, horizon, window=None):
+    """Forecasts of every baseline model, each an (n_origins, horizon) array"""
+    windows = window_matrix(y, origins, window)
+    steps = np.arange(1, horizon + 1)
+
+    def flat(values):
+        return np.repeat(values[:, None], horizon, axis=1)
+
+    forecasts = {
+        'Naive': flat(_last_valid(windows)),
+        'Average': flat(np.nanmean(windows, axis=1)),
+        'Moving Avg': flat(np.nanmean(windows[:, -MOVING_AVERAGE_WINDOW:], axis=1)),
+        'SES': flat(_ses_grid(windows)),
+    }
+
+    # Trend lines are fitted on x = 0..width-1; the next point is x = width
+    last_x = windows.shape[1] - 1
+    intercept, slope = _trend_fit(windows)
+    forecasts['Linear Trend'] = intercept[:, None] + slope[:, None] * (last_x + steps)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        log_windows = np.where(windows > 0, np.log(windows), np.nan)
+    invalid = np.any(windows <= 0, axis=1)  # log-linear fit is undefined there
+    log_intercept, log_slope = _trend_fit(log_windows)
+    exp_trend = np.exp(log_intercept[:, None] + log_slope[:, None] * (last_x + steps))
+    exp_trend[invalid] = np.nan
+    forecasts['Exponential Trend'] = exp_trend
+    return forecasts
+
+
+def fit_model(kind, params, train):
+    """Fitted model on `train` with a statsmodels-style forecast(steps) (raises if the fit fails)
+
+    kind is 'ets' or 'arima' (statsmodels) or 'lstm' (lstm_forecast.py, needs PyTorch).
+    """
+    if kind == 'ets':
+        from statsmodels.tsa.holtwinters import ExponentialSmoothing
+        return ExponentialSmoothing(train, **params).fit()
+    if kind == 'arima':
+        from statsmodels.tsa.arima.model import ARIMA
+        return ARIMA(train, **params).fit()
+    if kind == 'lstm':
+        try:
+            from .lstm_forecast import LSTMForecaster
+        except ImportError:
+            from lstm_forecast import LSTMForecaster
+        return LSTMForecaster(**params).fit(train)
+    raise ValueError(f"Unknown model kind: {kind}")
+
+
+def fit_forecast(kind, params, train, horizon):
+    """Fit one statsmodels model on `train` and forecast `horizon` steps
+
+    Returns NaNs when the fit fails (e.g. too little history for a
+    seasonal model) so one bad origin does not abort the whole backtest.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            model = fit_model(kind, params, train)
+            return np.asarray(model.forecast(horizon), dtype=np.float64)
+        except Exception:
+            return np.full(horizon, np.nan)
+
+
+def _fit_origins(kind, params, windows, horizon):
+    """Worker task: one model over a block of origins"""
+    forecasts = np.full((len(windows), horizon), np.nan)
+    for i, row in enumerate(windows):
+        train = row[~np.isnan(row)]
+        forecasts[i] = fit_forecast(kind, params, train, horizon)
+    return forecasts
+
+
+def statsmodels_forecasts(y, origins, horizon, models=None, window=None, max_workers=None):
+    """Forecasts of the statsmodels-based models, fitted in a process pool"""
+    try:
+        import statsmodels  # noqa: F401
+    except ImportError:
+        print("statsmodels not installed; skipping Holt/ARIMA-family models")
+        return {}
+
+    models = models if models is not None else STATSMODELS_MODELS
+    windows = np.array(window_matrix(y, origins, window))  # contiguous copy for pickling
+    workers = max_workers or os.cpu_count() or 1
+    n_blocks = max(1, min(len(origins), workers))
+    blocks = np.array_split(np.arange(len(origins)), n_blocks)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            (name, b): pool.submit(_fit_origins, kind, params, windows[block], horizon)
+            for name, (kind, params) in models.items()
+            for b, block in enumerate(blocks)
+        }
+        for name in models:
+            results[name] = np.vstack([futures[(name, b)].result() for b in range(len(blocks))])
+    return results
+
+
+def score_forecasts(forecasts, actual):
+    """MAE, MSE, RMSE, MAPE and R² of many models in one vectorized pass
+
+    `forecasts` is (n_models, ...) and `actual` matches the trailing shape.
+    NaN forecasts or actuals are excluded pairwise, like the notebook's
+    evaluate_forecast. Returns an (n_models, 5) array ordered as METRIC_NAMES.
+    """
+    forecasts = np.asarray(forecasts, dtype=np.float64).reshape(len(forecasts), -1)
+    actual = np.broadcast_to(np.asarray(actual, dtype=np.float64).ravel(), forecasts.shape)
+    valid = ~np.isnan(forecasts) & ~np.isnan(actual)
+    n = valid.sum(axis=1)
+
+    error = np.where(valid, actual - forecasts, 0.0)
+    obs = np.where(valid, actual, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mae = np.abs(error).sum(axis=1) / n
+        mse = (error * error).sum(axis=1) / n
+        pct_valid = valid & (actual != 0)
+        mape = np.where(pct_valid, np.abs(error / np.where(pct_valid, actual, 1.0)), 0.0)
+        mape = mape.sum(axis=1) / pct_valid.sum(axis=1) * 100
+        mean_obs = obs.sum(axis=1) / n
+        ss_tot = (np.where(valid, actual - mean_obs[:, None], 0.0) ** 2).sum(axis=1)
+        r2 = 1 - (error * error).sum(axis=1) / ss_tot
+    return np.column_stack((mae, mse, np.sqrt(mse), mape, r2))
+
+
+class BacktestResult:
+    """Forecast and actual matrices from a rolling-origin backtest"""
+
+    def __init__(self, index, origins, horizon, forecasts, actual):
+        self.index = index
+        self.origins = np.asarray(origins)
+        self.horizon = horizon
+        self.forecasts = forecasts
+        self.actual = actual
+
+    @property
+    def origin_labels(self):
+        """Index labels (years) of the first forecast period of each origin"""
+        return self.index[self.origins]
+
+    def metrics(self, by_horizon=False):
+        """Accuracy metrics per model, pooled over origins (and horizons)"""
+        names = list(self.forecasts)
+        stacked = np.stack([self.forecasts[m] for m in names])
+        if not by_horizon:
+            table = score_forecasts(stacked, self.actual)
+            return pd.DataFrame(table, index=pd.Index(names, name='Model'), columns=METRIC_NAMES)
+
+        frames = []
+        for h in range(self.horizon):
+            table = score_forecasts(stacked[:, :, h], self.actual[:, h])
+            frame = pd.DataFrame(table, index=pd.Index(names, name='Model'), columns=METRIC_NAMES)
+            frame.insert(0, 'Horizon', h + 1)
+            frames.append(frame)
+        return pd.concat(frames)
+
+
+def run_backtest(series, horizon=3, min_train=10, window=None, models=None,
+                 include_statsmodels=True, max_workers=None):
+    """Evaluate models over every rolling origin with at least `min_train` points
+
+    `models` restricts the run to the named models (baselines and/or
+    statsmodels specs); `window` switches from expanding to fixed-size
+    training windows.
+    """
+    series = pd.Series(series).dropna()
+    y = series.to_numpy(dtype=np.float64)
+    origins = np.arange(max(min_train, window or 0), len(y))
+    if len(origins) == 0:
+        raise ValueError(f"Series of length {len(y)} is too short for min_train={min_train}")
+
+    forecasts = baseline_forecasts(y, origins, horizon, window)
+    if models is not None:
+        forecasts = {m: f for m, f in forecasts.items() if m in models}
+    if include_statsmodels:
+        specs = {m: s for m, s in STATSMODELS_MODELS.items() if models is None or m in models}
+        if specs:
+            forecasts.update(statsmodels_forecasts(y, origins, horizon, specs, window, max_workers))
+
+    return BacktestResult(series.index, origins, horizon, forecasts,
+                          actual_matrix(y, origins, horizon))
+
+
+def main():
+    """Backtest every model on the yearly series and print the ranking"""
+    series = load_yearly_series()
+    result = run_backtest(series)
+    metrics = result.metrics().sort_values('RMSE').round(2)
+    print("\n=== ROLLING-ORIGIN BACKTEST ===")
+    print(f"Origins: {result.origin_labels.min()} - {result.origin_labels.max()}, "
+          f"horizons 1-{result.horizon}")
+    print(metrics.to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -4,39 +4,203 @@ Border Killings Analysis - Comprehensive Analysis Tool
 Analyzes border killing incidents between Bangladesh and India by BSF
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
+import argparse
 import os
 from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from .aggregation import ChunkedAggregates, GroupedAggregates
+    from .compact_frames import format_footprint
+    from .incremental import append_rows, check_delta_keys, new_table_rows, read_table_delta
+    from .ingest_cache import read_excel_cached
+    from .out_of_core import aggregate_chunked
+    from .party_periods import label_parties, labelers, normalize_party_labels
+    from .profiling import Profiler, null_span, profiled
+    from .result_cache import DEFAULT_CACHE_SIZE, FrameVersion, ResultCache, memo_key, memoized
+    from .rollup_cube import RollupCube
+    from .trend_stats import DEFAULT_RESAMPLES, segment_ids, trend_statistics
+    from .rendering import (DEFAULT_DPI, bar_chart_spec, bar_figure_spec, draw_chart,
+                            export_charts, render_chart, render_charts, trend_figure_spec)
+except ImportError:
+    from aggregation import ChunkedAggregates, GroupedAggregates
+    from compact_frames import format_footprint
+    from incremental import append_rows, check_delta_keys, new_table_rows, read_table_delta
+    from ingest_cache import read_excel_cached
+    from out_of_core import aggregate_chunked
+    from party_periods import label_parties, labelers, normalize_party_labels
+    from profiling import Profiler, null_span, profiled
+    from result_cache import DEFAULT_CACHE_SIZE, FrameVersion, ResultCache, memo_key, memoized
+    from rollup_cube import RollupCube
+    from trend_stats import DEFAULT_RESAMPLES, segment_ids, trend_statistics
+    from rendering import (DEFAULT_DPI, bar_chart_spec, bar_figure_spec, draw_chart,
+                           export_charts, render_chart, render_charts, trend_figure_spec)
+
+# Grouping keys and value columns shared by every party/year analysis
+AGGREGATE_KEYS = ('Rulling_Party_India', 'Rulling_Party', 'Years')
+AGGREGATE_VALUES = ('Killed', 'Years')
+# Extra value columns the chunked mode aggregates so the summary can report them
+CHUNKED_SUMMARY_VALUES = ('Injured\xa0', 'Injured')
+# Value columns pre-aggregated by the rollup cube
+CUBE_VALUES = ('Killed',) + CHUNKED_SUMMARY_VALUES
+
+# Country name and bar colors for the per-party total charts
+PARTY_CHART_SETTINGS = {
+    'Rulling_Party_India': ('India', ['#FF6B6B', '#4ECDC4', '#45B7D1']),
+    'Rulling_Party': ('Bangladesh', ['#96CEB4', '#FFEAA7', '#DDA0DD']),
+}
+
+# pyplot is imported (and styled) on first interactive display; saving never needs it
+_PYPLOT = None
+
 class BorderKillingsAnalyzer:
     """Main class for analyzing border killing data"""
     
-    def __init__(self, data_path=None):
-        """Initialize the analyzer with data path"""
+    def __init__(self, data_path=None, use_cache=True, cache_dir=None,
+                 plots_dir='plots', dpi=DEFAULT_DPI, profiler=None,
+                 chunked=False, chunk_rows=None, memory_limit_mb=None, compact=False,
+                 cache_size=DEFAULT_CACHE_SIZE, relabel_parties=False):
+        """Initialize the analyzer with data path, cache and plot output settings
+        
+        Pass a profiling.Profiler to collect per-stage timing spans. With
+        chunked=True (implied by memory_limit_mb) the table is never loaded
+        whole: party/year aggregates are streamed in bounded batches. With
+        compact=True empty columns are dropped while loading and the rest use
+        compact dtypes (see compact_frames.py). Up to cache_size computed
+        results are memoized (see result_cache.py); 0 disables the cache.
+        With relabel_parties=True both party columns are reassigned from the
+        government-term table (see party_periods.py) instead of the sheet.
+        """
         if data_path is None:
             # Use relative path from project root
             self.data_path = Path(__file__).parent.parent.parent / "data" / "border-inc.xlsx"
         else:
             self.data_path = Path(data_path)
         
+        # Columnar cache of the parsed workbook (see ingest_cache.py)
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        
+        # Where saved charts go and at what resolution
+        self.plots_dir = plots_dir
+        self.dpi = dpi
+        
         self.data = None
         self.data_cleaned = None
-        
-        # Set up plotting style
-        plt.style.use('ggplot')
-        sns.set_palette("husl")
+        self._aggregates = None
+        self.profiler = profiler
+        
+        # Out-of-core mode (see out_of_core.py)
+        self.chunked = chunked or memory_limit_mb is not None
+        self.chunk_rows = chunk_rows
+        self.memory_limit_mb = memory_limit_mb
+        self.compact = compact
+        self.relabel_parties = relabel_parties
+        
+        # Memoized results, invalidated by reloads and frame mutations
+        self.result_cache = ResultCache(cache_size) if cache_size else None
+        self._version = FrameVersion()
+        self._aggregates_version = None
+    
+    @staticmethod
+    def _pyplot():
+        """pyplot with the report style, imported only when a chart is displayed"""
+        global _PYPLOT
+        if _PYPLOT is None:
+            import matplotlib.pyplot as plt
+            import seaborn as sns
+            plt.style.use('ggplot')
+            sns.set_palette("husl")
+            _PYPLOT = plt
+        return _PYPLOT
+    
+    def _span(self, name, **attrs):
+        """Profiler span for an internal stage (a no-op when profiling is off)"""
+        if self.profiler is None:
+            return null_span()
+        return self.profiler.span(name, **attrs)
+    
+    def data_version(self):
+        """Stamp that advances when data is reloaded or data_cleaned is mutated"""
+        return self._version.check(self.data_cleaned)
+    
+    def invalidate_cache(self):
+        """Drop memoized results, e.g. after editing data in place without Copy-on-Write"""
+        self._version.bump()
+        self._aggregates = None
+        if self.result_cache is not None:
+            self.result_cache.clear()
+    
+    def cache_info(self):
+        """Hit/miss counters and size of the result cache (None when disabled)"""
+        return None if self.result_cache is None else self.result_cache.info()
     
+    def _has_data(self):
+        """True once load_data succeeded, in memory or in chunked mode"""
+        return self.data_cleaned is not None or (self.chunked and self._aggregates is not None)
+    
+    def _load_chunked(self):
+        """Stream the aggregates in bounded batches instead of loading the table"""
+        self.data = None
+        self.data_cleaned = None
+        with self._span('aggregate_chunked', memory_limit_mb=self.memory_limit_mb) as attrs:
+            self._aggregates = aggregate_chunked(self.data_path, AGGREGATE_KEYS,
+                                                 AGGREGATE_VALUES + CHUNKED_SUMMARY_VALUES,
+                                                 chunk_rows=self.chunk_rows,
+                                                 memory_limit_mb=self.memory_limit_mb)
+            attrs['rows'] = self._aggregates.n_rows
+        print(f"Data aggregated in chunks. Rows: {self._aggregates.n_rows}")
+        print(f"Columns: {list(dict.fromkeys(self._aggregates.keys + self._aggregates.values))}")
+        return True
+    
+    def _load_compact(self):
+        """Load only the non-empty columns, with categorical and narrow integer dtypes"""
+        with self._span('read_compact') as attrs:
+            self.data_cleaned = read_excel_cached(self.data_path, cache_dir=self.cache_dir,
+                                                  use_cache=self.use_cache, compact=True)
+            attrs['rows'] = len(self.data_cleaned)
+        self._relabel()
+        # Nothing is left to drop, so the raw table is the cleaned one (no copy)
+        self.data = self.data_cleaned
+        self._aggregates = None
+        print(f"Data loaded successfully. Shape: {self.data_cleaned.shape}")
+        print(f"Columns: {self.data_cleaned.columns.tolist()}")
+        print(format_footprint(self.data_cleaned))
+        return True
+    
+    def _relabel(self):
+        """Reassign the party columns from the government terms, if requested"""
+        if self.relabel_parties and 'Years' in self.data_cleaned.columns:
+            with self._span('label_parties', rows=len(self.data_cleaned)):
+                self.data_cleaned = label_parties(self.data_cleaned, 'Years', as_category=self.compact)
+    
+    def load_frame(self, frame):
+        """Analyze an already loaded table (e.g. ingestion.ingest(...).table) instead of data_path"""
+        self.invalidate_cache()
+        self.chunked = False
+        self.data = frame
+        self.data_cleaned = frame.dropna(axis=1, how='all')
+        self._relabel()
+        print(f"Data loaded successfully. Shape: {self.data_cleaned.shape}")
+        return True
+    
+    @profiled()
     def load_data(self):
         """Load and clean the data"""
         try:
-            self.data = pd.read_excel(self.data_path)
+            self.invalidate_cache()
+            if self.chunked:
+                return self._load_chunked()
+            if self.compact:
+                return self._load_compact()
+            self.data = read_excel_cached(self.data_path, cache_dir=self.cache_dir,
+                                          use_cache=self.use_cache)
             # Drop columns with all NaN values
             self.data_cleaned = self.data.dropna(axis=1, how='all')
+            self._relabel()
+            self._aggregates = None
             print(f"Data loaded successfully. Shape: {self.data_cleaned.shape}")
             print(f"Columns: {self.data_cleaned.columns.tolist()}")
             return True
@@ -47,11 +211,90 @@ class BorderKillingsAnalyzer:
             print(f"Error loading data: {e}")
             return False
     
+    @profiled()
+    def append_data(self, delta):
+        """Add new years (a DataFrame or an .xlsx/.csv of the new rows) without reloading
+        
+        Only the delta is read and checked against the loaded years (see
+        incremental.py): rows already loaded are skipped and rows that
+        conflict with them raise ValueError. The shared aggregates and the
+        rollup cube are extended with the new rows instead of rebuilt;
+        results derived from them, such as trend fits and chart specs, are
+        recomputed from the per-year totals on next use. The workbook file is
+        not modified. Returns the number of rows added.
+        """
+        if not self._has_data():
+            print("Please load data first")
+            return 0
+        with self._span('read_delta'):
+            delta = read_table_delta(delta)
+        if self.relabel_parties and 'Years' in delta.columns:
+            delta = label_parties(delta, 'Years', as_category=False)
+        if self.data_cleaned is None:
+            return self._append_chunked(delta)
+        
+        rows = new_table_rows(self.data_cleaned, delta)
+        if not len(rows):
+            print("No new rows to append")
+            return 0
+        with self._span('append_rows', rows=len(rows)):
+            aggregates = self.get_aggregates()
+            cube = None
+            if self.result_cache is not None:
+                cube = self.result_cache.pop(memo_key(self, 'rollup_cube'))
+            previous = self.data_cleaned
+            self.data_cleaned = append_rows(previous, rows)
+            self.data = self.data_cleaned if self.data is previous else append_rows(self.data, rows)
+            added = self.data_cleaned.iloc[len(previous):]
+            
+            # Seed the new data version with the extended aggregates and cube
+            self._aggregates = ChunkedAggregates.from_aggregates(aggregates).add(added)
+            self._aggregates_version = self.data_version()
+            if cube is not None:
+                # Callers only ever get copies, so the cached cube is extended in place
+                self.result_cache.put(memo_key(self, 'rollup_cube'), cube.append(added))
+        print(f"Appended {len(rows)} rows ({', '.join(map(str, rows['Years'].tolist()))}). "
+              f"Shape: {self.data_cleaned.shape}")
+        return len(rows)
+    
+    def _append_chunked(self, delta):
+        """Fold new years into the streamed aggregates
+        
+        The loaded rows were never held, so a year that is already
+        aggregated is compared by its per-year totals: matching years are
+        skipped like repeated rows in memory, differing ones raise ValueError.
+        """
+        check_delta_keys(delta)
+        aggregates = self._aggregates
+        columns = list(dict.fromkeys(aggregates.keys + aggregates.values))
+        delta = delta.reindex(columns=columns)
+        loaded = sorted(set(delta['Years'].tolist()) & set(aggregates.labels('Years').tolist()))
+        if loaded:
+            incoming = GroupedAggregates(delta[delta['Years'].isin(loaded)], ['Years'], aggregates.values)
+            conflicts = [value for value in aggregates.values for stat in ('sum', 'count')
+                         if not np.allclose(incoming.stat('Years', value, stat),
+                                            aggregates.stat('Years', value, stat).loc[loaded], equal_nan=True)]
+            if conflicts:
+                raise ValueError(f"Years {loaded} are already aggregated with different {sorted(set(conflicts))}")
+            print(f"Skipping years already aggregated: {', '.join(map(str, loaded))}")
+            delta = delta[~delta['Years'].isin(loaded)]
+        if not len(delta):
+            print("No new rows to append")
+            return 0
+        with self._span('append_chunked', rows=len(delta)):
+            self._aggregates = ChunkedAggregates.from_aggregates(aggregates).add(delta)
+        self._version.bump()
+        print(f"Appended {len(delta)} rows. Rows: {self._aggregates.n_rows}")
+        return len(delta)
+    
+    @profiled()
     def get_summary_stats(self):
         """Get basic summary statistics"""
-        if self.data_cleaned is None:
+        if not self._has_data():
             print("Please load data first")
             return
+        if self.data_cleaned is None:
+            return self._chunked_summary_stats()
         
         print("\n=== SUMMARY STATISTICS ===")
         print(f"Available columns: {list(self.data_cleaned.columns)}")
@@ -79,144 +322,211 @@ class BorderKillingsAnalyzer:
         else:
             print("Could not find expected columns. Please check data structure.")
         
-    def analyze_by_ruling_party_india(self, save_plot=False):
-        """Analyze killings by ruling party in India"""
+    def _chunked_summary_stats(self):
+        """Summary statistics from the streamed aggregates"""
+        aggregates = self._aggregates
+        print("\n=== SUMMARY STATISTICS ===")
+        print(f"Available columns: {list(dict.fromkeys(aggregates.keys + aggregates.values))}")
+        if 'Years' not in aggregates.keys or 'Killed' not in aggregates.values:
+            print("Could not find expected columns. Please check data structure.")
+            return
+        years = aggregates.labels('Years')
+        total = aggregates.stat('Years', 'Killed', 'sum').sum()
+        count = aggregates.stat('Years', 'Killed', 'count').sum()
+        print(f"Total years covered: {years.min()} - {years.max()}")
+        print(f"Total killings: {total}")
+        print(f"Average killings per year: {total / count:.2f}")
+        injured = [v for v in CHUNKED_SUMMARY_VALUES if v in aggregates.values]
+        if injured:
+            print(f"Total injured: {aggregates.stat('Years', injured[0], 'sum').sum()}")
+    
+    def get_aggregates(self):
+        """Return the shared per-party/per-year aggregates, computing them once"""
         if self.data_cleaned is None:
+            return self._aggregates if self.chunked else None
+        version = self.data_version()
+        if self._aggregates is None or self._aggregates_version != version:
+            self._aggregates_version = version
+            keys = [k for k in AGGREGATE_KEYS if k in self.data_cleaned.columns]
+            values = [v for v in AGGREGATE_VALUES if v in self.data_cleaned.columns]
+            with self._span('aggregate', rows=len(self.data_cleaned)):
+                self._aggregates = GroupedAggregates(self.data_cleaned, keys, values)
+        return self._aggregates
+    
+    def _total_killed_by(self, party_col):
+        """Total killings per party, largest first"""
+        totals = self.get_aggregates().stat(party_col, 'Killed', 'sum').reset_index()
+        return totals.sort_values(by='Killed', ascending=False)
+    
+    def _average_killed_by(self, party_col):
+        """Total killings, years in power and yearly average per party"""
+        aggregates = self.get_aggregates()
+        avg_killings = aggregates.stat(party_col, 'Killed', 'sum').reset_index()
+        avg_killings['Total_Years'] = aggregates.stat(party_col, 'Years', 'count').to_numpy()
+        avg_killings['Avg_Killings_Per_Year'] = avg_killings['Killed'] / avg_killings['Total_Years']
+        return avg_killings
+    
+    def _output_chart(self, spec, filename, save_plot, plot):
+        """Save a chart headlessly, or draw it on a pyplot figure for display"""
+        if save_plot:
+            os.makedirs(self.plots_dir, exist_ok=True)
+            with self._span('savefig', file=filename, dpi=self.dpi):
+                render_chart(spec, os.path.join(self.plots_dir, filename), dpi=self.dpi)
+        elif plot:
+            with self._span('draw', file=filename):
+                draw_chart(spec, fig=self._pyplot().figure(figsize=spec['figsize']))
+    
+    @memoized()
+    def _party_totals_chart(self, party_col):
+        """Chart spec for total killings by one country's ruling party"""
+        totals = self._total_killed_by(party_col)
+        return totals, self._party_totals_spec(totals, party_col)
+    
+    @staticmethod
+    def _party_totals_spec(totals, party_col, period=None):
+        """Bar chart spec of per-party totals, optionally titled with a year range"""
+        country, colors = PARTY_CHART_SETTINGS[party_col]
+        title = f'Total Border Killings by Ruling Party in {country}'
+        if period is not None:
+            title += f' ({period[0]}-{period[1]})'
+        panel = bar_chart_spec(totals[party_col], totals['Killed'], title,
+                               f'Ruling Party in {country}', 'Total Killings', colors)
+        return bar_figure_spec([panel], figsize=(12, 8))
+    
+    def rollup_cube(self):
+        """Year x party sums and counts of the loaded table (see rollup_cube.py)
+
+        Returns a copy of the cached cube, so appending to it leaves the
+        analyzer's results alone; append_data extends the cached one. None
+        without data, or when only chunked aggregates were loaded.
+        """
+        if not self._has_data():
+            return None
+        if self.data_cleaned is None:
+            print("The rollup cube needs the table in memory; load without a memory limit")
+            return None
+        return self._shared_rollup_cube().copy()
+    
+    @memoized('rollup_cube')
+    def _shared_rollup_cube(self):
+        """The cached cube itself, for read-only queries inside the analyzer"""
+        with self._span('rollup_cube', rows=len(self.data_cleaned)):
+            return RollupCube.from_frame(self.data_cleaned, AGGREGATE_KEYS, CUBE_VALUES)
+    
+    @memoized()
+    def party_slice_specs(self, party_col, periods):
+        """{file name: chart spec} of party totals for each (first, last) year range
+
+        Each slice is a query on the rollup cube rather than a pass over the rows.
+        """
+        cube = self._shared_rollup_cube()
+        country = PARTY_CHART_SETTINGS[party_col][0].lower()
+        specs = {}
+        for first, last in periods:
+            totals = cube.query('Killed', by=party_col, where={'Years': (first, last)}).reset_index()
+            totals = totals.sort_values(by='Killed', ascending=False)
+            specs[f'killings_by_{country}_party_{first}-{last}.png'] = self._party_totals_spec(
+                totals, party_col, (first, last))
+        return specs
+    
+    @profiled()
+    def export_party_slices(self, periods, output_dir=None, formats=('png',), dpi=None, thumbnails=False,
+                            fixed_layout=True):
+        """Party-total charts of both countries for every year range, written in one batch
+
+        Charts share one figure template (see rendering.export_charts); formats
+        are file extensions such as 'png' and 'svg'. Returns the written paths.
+        """
+        if not self._has_data():
+            return []
+        if self.data_cleaned is None:
+            print("Year slices need the table in memory; load without a memory limit")
+            return []
+        periods = tuple((int(first), int(last)) for first, last in periods)
+        charts = {}
+        for party_col in PARTY_CHART_SETTINGS:
+            charts.update(self.party_slice_specs(party_col, periods))
+        with self._span('export_charts', charts=len(charts), formats=len(formats)):
+            return export_charts(charts, output_dir or self.plots_dir, formats=formats,
+                                 dpi=dpi or self.dpi, thumbnails=thumbnails,
+                                 fixed_layout=fixed_layout)
+    
+    @profiled()
+    def analyze_by_ruling_party_india(self, save_plot=False, plot=True):
+        """Analyze killings by ruling party in India"""
+        if not self._has_data():
             return None
             
         # Calculate total killings by ruling party in India
-        killed_by_party_india = self.data_cleaned.groupby('Rulling_Party_India')['Killed'].sum().reset_index()
-        killed_by_party_india = killed_by_party_india.sort_values(by='Killed', ascending=False)
-        
-        # Plotting
-        plt.figure(figsize=(12, 8))
-        bars = plt.bar(killed_by_party_india['Rulling_Party_India'], 
-                      killed_by_party_india['Killed'], 
-                      color=['#FF6B6B', '#4ECDC4', '#45B7D1'])
-        
-        plt.title('Total Border Killings by Ruling Party in India', fontsize=16, fontweight='bold')
-        plt.xlabel('Ruling Party in India', fontsize=12)
-        plt.ylabel('Total Killings', fontsize=12)
-        plt.xticks(rotation=45)
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height + 1,
-                    f'{int(height)}', ha='center', va='bottom')
-        
-        plt.tight_layout()
-        if save_plot:
-            plt.savefig('plots/killings_by_india_party.png', dpi=300, bbox_inches='tight')
-        # plt.show()
+        killed_by_party_india, spec = self._party_totals_chart('Rulling_Party_India')
+        self._output_chart(spec, 'killings_by_india_party.png', save_plot, plot)
         
         return killed_by_party_india
     
-    def analyze_by_ruling_party_bangladesh(self, save_plot=False):
+    @profiled()
+    def analyze_by_ruling_party_bangladesh(self, save_plot=False, plot=True):
         """Analyze killings by ruling party in Bangladesh"""
-        if self.data_cleaned is None:
+        if not self._has_data():
             return None
             
         # Calculate total killings by ruling party in Bangladesh
-        killed_by_party_bd = self.data_cleaned.groupby('Rulling_Party')['Killed'].sum().reset_index()
-        killed_by_party_bd = killed_by_party_bd.sort_values(by='Killed', ascending=False)
-        
-        # Plotting
-        plt.figure(figsize=(12, 8))
-        bars = plt.bar(killed_by_party_bd['Rulling_Party'], 
-                      killed_by_party_bd['Killed'], 
-                      color=['#96CEB4', '#FFEAA7', '#DDA0DD'])
-        
-        plt.title('Total Border Killings by Ruling Party in Bangladesh', fontsize=16, fontweight='bold')
-        plt.xlabel('Ruling Party in Bangladesh', fontsize=12)
-        plt.ylabel('Total Killings', fontsize=12)
-        plt.xticks(rotation=45)
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height + 1,
-                    f'{int(height)}', ha='center', va='bottom')
-        
-        plt.tight_layout()
-        if save_plot:
-            plt.savefig('plots/killings_by_bangladesh_party.png', dpi=300, bbox_inches='tight')
-        # plt.show()
+        killed_by_party_bd, spec = self._party_totals_chart('Rulling_Party')
+        self._output_chart(spec, 'killings_by_bangladesh_party.png', save_plot, plot)
         
         return killed_by_party_bd
     
+    @profiled()
+    @memoized()
     def calculate_average_killings(self):
         """Calculate average killings per year by ruling parties"""
-        if self.data_cleaned is None:
+        if not self._has_data():
             return None, None
             
-        # For India
-        years_party_india = self.data_cleaned.groupby('Rulling_Party_India')['Years'].count().reset_index()
-        years_party_india.rename(columns={'Years': 'Total_Years'}, inplace=True)
-        total_killings_india = self.data_cleaned.groupby('Rulling_Party_India')['Killed'].sum().reset_index()
-        avg_killings_india = pd.merge(total_killings_india, years_party_india, on='Rulling_Party_India')
-        avg_killings_india['Avg_Killings_Per_Year'] = avg_killings_india['Killed'] / avg_killings_india['Total_Years']
+        # Both countries read from the shared aggregates instead of regrouping
+        avg_killings_india = self._average_killed_by('Rulling_Party_India')
+        avg_killings_bd = self._average_killed_by('Rulling_Party')
         
-        # For Bangladesh
-        years_party_bd = self.data_cleaned.groupby('Rulling_Party')['Years'].count().reset_index()
-        years_party_bd.rename(columns={'Years': 'Total_Years'}, inplace=True)
-        total_killings_bd = self.data_cleaned.groupby('Rulling_Party')['Killed'].sum().reset_index()
-        avg_killings_bd = pd.merge(total_killings_bd, years_party_bd, on='Rulling_Party')
-        avg_killings_bd['Avg_Killings_Per_Year'] = avg_killings_bd['Killed'] / avg_killings_bd['Total_Years']
-        
-        # Rename for consistency
-        avg_killings_bd['Rulling_Party'] = avg_killings_bd['Rulling_Party'].replace('Awami League', 'BAL')
+        # Long-form names in the sheet (e.g. 'Awami League') become the report labels
+        avg_killings_bd['Rulling_Party'] = normalize_party_labels(avg_killings_bd['Rulling_Party'])
         
         return avg_killings_india, avg_killings_bd
     
-    def plot_average_killings_comparison(self, save_plot=False):
-        """Plot comparison of average killings between major parties"""
+    @memoized()
+    def _average_comparison_chart(self):
+        """Filtered averages for the major parties and their comparison chart spec"""
         avg_india, avg_bd = self.calculate_average_killings()
         
-        if avg_india is None or avg_bd is None:
-            return
-        
         # Filter for major parties
         avg_india_filtered = avg_india[avg_india['Rulling_Party_India'].isin(['BJP', 'Congress'])]
         avg_bd_filtered = avg_bd[avg_bd['Rulling_Party'].isin(['BAL', 'BNP', 'others'])]
         
-        # Create subplot
-        fig, axes = plt.subplots(2, 1, figsize=(14, 12))
-        
-        # Plot for India
-        bars1 = axes[0].bar(avg_india_filtered['Rulling_Party_India'], 
-                           avg_india_filtered['Avg_Killings_Per_Year'], 
-                           color=['#FF6B6B', '#4ECDC4'])
-        axes[0].set_title('Average Border Killings per Year - India (BJP vs Congress)', 
-                         fontsize=14, fontweight='bold')
-        axes[0].set_xlabel('Ruling Party in India')
-        axes[0].set_ylabel('Average Killings per Year')
-        
-        # Add value labels
-        for bar in bars1:
-            height = bar.get_height()
-            axes[0].text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                        f'{height:.1f}', ha='center', va='bottom')
-        
-        # Plot for Bangladesh
-        bars2 = axes[1].bar(avg_bd_filtered['Rulling_Party'], 
-                           avg_bd_filtered['Avg_Killings_Per_Year'], 
-                           color=['#96CEB4', '#FFEAA7', '#DDA0DD'])
-        axes[1].set_title('Average Border Killings per Year - Bangladesh (BAL vs BNP vs Others)', 
-                         fontsize=14, fontweight='bold')
-        axes[1].set_xlabel('Ruling Party in Bangladesh')
-        axes[1].set_ylabel('Average Killings per Year')
-        
-        # Add value labels
-        for bar in bars2:
-            height = bar.get_height()
-            axes[1].text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                        f'{height:.1f}', ha='center', va='bottom')
+        panels = [
+            bar_chart_spec(avg_india_filtered['Rulling_Party_India'],
+                           avg_india_filtered['Avg_Killings_Per_Year'],
+                           'Average Border Killings per Year - India (BJP vs Congress)',
+                           'Ruling Party in India', 'Average Killings per Year',
+                           ['#FF6B6B', '#4ECDC4'],
+                           value_format='{:.1f}', label_offset=0.5, title_size=14,
+                           axis_label_size=None),
+            bar_chart_spec(avg_bd_filtered['Rulling_Party'],
+                           avg_bd_filtered['Avg_Killings_Per_Year'],
+                           'Average Border Killings per Year - Bangladesh (BAL vs BNP vs Others)',
+                           'Ruling Party in Bangladesh', 'Average Killings per Year',
+                           ['#96CEB4', '#FFEAA7', '#DDA0DD'],
+                           value_format='{:.1f}', label_offset=0.5, title_size=14,
+                           axis_label_size=None),
+        ]
+        spec = bar_figure_spec(panels, figsize=(14, 12), rotate_labels=False)
+        return avg_india_filtered, avg_bd_filtered, spec
+    
+    @profiled()
+    def plot_average_killings_comparison(self, save_plot=False, plot=True):
+        """Plot comparison of average killings between major parties"""
+        if not self._has_data():
+            return
         
-        plt.tight_layout()
-        if save_plot:
-            plt.savefig('plots/average_killings_comparison.png', dpi=300, bbox_inches='tight')
-        # plt.show()
+        avg_india_filtered, avg_bd_filtered, spec = self._average_comparison_chart()
+        self._output_chart(spec, 'average_killings_comparison.png', save_plot, plot)
         
         # Print results
         print("\n=== AVERAGE KILLINGS PER YEAR ===")
@@ -225,47 +535,86 @@ class BorderKillingsAnalyzer:
         print("\nBangladesh (BAL vs BNP vs Others):")
         print(avg_bd_filtered[['Rulling_Party', 'Avg_Killings_Per_Year']])
     
-    def plot_trend_over_time(self, save_plot=False):
-        """Plot trend of killings over time"""
-        if self.data_cleaned is None:
+    @memoized()
+    def trend_statistics(self, segment_col=None, window=None, n_resamples=DEFAULT_RESAMPLES, level=0.95):
+        """Trend fits of the yearly totals (see trend_stats.py)
+
+        segment_col fits one line per government term of that party column,
+        window adds rolling slopes and n_resamples > 0 a bootstrap band and
+        permutation p-value at `level`.
+        """
+        trend_data = self.get_aggregates().stat('Years', 'Killed', 'sum').reset_index()
+        years = trend_data['Years'].to_numpy(dtype=np.float64)
+        segments = None
+        if segment_col is not None:
+            segments = segment_ids(labelers()[segment_col].codes(years))
+        with self._span('trend_statistics', rows=len(trend_data), resamples=n_resamples):
+            stats = trend_statistics(years, trend_data['Killed'], segments, window, n_resamples, level)
+        stats['years'] = years
+        if segments is not None:
+            stats['segments'] = segments
+        stats['values'] = trend_data['Killed'].to_numpy(dtype=np.float64)
+        return stats
+    
+    @memoized()
+    def trend_chart(self, level=None, segment_col=None, n_resamples=DEFAULT_RESAMPLES):
+        """Chart spec for the yearly totals with a linear trend line
+
+        level adds a bootstrap confidence band, segment_col per-term trend lines.
+        """
+        stats = self.trend_statistics(segment_col, n_resamples=n_resamples if level else 0,
+                                      level=level or 0.95)
+        band = stats['band'] if level else None
+        return trend_figure_spec(
+            stats['years'], stats['values'], stats['trend'],
+            'Border Killings Trend Over Time (1971-2023)', band=band,
+            band_label=f'{level:.0%} bootstrap band' if level else None,
+            segment_values=stats.get('piecewise'), segments=stats.get('segments'))
+    
+    @profiled()
+    def plot_trend_over_time(self, save_plot=False, plot=True, level=None, segment_col=None,
+                             n_resamples=DEFAULT_RESAMPLES):
+        """Plot trend of killings over time, optionally with a confidence band and per-term trends"""
+        if not self._has_data():
             return
-            
-        trend_data = self.data_cleaned.groupby('Years')['Killed'].sum().reset_index()
-        
-        plt.figure(figsize=(15, 8))
-        plt.plot(trend_data['Years'], trend_data['Killed'], 
-                marker='o', linewidth=2, markersize=6, color='#E74C3C')
-        
-        plt.title('Border Killings Trend Over Time (1971-2023)', fontsize=16, fontweight='bold')
-        plt.xlabel('Year', fontsize=12)
-        plt.ylabel('Total Killings', fontsize=12)
-        plt.grid(True, alpha=0.3)
         
-        # Add trend line
-        z = np.polyfit(trend_data['Years'], trend_data['Killed'], 1)
-        p = np.poly1d(z)
-        plt.plot(trend_data['Years'], p(trend_data['Years']), 
-                "--", alpha=0.7, color='#3498DB', label='Trend Line')
-        
-        plt.legend()
-        plt.tight_layout()
-        if save_plot:
-            plt.savefig('plots/killings_trend_over_time.png', dpi=300, bbox_inches='tight')
-        # plt.show()
+        spec = self.trend_chart(level, segment_col, n_resamples)
+        self._output_chart(spec, 'killings_trend_over_time.png', save_plot, plot)
+    
+    @profiled()
+    def chart_specs(self):
+        """Specs for every report chart, keyed by output file name"""
+        return {
+            'killings_by_india_party.png': self._party_totals_chart('Rulling_Party_India')[1],
+            'killings_by_bangladesh_party.png': self._party_totals_chart('Rulling_Party')[1],
+            'average_killings_comparison.png': self._average_comparison_chart()[2],
+            'killings_trend_over_time.png': self.trend_chart(),
+        }
     
-    def generate_comprehensive_report(self, save_plots=False):
-        """Generate a comprehensive analysis report"""
+    @profiled()
+    def generate_comprehensive_report(self, save_plots=False, max_workers=None, skip_unchanged=True,
+                                      append=None):
+        """Generate a comprehensive analysis report
+        
+        Charts are rendered headlessly in a process pool once the text report
+        is done; charts whose data and style are unchanged since the last saved
+        PNG are skipped unless skip_unchanged is False. append adds new
+        years (see append_data) before reporting. Returns False when the
+        data cannot be loaded or appended.
+        """
         if not self.load_data():
-            return
+            return False
+        if append is not None:
+            try:
+                self.append_data(append)
+            except (OSError, ValueError) as e:
+                print(f"Error appending {append}: {e}")
+                return False
         
         print("=" * 60)
         print("BORDER KILLINGS COMPREHENSIVE ANALYSIS REPORT")
         print("=" * 60)
         
-        # Create plots directory if saving
-        if save_plots:
-            os.makedirs('plots', exist_ok=True)
-        
         # Basic statistics
         self.get_summary_stats()
         
@@ -274,29 +623,69 @@ class BorderKillingsAnalyzer:
         print("ANALYSIS BY RULING PARTIES")
         print("=" * 40)
         
-        self.analyze_by_ruling_party_india(save_plots)
-        self.analyze_by_ruling_party_bangladesh(save_plots)
-        self.plot_average_killings_comparison(save_plots)
+        self.analyze_by_ruling_party_india(plot=False)
+        self.analyze_by_ruling_party_bangladesh(plot=False)
+        self.plot_average_killings_comparison(plot=False)
         
         # Trend analysis
         print("\n" + "=" * 40)
         print("TREND ANALYSIS")
         print("=" * 40)
-        self.plot_trend_over_time(save_plots)
+        self.plot_trend_over_time(plot=False)
+        
+        if save_plots:
+            specs = self.chart_specs()
+            with self._span('render_charts', dpi=self.dpi) as attrs:
+                rendered, skipped = render_charts(specs, self.plots_dir, dpi=self.dpi,
+                                                  max_workers=max_workers,
+                                                  skip_unchanged=skip_unchanged)
+                attrs.update(rendered=len(rendered), skipped=len(skipped))
+            print(f"\nCharts rendered: {len(rendered)}, unchanged and skipped: {len(skipped)}")
         
         print("\n" + "=" * 60)
         print("ANALYSIS COMPLETE")
         print("=" * 60)
+        return True
 
-def main():
+def main(argv=None):
     """Main function to run the analysis"""
-    import numpy as np
+    parser = argparse.ArgumentParser(description='Border killings comprehensive analysis report')
+    parser.add_argument('--data', default=None, help='Path to border-inc.xlsx')
+    parser.add_argument('--output-dir', default='plots', help='Directory for saved charts')
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI, help='Resolution of saved charts')
+    parser.add_argument('--memory-limit-mb', type=float, default=None,
+                        help='Stream the workbook in batches that fit this memory ceiling')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Bypass the columnar ingest cache')
+    parser.add_argument('--compact', action='store_true',
+                        help='Load only non-empty columns with compact dtypes and report the footprint')
+    parser.add_argument('--relabel-parties', action='store_true',
+                        help='Assign ruling parties from the government-term table (party_periods.py)')
+    parser.add_argument('--append', metavar='PATH',
+                        help='Add the new years in this .xlsx/.csv to the loaded workbook first')
+    parser.add_argument('--profile', metavar='PATH',
+                        help='Write per-stage timing spans to PATH (*.trace.json: Chrome trace)')
+    parser.add_argument('--profile-format', choices=('json', 'chrome'), default=None,
+                        help='Override the format inferred from the --profile file name')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='Also record traced memory deltas (slower)')
+    args = parser.parse_args(argv)
+    
+    profiler = Profiler(track_memory=args.profile_memory) if args.profile else None
     
     # Initialize analyzer
-    analyzer = BorderKillingsAnalyzer()
+    analyzer = BorderKillingsAnalyzer(args.data, use_cache=not args.no_cache, plots_dir=args.output_dir,
+                                      dpi=args.dpi, profiler=profiler, memory_limit_mb=args.memory_limit_mb,
+                                      compact=args.compact, relabel_parties=args.relabel_parties)
     
     # Generate comprehensive report
-    analyzer.generate_comprehensive_report(save_plots=True)
+    ok = analyzer.generate_comprehensive_report(save_plots=True, append=args.append)
+    
+    if profiler is not None:
+        profiler.summary()
+        path = profiler.export(args.profile, args.profile_format)
+        print(f"Profile saved to {path}")
+    return 0 if ok else 1
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
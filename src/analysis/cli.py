@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Border Killings CLI - One entry point for every analysis script
+Subcommands: summary, party, trend, slices, report, map, models. Only the standard
+library is imported up front; numpy, pandas, matplotlib and plotly are
+imported inside the subcommand that needs them, so `summary` over a cached
+workbook reads the cache manifest without importing any of them
+"""
+
+import argparse
+import importlib.util
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_WORKBOOK = PROJECT_ROOT / 'data' / 'border-inc.xlsx'
+MODEL_DATA_SCRIPT = PROJECT_ROOT / 'generate_model_data.py'
+# Party column whose government terms split the trend into segments
+TREND_SEGMENTS = {'bangladesh': 'Rulling_Party', 'india': 'Rulling_Party_India'}
+
+
+def _analysis_module(name):
+    """Import a sibling analysis module whether run as a package or a script"""
+    if __package__:
+        return importlib.import_module(f'.{name}', __package__)
+    return importlib.import_module(name)
+
+
+def _analyzer(args, **kwargs):
+    module = _analysis_module('border_killings_analysis')
+    analyzer = module.BorderKillingsAnalyzer(args.data, use_cache=not args.no_cache,
+                                             memory_limit_mb=args.memory_limit_mb,
+                                             compact=args.compact, **kwargs)
+    return analyzer if analyzer.load_data() else None
+
+
+def summarize_cached(data_path):
+    """Summary lines computed from the ingest cache manifest alone
+
+    Returns None when the cache is missing or stale.
+    """
+    ingest_cache = _analysis_module('ingest_cache')
+    stats, _ = ingest_cache.column_stats(data_path)
+    if stats is None:
+        return None
+
+    names = list(stats)
+    lines = [f"Available columns: {names}"]
+    year_col = killed_col = injured_col = None
+    for col in names:
+        if 'year' in col.lower():
+            year_col = col
+        elif 'killed' in col.lower():
+            killed_col = col
+        elif 'injured' in col.lower():
+            injured_col = col
+
+    if year_col and killed_col and stats[year_col] and stats[killed_col]:
+        years, killed = stats[year_col], stats[killed_col]
+        lines.append(f"Total years covered: {years['min']} - {years['max']}")
+        lines.append(f"Total killings: {killed['sum']}")
+        lines.append(f"Average killings per year: {killed['sum'] / killed['count']:.2f}")
+        if injured_col and stats[injured_col]:
+            lines.append(f"Total injured: {stats[injured_col]['sum']}")
+    else:
+        lines.append("Could not find expected columns. Please check data structure.")
+    return lines
+
+
+def cmd_summary(args):
+    """Dataset overview, served from the ingest cache when it is fresh"""
+    data_path = Path(args.data) if args.data else DEFAULT_WORKBOOK
+    if not data_path.exists():
+        print(f"Error: Data file not found at {data_path}")
+        return 1
+
+    full_load = args.memory_limit_mb is not None or args.compact
+    lines = None if args.no_cache or full_load else summarize_cached(data_path)
+    if lines is None:
+        # Cache missing or stale: the full load parses the workbook and refreshes it
+        analyzer = _analyzer(args)
+        if analyzer is None:
+            return 1
+        analyzer.get_summary_stats()
+        return 0
+
+    print("\n=== SUMMARY STATISTICS ===")
+    for line in lines:
+        print(line)
+    return 0
+
+
+def cmd_party(args):
+    """Totals and per-year averages by ruling party"""
+    analyzer = _analyzer(args, plots_dir=args.output_dir)
+    if analyzer is None:
+        return 1
+    if args.country in ('india', 'both'):
+        print("\n=== KILLINGS BY RULING PARTY (INDIA) ===")
+        print(analyzer.analyze_by_ruling_party_india(save_plot=args.save, plot=False).to_string(index=False))
+    if args.country in ('bangladesh', 'both'):
+        print("\n=== KILLINGS BY RULING PARTY (BANGLADESH) ===")
+        print(analyzer.analyze_by_ruling_party_bangladesh(save_plot=args.save, plot=False).to_string(index=False))
+    if args.country == 'both':
+        analyzer.plot_average_killings_comparison(save_plot=args.save, plot=False)
+    return 0
+
+
+def cmd_trend(args):
+    """Yearly totals with the fitted linear trend"""
+    analyzer = _analyzer(args, plots_dir=args.output_dir)
+    if analyzer is None:
+        return 1
+    import numpy as np
+
+    segment_col = TREND_SEGMENTS.get(args.segments)
+    spec = analyzer.trend_chart(args.band, segment_col, args.resamples)
+    print("\n=== KILLINGS TREND ===")
+    print(f"{'Year':>6} {'Killed':>8} {'Trend':>10}")
+    for year, killed, trend in zip(spec['years'], spec['values'], spec['trend_values']):
+        print(f"{year:>6.0f} {killed:>8.0f} {trend:>10.2f}")
+    n_resamples = args.resamples if args.band else 0
+    stats = analyzer.trend_statistics(segment_col, args.window, n_resamples, args.band or 0.95)
+    print(f"\nSlope: {stats['slope']:.3f} killings/year")
+    if n_resamples:
+        low, high = stats['slope_interval']
+        print(f"{args.band:.0%} bootstrap interval: {low:.3f} to {high:.3f}; "
+              f"permutation p-value: {stats['p_value']:.4f} ({args.resamples} resamples)")
+    if segment_col is not None:
+        print(f"\nSlope per government term ({args.segments}):")
+        for segment, slope in enumerate(stats['segment_slopes']):
+            years = stats['years'][stats['segments'] == segment]
+            print(f"  {years[0]:.0f}-{years[-1]:.0f}: {slope:>8.3f}")
+    if args.window:
+        print(f"\nLargest {args.window}-year rolling slope: {np.nanmax(stats['rolling_slopes']):.3f}, "
+              f"smallest: {np.nanmin(stats['rolling_slopes']):.3f}")
+    if args.save:
+        analyzer.plot_trend_over_time(save_plot=True, plot=False, level=args.band, segment_col=segment_col,
+                                      n_resamples=args.resamples)
+    return 0
+
+
+def _year_range(text):
+    first, sep, last = text.partition('-')
+    try:
+        return int(first), int(last if sep else first)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected FIRST-LAST years, got {text!r}")
+
+
+def cmd_slices(args):
+    """Party-total charts for several year ranges, exported in one templated batch"""
+    analyzer = _analyzer(args, plots_dir=args.output_dir, dpi=args.dpi)
+    if analyzer is None:
+        return 1
+    if analyzer.data_cleaned is None:
+        print("Year slices need the table in memory; drop --memory-limit-mb")
+        return 1
+    periods = list(args.periods)
+    if args.every:
+        years = analyzer.data_cleaned['Years']
+        start, end = int(years.min()), int(years.max())
+        periods += [(y, min(y + args.every - 1, end)) for y in range(start, end + 1, args.every)]
+    if not periods:
+        print("Give year ranges (e.g. 1991-2000) or --every N")
+        return 1
+    written = analyzer.export_party_slices(periods, formats=args.format, thumbnails=args.thumbnails)
+    print(f"{len(written)} files written to {args.output_dir}")
+    return 0
+
+
+def cmd_report(args):
+    """Full report with saved charts (same as border_killings_analysis.py)"""
+    module = _analysis_module('border_killings_analysis')
+    argv = ['--output-dir', args.output_dir, '--dpi', str(args.dpi)]
+    if args.data:
+        argv += ['--data', args.data]
+    if args.profile:
+        argv += ['--profile', args.profile]
+    if args.memory_limit_mb is not None:
+        argv += ['--memory-limit-mb', str(args.memory_limit_mb)]
+    if args.no_cache:
+        argv.append('--no-cache')
+    if args.compact:
+        argv.append('--compact')
+    if args.append:
+        argv += ['--append', args.append]
+    return module.main(argv)
+
+
+def cmd_map(args):
+    """Interactive incident map, tiles and trend chart (generate_visualizations.py)"""
+    module = _analysis_module('generate_visualizations')
+    argv = ['--output-dir', args.output_dir]
+    if args.locations:
+        argv += ['--data', args.locations]
+    if args.no_inline_map:
+        argv.append('--no-inline-map')
+    if args.append:
+        argv += ['--append', args.append]
+    module.main(argv)
+    return 0
+
+
+def cmd_models(args):
+    """Model comparison data for index.html (generate_model_data.py)"""
+    spec = importlib.util.spec_from_file_location('generate_model_data', MODEL_DATA_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    argv = ['--output', args.output] if args.output else []
+    if args.compact:
+        argv.append('--compact')
+    module.main(argv)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Border killings analysis command line')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def workbook_command(name, func, help_text):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument('--data', default=None, help='Path to border-inc.xlsx')
+        sub.add_argument('--no-cache', action='store_true', help='Bypass the columnar ingest cache')
+        sub.add_argument('--memory-limit-mb', type=float, default=None,
+                         help='Stream the workbook in batches under this memory ceiling')
+        sub.add_argument('--compact', action='store_true',
+                         help='Load non-empty columns only, with compact dtypes')
+        sub.set_defaults(func=func)
+        return sub
+
+    workbook_command('summary', cmd_summary, 'Dataset overview')
+
+    party = workbook_command('party', cmd_party, 'Killings by ruling party')
+    party.add_argument('country', nargs='?', choices=('india', 'bangladesh', 'both'), default='both')
+    party.add_argument('--save', action='store_true', help='Also save the charts')
+    party.add_argument('--output-dir', default='plots', help='Directory for saved charts')
+
+    trend = workbook_command('trend', cmd_trend, 'Yearly trend')
+    trend.add_argument('--save', action='store_true', help='Also save the chart')
+    trend.add_argument('--output-dir', default='plots', help='Directory for saved charts')
+    trend.add_argument('--band', type=float, metavar='LEVEL', default=None,
+                       help='Bootstrap confidence band, slope interval and permutation p-value, e.g. 0.95')
+    trend.add_argument('--segments', choices=sorted(TREND_SEGMENTS), default=None,
+                       help='Also fit one trend per government term of this country')
+    trend.add_argument('--window', type=int, default=None, help='Report N-year rolling slopes')
+    trend.add_argument('--resamples', type=int, default=2000,
+                       help='Bootstrap/permutation resamples for --band')
+
+    slices = workbook_command('slices', cmd_slices, 'Party charts for several year ranges')
+    slices.add_argument('periods', nargs='*', type=_year_range, metavar='FIRST-LAST')
+    slices.add_argument('--every', type=int, default=None, help='Also slice the whole span into N-year ranges')
+    slices.add_argument('--format', nargs='+', default=['png'], help='Output formats, e.g. png svg')
+    slices.add_argument('--dpi', type=int, default=150, help='Resolution of the images')
+    slices.add_argument('--thumbnails', action='store_true', help='Also write small .thumb.png previews')
+    slices.add_argument('--output-dir', default='plots/slices', help='Directory for the charts')
+
+    report = workbook_command('report', cmd_report, 'Comprehensive report with charts')
+    report.add_argument('--output-dir', default='plots', help='Directory for saved charts')
+    report.add_argument('--dpi', type=int, default=300, help='Resolution of saved charts')
+    report.add_argument('--profile', metavar='PATH', help='Write per-stage timing spans to PATH')
+    report.add_argument('--append', metavar='PATH', help='Add the new years in this .xlsx/.csv first')
+
+    map_cmd = subparsers.add_parser('map', help='Interactive incident map and trend chart')
+    map_cmd.add_argument('--locations', default=None, help='Path to border_killing_locations.json')
+    map_cmd.add_argument('--output-dir', default=str(PROJECT_ROOT / 'docs'))
+    map_cmd.add_argument('--no-inline-map', action='store_true')
+    map_cmd.add_argument('--append', metavar='PATH',
+                         help='Add new incidents/yearly_stats from this file and refresh only what changes')
+    map_cmd.set_defaults(func=cmd_map)
+
+    models = subparsers.add_parser('models', help='Model comparison data for the dashboard')
+    models.add_argument('--output', default=None, help='Path of the JSON output')
+    models.add_argument('--compact', action='store_true', help='Also write the compact layout')
+    models.set_defaults(func=cmd_models)
+    return parser
+
+
+def main(argv=None):
+    """Dispatch to the requested subcommand"""
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Compact Frames - Smallest faithful dtypes for workbook tables
+Text columns become categoricals and whole-number columns the narrowest
+integer type that holds their range (nullable when values are missing);
+empty columns are dropped while the sheet is streamed, and footprint
+reports show what every column costs
+"""
+
+import numpy as np
+import pandas as pd
+
+# Candidate integer types, narrowest first
+_UNSIGNED = (np.uint8, np.uint16, np.uint32, np.uint64)
+_SIGNED = (np.int8, np.int16, np.int32, np.int64)
+
+
+def smallest_int_dtype(minimum, maximum):
+    """Narrowest numpy integer dtype covering [minimum, maximum]"""
+    candidates = _UNSIGNED if minimum >= 0 else _SIGNED
+    for dtype in candidates:
+        info = np.iinfo(dtype)
+        if info.min <= minimum and maximum <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def compact_numeric(values, stats=None):
+    """Downcast whole-number values; other numerics are returned unchanged
+
+    `stats` (min/max/count from the ingest cache manifest) avoids a scan
+    for integer columns. Float columns qualify only if every present value
+    is integral; they become pandas nullable integers when values are missing.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in 'iu':
+        if len(values) == 0:
+            return values
+        lo, hi = (stats['min'], stats['max']) if stats else (values.min(), values.max())
+        return values.astype(smallest_int_dtype(lo, hi), copy=False)
+    if values.dtype.kind != 'f':
+        return values
+
+    present = ~np.isnan(values)
+    valid = values[present]
+    if len(valid) == 0 or not np.array_equal(valid, np.floor(valid)):
+        return values
+    dtype = smallest_int_dtype(valid.min(), valid.max())
+    if present.all():
+        return values.astype(dtype)
+    # Nullable extension dtype names are capitalized numpy names ('UInt16', 'Int8', ...)
+    nullable = pd.array(np.where(present, values, 0).astype(dtype), dtype=dtype.name.replace('u', 'U').replace('i', 'I', 1))
+    nullable[~present] = pd.NA
+    return nullable
+
+
+def compact_frame(frame, text_as_category=True):
+    """Copy of `frame` without all-empty columns and with compact dtypes"""
+    columns = {}
+    for name in frame.columns:
+        series = frame[name]
+        if series.isna().all():
+            continue
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            columns[name] = compact_numeric(series.to_numpy())
+        elif text_as_category and (series.dtype == object or pd.api.types.is_string_dtype(series)):
+            columns[name] = pd.Categorical(series)
+        else:
+            columns[name] = series.to_numpy()
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def read_excel_compact(path, sheet_name=0):
+    """Stream a worksheet, keep only columns holding a value, return compact_frame
+
+    Rows are held sparsely while reading, so the thousands of blank (or
+    placeholder-headed) columns of an exported sheet are never materialized.
+    Cells are parsed by pandas' TextParser with the header row, as
+    pd.read_excel does, so names, NA markers and dtypes match it.
+    """
+    from openpyxl import load_workbook
+    from pandas.io.parsers import TextParser
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, ())
+        used = set()
+        sparse_rows = []
+        for row in rows:
+            cells = {i: value for i, value in enumerate(row) if value is not None}
+            if cells:
+                used.update(cells)
+                sparse_rows.append(cells)
+    finally:
+        workbook.close()
+
+    positions = sorted(used)
+    names = [header[i] if i < len(header) else None for i in positions]
+    table = [['' if name is None else name for name in names]]
+    table += [[cells.get(i) for i in positions] for cells in sparse_rows]
+    frame = TextParser(table, header=0).read()
+    # Blank headers get read_excel's positional 'Unnamed: N' names
+    frame.columns = [f'Unnamed: {i}' if name == '' or str(name).startswith('Unnamed:') else name
+                     for i, name in zip(positions, frame.columns)]
+    return compact_frame(frame)
+
+
+def memory_footprint(frame):
+    """Per-column dtype and bytes (deep, index excluded) as a DataFrame"""
+    usage = frame.memory_usage(deep=True, index=False)
+    return pd.DataFrame({'dtype': frame.dtypes.astype(str), 'bytes': usage})
+
+
+def format_footprint(frame):
+    """One-line total plus the heaviest columns, for load-time reporting"""
+    report = memory_footprint(frame)
+    total = report['bytes'].sum()
+    top = report.sort_values('bytes', ascending=False).head(3)
+    heaviest = ', '.join(f"{name} {row['dtype']} {row['bytes'] / 1024:.1f} KB" for name, row in top.iterrows())
+    return f"Memory footprint: {total / 1024:.1f} KB in {len(report)} columns (largest: {heaviest})"
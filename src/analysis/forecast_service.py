@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Forecast Service - Warm forecasting models behind an in-process and HTTP batch API
+Fitted models are kept in an LRU cache keyed by series hash and model
+config. A batch fits each (series, model) pair once and slices all
+requested horizons from one forecast. Appending a year's observation updates
+a warm model in place (ARIMA state append, ETS re-filter with the fitted
+parameters) instead of re-estimating it on the full history
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+try:
+    from .backtesting import BASELINE_MODELS, STATSMODELS_MODELS, baseline_forecasts, fit_model, load_yearly_series
+    from .lstm_forecast import torch_available
+    from .result_cache import ResultCache
+except ImportError:
+    from backtesting import BASELINE_MODELS, STATSMODELS_MODELS, baseline_forecasts, fit_model, load_yearly_series
+    from lstm_forecast import torch_available
+    from result_cache import ResultCache
+
+DEFAULT_MODEL_CACHE_SIZE = 64
+# Incremental updates in a row before a model is re-estimated on its full history
+DEFAULT_REFIT_EVERY = 5
+# A request series this many points longer than a warm one is served by extending it
+MAX_APPEND_LOOKBACK = 3
+DEFAULT_PORT = 8765
+# Shortest series a request may forecast from (the trend baselines need two points)
+MIN_SERIES_LENGTH = 2
+DEFAULT_SERIES = 'border_killings'
+
+
+def default_models():
+    """name -> (kind, params) of every model the service offers"""
+    models = {name: ('baseline', {'name': name}) for name in BASELINE_MODELS}
+    models.update(STATSMODELS_MODELS)
+    if torch_available():
+        models['LSTM'] = ('lstm', {'horizon': 3})
+    return models
+
+
+def series_hash(values):
+    """Content hash of a series (as float64)"""
+    return hashlib.sha256(np.ascontiguousarray(values, dtype=np.float64).tobytes()).hexdigest()
+
+
+def config_key(kind, params):
+    return json.dumps([kind, params], sort_keys=True)
+
+
+def as_series(values):
+    """float64 array of a request series; ValueError unless it is long enough and finite"""
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim != 1 or len(values) < MIN_SERIES_LENGTH:
+        raise ValueError(f"A series must be a list of at least {MIN_SERIES_LENGTH} numbers")
+    if not np.isfinite(values).all():
+        raise ValueError("Series values must be finite numbers")
+    return values
+
+
+def parse_horizons(value):
+    """Positive int horizons from one int or a list of them; anything else raises ValueError"""
+    horizons = list(value) if isinstance(value, (list, tuple)) else [value]
+    if not horizons or not all(isinstance(h, (int, np.integer)) and not isinstance(h, bool) for h in horizons):
+        raise ValueError(f"horizon must be a positive integer or a list of them, got {value!r}")
+    horizons = [int(h) for h in horizons]
+    if min(horizons) < 1:
+        raise ValueError("Horizons must be positive integers")
+    return horizons
+
+
+class _BaselineModel:
+    """Closed-form baseline: forecasting recomputes it from the (cheap) history"""
+
+    def __init__(self, name, values):
+        self.name = name
+        self.values = values
+
+    def forecast(self, steps):
+        return baseline_forecasts(self.values, [len(self.values)], steps)[self.name][0]
+
+
+def _refilter_ets(fitted, values, params):
+    """ETS over the extended series with the fitted smoothing parameters and initial states"""
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+    p = fitted.params
+    known = {'initialization_method': 'known', 'initial_level': p['initial_level']}
+    if params.get('trend'):
+        known['initial_trend'] = p['initial_trend']
+    if params.get('seasonal'):
+        known['initial_seasonal'] = p['initial_seasons']
+    smoothing = {name: p[name] for name in ('smoothing_level', 'smoothing_trend', 'smoothing_seasonal',
+                                            'damping_trend') if p.get(name) is not None and not np.isnan(p[name])}
+    return ExponentialSmoothing(values, **params, **known).fit(optimized=False, **smoothing)
+
+
+class WarmModel:
+    """A fitted model, the series it was fitted on and how many points were added since"""
+
+    def __init__(self, kind, params, values):
+        self.kind = kind
+        self.params = params
+        self.values = np.asarray(values, dtype=np.float64)
+        self.updates = 0
+        self.fitted = self._fit(self.values)
+
+    def _fit(self, values):
+        if self.kind == 'baseline':
+            return _BaselineModel(self.params['name'], values)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            return fit_model(self.kind, self.params, values)
+
+    def extend(self, new_values, refit_every=DEFAULT_REFIT_EVERY):
+        """Add observations, updating the fitted state without re-estimating where possible"""
+        new_values = np.asarray(new_values, dtype=np.float64)
+        self.values = np.concatenate((self.values, new_values))
+        self.updates += 1
+        if self.updates >= refit_every:
+            self.fitted, self.updates = self._fit(self.values), 0
+            return self
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            if self.kind == 'baseline':
+                self.fitted = _BaselineModel(self.params['name'], self.values)
+            elif self.kind == 'arima':
+                self.fitted = self.fitted.append(new_values, refit=False)
+            elif self.kind == 'ets':
+                self.fitted = _refilter_ets(self.fitted, self.values, self.params)
+            elif self.kind == 'lstm':
+                self.fitted.append(new_values)
+            else:
+                self.fitted, self.updates = self._fit(self.values), 0
+        return self
+
+    def forecast(self, steps):
+        return np.asarray(self.fitted.forecast(steps), dtype=np.float64)
+
+
+class ForecastService:
+    """Named series and warm models answering batched forecast requests
+
+    A request is a dict with the series (`series`: values, or `series_id` of
+    a registered series), the model (`model`: a name from `models`, or
+    `kind` and `params`) and `horizon`: one int or a list of them.
+    """
+
+    def __init__(self, models=None, cache_size=DEFAULT_MODEL_CACHE_SIZE, refit_every=DEFAULT_REFIT_EVERY):
+        self.models = dict(default_models() if models is None else models)
+        self.cache = ResultCache(cache_size)
+        self.refit_every = refit_every
+        self.series = {}
+        self.fits = 0
+        self.extensions = 0
+        # Fitted models are not thread-safe; HTTP handler threads take turns
+        self._lock = threading.RLock()
+
+    def register(self, series_id, values):
+        """Store (or replace) a named series"""
+        values = as_series(values)
+        with self._lock:
+            self.series[series_id] = values
+        return len(self.series[series_id])
+
+    def append(self, series_id, values):
+        """Append observations to a named series and extend its warm models in place"""
+        with self._lock:
+            if series_id not in self.series:
+                raise KeyError(f"Unknown series: {series_id}")
+            old = self.series[series_id]
+            new_values = np.atleast_1d(np.asarray(values, dtype=np.float64))
+            self.series[series_id] = np.concatenate((old, new_values))
+            old_hash, new_hash = series_hash(old), series_hash(self.series[series_id])
+            for (hash_, config), model in self.cache.items():
+                if hash_ == old_hash:
+                    # Models are extended in place, so the old key must not serve them any more
+                    self.cache.pop((hash_, config))
+                    self.cache.put((new_hash, config), model.extend(new_values, self.refit_every))
+                    self.extensions += 1
+            return len(self.series[series_id])
+
+    def _model_spec(self, request):
+        if 'kind' in request:
+            return request['kind'], request.get('params', {})
+        name = request.get('model')
+        if name not in self.models:
+            raise ValueError(f"Unknown model: {name}")
+        return self.models[name]
+
+    def _series_values(self, request):
+        if 'series_id' in request:
+            if request['series_id'] not in self.series:
+                raise KeyError(f"Unknown series: {request['series_id']}")
+            return self.series[request['series_id']]
+        if 'series' not in request:
+            raise ValueError("A request needs `series` values or a `series_id`")
+        return as_series(request['series'])
+
+    def warm_model(self, values, kind, params):
+        """The cached model for (values, config); extends a model of a shorter prefix, else fits"""
+        config = config_key(kind, params)
+        key = (series_hash(values), config)
+        model = self.cache.get(key)
+        if model is not None:
+            return model
+        for k in range(1, min(MAX_APPEND_LOOKBACK, len(values) - 1) + 1):
+            prefix = self.cache.pop((series_hash(values[:-k]), config))
+            if prefix is not None:
+                # The prefix's model is extended in place and moves to the new key
+                model = prefix.extend(values[-k:], self.refit_every)
+                self.extensions += 1
+                break
+        else:
+            model = WarmModel(kind, params, values)
+            self.fits += 1
+        self.cache.put(key, model)
+        return model
+
+    def predict(self, requests):
+        """Answer a batch; each (series, model) pair is fitted or looked up once"""
+        with self._lock:
+            results = []
+            for request in requests:
+                values = self._series_values(request)
+                kind, params = self._model_spec(request)
+                horizons = parse_horizons(request.get('horizon', 1))
+                forecast = self.warm_model(values, kind, params).forecast(max(horizons))
+                results.append({
+                    'model': request.get('model', kind),
+                    'n_obs': len(values),
+                    'forecasts': {str(h): [None if np.isnan(v) else float(v) for v in forecast[:h]]
+                                  for h in horizons},
+                })
+            return results
+
+    def forecast(self, values, model, horizon):
+        """Single forecast as an array"""
+        result = self.predict([{'series': values, 'model': model, 'horizon': horizon}])[0]
+        return np.array(result['forecasts'][str(horizon)], dtype=np.float64)
+
+    def info(self):
+        """Cache counters, fits and in-place extensions so far, and registered series"""
+        return {'cache': self.cache.info(), 'fits': self.fits, 'extensions': self.extensions,
+                'series': {name: len(values) for name, values in self.series.items()},
+                'models': list(self.models)}
+
+
+def make_handler(service):
+    """HTTP handler class serving `service`
+
+    GET  /health, /models, /info
+    POST /forecast                {"requests": [...]} or one request
+    POST /series/<id>             {"values": [...]} registers a series
+    POST /series/<id>/append      {"values": [...]} appends observations
+    """
+
+    class ForecastHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(length) or b'{}')
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send(200, {'status': 'ok'})
+            elif self.path == '/models':
+                self._send(200, {'models': list(service.models)})
+            elif self.path == '/info':
+                self._send(200, service.info())
+            else:
+                self._send(404, {'error': f'Unknown path: {self.path}'})
+
+        def do_POST(self):
+            parts = [p for p in self.path.split('/') if p]
+            try:
+                body = self._body()
+                if parts == ['forecast']:
+                    requests = body['requests'] if 'requests' in body else [body]
+                    self._send(200, {'results': service.predict(requests)})
+                elif len(parts) == 2 and parts[0] == 'series':
+                    self._send(200, {'series_id': parts[1], 'n_obs': service.register(parts[1], body['values'])})
+                elif len(parts) == 3 and parts[0] == 'series' and parts[2] == 'append':
+                    self._send(200, {'series_id': parts[1], 'n_obs': service.append(parts[1], body['values'])})
+                else:
+                    self._send(404, {'error': f'Unknown path: {self.path}'})
+            except (ValueError, KeyError, TypeError) as e:
+                self._send(400, {'error': str(e)})
+            except Exception as e:
+                # e.g. a model that cannot be fitted to the series; answer rather than drop the connection
+                self._send(500, {'error': f"{type(e).__name__}: {e}"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ForecastHandler
+
+
+def serve(service, host='127.0.0.1', port=DEFAULT_PORT):
+    """Serve the HTTP API until interrupted"""
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"Forecast service on http://{host}:{server.server_address[1]} "
+          f"(series: {', '.join(service.series) or 'none'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    """Serve forecasts of the yearly killings series, or print them once"""
+    parser = argparse.ArgumentParser(description='Forecasting service with warm models and a batch API')
+    parser.add_argument('--data', default=None, help='Path to border-inc.xlsx')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MODEL_CACHE_SIZE, help='Warm models kept')
+    parser.add_argument('--refit-every', type=int, default=DEFAULT_REFIT_EVERY,
+                        help='Appends absorbed in place before a full re-estimation')
+    parser.add_argument('--print', type=int, metavar='HORIZON', dest='print_horizon',
+                        help='Print every model\'s forecast and exit instead of serving')
+    args = parser.parse_args(argv)
+
+    service = ForecastService(cache_size=args.cache_size, refit_every=args.refit_every)
+    service.register(DEFAULT_SERIES, load_yearly_series(args.data).to_numpy())
+    if args.print_horizon:
+        results = service.predict([{'series_id': DEFAULT_SERIES, 'model': name, 'horizon': args.print_horizon}
+                                   for name in service.models])
+        for result in results:
+            values = result['forecasts'][str(args.print_horizon)]
+            print(f"{result['model']:>18}: " + ', '.join('nan' if v is None else f'{v:.1f}' for v in values))
+        return
+    serve(service, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,96 +1,195 @@
+#!/usr/bin/env python3
+"""
+Interactive Visualizations - Plotly map and trend chart of recent incidents
+Builds docs/border_killing_map.html and docs/border_killing_trend.html from
+data/border_killing_locations.json, plus a tiled map that scales to full
+incident histories. New incidents and yearly stats can be appended without
+regenerating the outputs they do not change
+"""
+
+import argparse
+import os
+from pathlib import Path
 
-import json
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-import os
 
-# Load data
-data_path = 'data/border_killing_locations.json'
-with open(data_path, 'r') as f:
-    data = json.load(f)
-
-# Ensure docs directory exists
-if not os.path.exists('docs'):
-    os.makedirs('docs')
-
-# --- 1. Enhanced Map of Incidents ---
-incidents = data['incidents']
-df_incidents = pd.DataFrame(incidents)
-
-# Extract year for color coding
-df_incidents['Year'] = pd.to_datetime(df_incidents['date']).dt.year.astype(str)
-
-fig_map = px.scatter_mapbox(
-    df_incidents,
-    lat="lat",
-    lon="lon",
-    color="Year",
-    hover_name="name",
-    hover_data={
-        "date": True, 
-        "location": True, 
-        "description": True, 
-        "lat": False, 
-        "lon": False,
-        "Year": False
-    },
-    color_discrete_sequence=px.colors.qualitative.Bold, # Vivid colors
-    zoom=6,
-    height=600,
-    title="<b>Recent Border Killing Incidents (2022-2024)</b>"
-)
-
-fig_map.update_traces(marker=dict(size=14, opacity=0.8)) # Larger, semi-transparent markers
-
-fig_map.update_layout(
-    mapbox_style="carto-positron", # Cleaner, high-contrast map style
-    margin={"r":0,"t":50,"l":0,"b":0},
-    title_x=0.5,
-    title_font_size=20,
-    legend_title_text='Year',
-    legend=dict(
-        yanchor="top",
-        y=0.99,
-        xanchor="left",
-        x=0.01,
-        bgcolor="rgba(255, 255, 255, 0.9)"
+try:
+    from .incident_loader import INCIDENTS_KEY, incident_frame, iter_incidents, load_locations as stream_locations
+    from .incremental import STATS_KEY, append_locations_file, read_locations_delta
+    from .spatial_tiles import update_tiles, write_tiled_map
+except ImportError:
+    from incident_loader import INCIDENTS_KEY, incident_frame, iter_incidents, load_locations as stream_locations
+    from incremental import STATS_KEY, append_locations_file, read_locations_delta
+    from spatial_tiles import update_tiles, write_tiled_map
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_DATA_PATH = PROJECT_ROOT / 'data' / 'border_killing_locations.json'
+DEFAULT_OUTPUT_DIR = PROJECT_ROOT / 'docs'
+MAP_FILENAME = 'border_killing_map.html'
+TREND_FILENAME = 'border_killing_trend.html'
+
+
+def load_locations(data_path=DEFAULT_DATA_PATH):
+    """Load the incidents/yearly_stats document (.json or .jsonl)
+
+    Incidents are streamed into a typed DataFrame instead of a list of dicts.
+    """
+    return stream_locations(data_path)
+
+
+def build_incident_map(incidents):
+    """Enhanced map of incidents"""
+    df_incidents = incidents if isinstance(incidents, pd.DataFrame) else pd.DataFrame(incidents)
+    dates = pd.to_datetime(df_incidents['date'])
+
+    # Extract year for color coding; hover shows the plain date
+    df_incidents = df_incidents.assign(Year=dates.dt.year.astype(str),
+                                       date=dates.dt.strftime('%Y-%m-%d'))
+
+    fig_map = px.scatter_mapbox(
+        df_incidents,
+        lat="lat",
+        lon="lon",
+        color="Year",
+        hover_name="name",
+        hover_data={
+            "date": True, 
+            "location": True, 
+            "description": True, 
+            "lat": False, 
+            "lon": False,
+            "Year": False
+        },
+        color_discrete_sequence=px.colors.qualitative.Bold, # Vivid colors
+        zoom=6,
+        height=600,
+        title="<b>Recent Border Killing Incidents (2022-2024)</b>"
     )
-)
-
-map_output_path = 'docs/border_killing_map.html'
-fig_map.write_html(map_output_path)
-print(f"Enhanced map saved to {map_output_path}")
-
-# --- 2. Enhanced Trend Chart ---
-stats = data['yearly_stats']
-df_stats = pd.DataFrame(stats)
-
-# Highlight 2024
-colors = ['#EF553B' if x == 2024 else '#636EFA' for x in df_stats['year']]
-
-fig_trend = go.Figure()
-
-fig_trend.add_trace(go.Bar(
-    x=df_stats['year'],
-    y=df_stats['killed'],
-    text=df_stats['killed'],
-    textposition='auto',
-    marker_color=df_stats['killed'], # Gradient color based on value
-    marker=dict(colorscale='Reds')   # Red gradient
-))
-
-fig_trend.update_layout(
-    title="<b>Border Killing Trends (2013-2024)</b>",
-    title_x=0.5,
-    xaxis_title="Year",
-    yaxis_title="Number of Deaths",
-    xaxis=dict(type='category'),
-    template="plotly_white",
-    margin={"r":20,"t":60,"l":20,"b":20},
-    hovermode="x unified"
-)
-
-trend_output_path = 'docs/border_killing_trend.html'
-fig_trend.write_html(trend_output_path)
-print(f"Enhanced trend chart saved to {trend_output_path}")
+
+    fig_map.update_traces(marker=dict(size=14, opacity=0.8)) # Larger, semi-transparent markers
+
+    fig_map.update_layout(
+        mapbox_style="carto-positron", # Cleaner, high-contrast map style
+        margin={"r":0,"t":50,"l":0,"b":0},
+        title_x=0.5,
+        title_font_size=20,
+        legend_title_text='Year',
+        legend=dict(
+            yanchor="top",
+            y=0.99,
+            xanchor="left",
+            x=0.01,
+            bgcolor="rgba(255, 255, 255, 0.9)"
+        )
+    )
+
+    return fig_map
+
+
+def build_trend_chart(stats):
+    """Enhanced trend chart of yearly deaths"""
+    df_stats = pd.DataFrame(stats)
+
+    # Highlight 2024
+    colors = ['#EF553B' if x == 2024 else '#636EFA' for x in df_stats['year']]
+
+    fig_trend = go.Figure()
+
+    fig_trend.add_trace(go.Bar(
+        x=df_stats['year'],
+        y=df_stats['killed'],
+        text=df_stats['killed'],
+        textposition='auto',
+        marker_color=df_stats['killed'], # Gradient color based on value
+        marker=dict(colorscale='Reds')   # Red gradient
+    ))
+
+    fig_trend.update_layout(
+        title="<b>Border Killing Trends (2013-2024)</b>",
+        title_x=0.5,
+        xaxis_title="Year",
+        yaxis_title="Number of Deaths",
+        xaxis=dict(type='category'),
+        template="plotly_white",
+        margin={"r":20,"t":60,"l":20,"b":20},
+        hovermode="x unified"
+    )
+
+    return fig_trend
+
+
+def write_map(data, output_dir=DEFAULT_OUTPUT_DIR):
+    """Write the incident map HTML and return its path"""
+    os.makedirs(output_dir, exist_ok=True)
+    map_output_path = os.path.join(output_dir, MAP_FILENAME)
+    build_incident_map(data['incidents']).write_html(map_output_path)
+    print(f"Enhanced map saved to {map_output_path}")
+    return map_output_path
+
+
+def write_trend(data, output_dir=DEFAULT_OUTPUT_DIR):
+    """Write the yearly trend HTML and return its path"""
+    os.makedirs(output_dir, exist_ok=True)
+    trend_output_path = os.path.join(output_dir, TREND_FILENAME)
+    build_trend_chart(data['yearly_stats']).write_html(trend_output_path)
+    print(f"Enhanced trend chart saved to {trend_output_path}")
+    return trend_output_path
+
+
+def write_tiles_map(data, output_dir=DEFAULT_OUTPUT_DIR):
+    """Write the viewport-tiled incident map and return its path"""
+    os.makedirs(output_dir, exist_ok=True)
+    return write_tiled_map(data['incidents'], output_dir)
+
+
+def append_locations(delta, data_path=DEFAULT_DATA_PATH, output_dir=DEFAULT_OUTPUT_DIR, inline_map=True):
+    """Add new incidents and yearly stats to the locations file and refresh what they change
+
+    delta is a dict like the locations document or a .json/.jsonl path.
+    It is checked against the recorded incidents (by name and date) and
+    years (see incremental.py): repeats are skipped, conflicts raise
+    ValueError. New incidents rewrite only the tiles that contain them,
+    built from the incidents streamed out of those tiles; new yearly stats
+    rewrite the trend chart. The inline Plotly map embeds every incident,
+    so unless inline_map is False (--no-inline-map) it is still
+    regenerated in full. Returns the new records per list.
+    """
+    data, added = append_locations_file(data_path, read_locations_delta(delta))
+    if added[INCIDENTS_KEY]:
+        if inline_map:
+            write_map(load_locations(data_path), output_dir)
+        update_tiles(iter_incidents(data_path), incident_frame(added[INCIDENTS_KEY]), output_dir)
+    if added[STATS_KEY]:
+        write_trend(data, output_dir)
+    print(f"Appended {len(added[INCIDENTS_KEY])} incidents and {len(added[STATS_KEY])} yearly stats to {data_path}")
+    return added
+
+
+def main(argv=None):
+    """Generate both interactive visualizations"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data', default=str(DEFAULT_DATA_PATH),
+                        help='Path to border_killing_locations.json')
+    parser.add_argument('--output-dir', default=str(DEFAULT_OUTPUT_DIR),
+                        help='Directory for the generated HTML files')
+    parser.add_argument('--no-inline-map', action='store_true',
+                        help='Only write the tiled map, not the single-file Plotly map')
+    parser.add_argument('--append', metavar='PATH',
+                        help='Add the incidents/yearly_stats in this .json/.jsonl to --data and '
+                             'refresh only the outputs they change')
+    args = parser.parse_args(argv)
+
+    if args.append:
+        append_locations(args.append, args.data, args.output_dir, inline_map=not args.no_inline_map)
+        return
+    data = load_locations(args.data)
+    if not args.no_inline_map:
+        write_map(data, args.output_dir)
+    write_tiles_map(data, args.output_dir)
+    write_trend(data, args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
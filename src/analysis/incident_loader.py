@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Incident Loader - Streaming reader for incident location datasets
+Decodes the `incidents` array of border_killing_locations.json (or one
+incident per line in a .jsonl file) record by record straight into typed
+column buffers, so the full list of dicts is never materialized
+"""
+
+import json
+from array import array
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+READ_CHUNK_SIZE = 1 << 16
+INCIDENTS_KEY = 'incidents'
+TEXT_FIELDS = ('name', 'description')
+JSON_LINES_SUFFIXES = ('.jsonl', '.ndjson')
+_NAT = np.iinfo(np.int64).min
+# Longest token the decoder rejects only because a chunk cut it off ('-Infinity')
+_PARTIAL_TOKEN_CHARS = len('-Infinity')
+
+
+class _StreamReader:
+    """Chunked text buffer that decodes one JSON value at a time"""
+
+    def __init__(self, f, chunk_size=READ_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character ('' at end of input)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars):
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self.pos}, found {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the next complete JSON value, refilling until it fits"""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # A value cut off at the buffer edge fails within a token of the end
+                # (strings report where they start); an earlier error is real
+                cut_off = (len(self.buffer) - e.pos <= _PARTIAL_TOKEN_CHARS
+                           or e.msg.startswith('Unterminated string'))
+                if not cut_off or not self._fill():
+                    raise
+                continue
+            # A number ending exactly at the buffer edge may continue in the next chunk
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def _iter_array(reader):
+    """Yield the items of the array starting at the reader position"""
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(',]') == ']':
+            return
+
+
+def iter_incidents(path, extras=None):
+    """Yield incident dicts one at a time
+
+    For a JSON document only the `incidents` array is streamed; the other
+    top-level values (e.g. yearly_stats) are small and are stored in
+    `extras` when a dict is passed.
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix in JSON_LINES_SUFFIXES:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        reader = _StreamReader(f)
+        if reader.peek() == '[':  # a bare array of incidents
+            yield from _iter_array(reader)
+            return
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            key = reader.value()
+            reader.expect(':')
+            if key == INCIDENTS_KEY:
+                yield from _iter_array(reader)
+            else:
+                value = reader.value()
+                if extras is not None:
+                    extras[key] = value
+            if reader.expect(',}') == '}':
+                return
+
+
+class IncidentColumns:
+    """Append-only typed buffers for incident records
+
+    lat/lon are float64, dates are datetime64[D] stored as int64 days and
+    locations are integer codes into a shared category table.
+    """
+
+    def __init__(self, text_fields=TEXT_FIELDS):
+        self.lat = array('d')
+        self.lon = array('d')
+        self.date = array('q')
+        self.location_codes = array('i')
+        self.location_categories = {}
+        self._day_cache = {}  # incident dates repeat heavily; parse each string once
+        self.text = {field: [] for field in text_fields}
+
+    def append(self, record):
+        lat, lon = record.get('lat'), record.get('lon')
+        self.lat.append(float('nan') if lat is None else float(lat))
+        self.lon.append(float('nan') if lon is None else float(lon))
+        self.date.append(self._day(record.get('date')))
+        location = record.get('location')
+        if location is None:
+            self.location_codes.append(-1)
+        else:
+            code = self.location_categories.setdefault(location, len(self.location_categories))
+            self.location_codes.append(code)
+        for field, values in self.text.items():
+            values.append(record.get(field))
+
+    def _day(self, date):
+        """Days since the epoch of an ISO date string (NaT sentinel if missing/invalid)"""
+        day = self._day_cache.get(date)
+        if day is None:
+            try:
+                day = int(np.datetime64(date, 'D').astype(np.int64)) if date else _NAT
+            except (ValueError, TypeError):
+                day = _NAT
+            if isinstance(date, str):
+                self._day_cache[date] = day
+        return day
+
+    def __len__(self):
+        return len(self.lat)
+
+    def to_frame(self):
+        """DataFrame of the records so far
+
+        The buffers are copied: a numpy view would pin them, and a later
+        append could no longer resize them (BufferError).
+        """
+        frame = pd.DataFrame({
+            'name': self.text.get('name', [None] * len(self)),
+            'date': np.frombuffer(self.date, dtype=np.int64).view('datetime64[D]').astype('datetime64[ns]'),
+            'location': pd.Categorical.from_codes(
+                np.array(self.location_codes, dtype=np.int32),
+                categories=list(self.location_categories)),
+            'lat': np.array(self.lat, dtype=np.float64),
+            'lon': np.array(self.lon, dtype=np.float64),
+        })
+        for field, values in self.text.items():
+            if field not in frame:
+                frame[field] = values
+        return frame
+
+
+def incident_frame(records):
+    """Typed incidents DataFrame from an iterable of incident dicts"""
+    columns = IncidentColumns()
+    for record in records:
+        columns.append(record)
+    return columns.to_frame()
+
+
+def load_incident_frame(path, extras=None):
+    """Stream a locations file into a typed incidents DataFrame"""
+    return incident_frame(iter_incidents(path, extras))
+
+
+def load_locations(path):
+    """The locations document with `incidents` as a typed DataFrame"""
+    data = {}
+    data[INCIDENTS_KEY] = load_incident_frame(path, extras=data)
+    return data
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Incremental Updates - Validate and merge new years or incidents into loaded data
+A delta (a new year of the workbook, or a few new incidents and yearly
+stats for the locations document) is checked against the records already
+there: exact repeats are dropped, so appending the same delta twice is a
+no-op, and records that disagree with an existing year or incident are
+rejected instead of overwriting it
+"""
+
+import itertools
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .incident_loader import INCIDENTS_KEY, JSON_LINES_SUFFIXES, iter_incidents
+    from .ingestion import canonical_frame
+except ImportError:
+    from incident_loader import INCIDENTS_KEY, JSON_LINES_SUFFIXES, iter_incidents
+    from ingestion import canonical_frame
+
+YEAR_KEY = 'Years'
+STATS_KEY = 'yearly_stats'
+
+
+def _same(a, b):
+    """Equal values, counting two missing values as equal"""
+    a_missing, b_missing = a is None or pd.isna(a), b is None or pd.isna(b)
+    if a_missing or b_missing:
+        return a_missing and b_missing
+    return bool(a == b)
+
+
+def read_table_delta(source):
+    """New workbook rows in the canonical schema, from a DataFrame or an .xlsx/.csv path"""
+    if isinstance(source, pd.DataFrame):
+        return canonical_frame(source)
+    path = Path(source)
+    frame = pd.read_csv(path) if path.suffix.lower() == '.csv' else pd.read_excel(path)
+    return canonical_frame(frame)
+
+
+def check_delta_keys(delta, key=YEAR_KEY):
+    """ValueError unless every delta row has a key and no key is listed twice"""
+    if key not in delta.columns:
+        raise ValueError(f"The delta has no {key!r} column")
+    if delta[key].isna().any():
+        raise ValueError(f"Every delta row needs a {key!r} value")
+    repeated = delta[key][delta[key].duplicated()]
+    if len(repeated):
+        raise ValueError(f"{key} listed more than once in the delta: {sorted(set(repeated.tolist()))}")
+
+
+def new_table_rows(existing, delta, key=YEAR_KEY):
+    """Rows of delta whose key is not in existing yet, sorted by key
+
+    Rows equal to the existing row with the same key are dropped. A delta
+    with non-empty columns the table does not have, or with a row that
+    differs from the existing one for its key, raises ValueError.
+    """
+    check_delta_keys(delta, key)
+    unknown = [c for c in delta.columns if c not in existing.columns]
+    if unknown:
+        raise ValueError(f"Columns not in the loaded table: {unknown}")
+    overlap = delta[key].isin(existing[key]).to_numpy()
+    if overlap.any():
+        current = existing.drop_duplicates(key).set_index(key)
+        conflicts = []
+        labels = delta[key].tolist()
+        for i in np.flatnonzero(overlap):
+            label = labels[i]
+            if not all(_same(delta[c].iloc[i], current.at[label, c]) for c in delta.columns if c != key):
+                conflicts.append(label)
+        if conflicts:
+            raise ValueError(f"{key} already loaded with different values: {conflicts}")
+    return delta[~overlap].sort_values(key, kind='stable').reset_index(drop=True)
+
+
+def append_rows(frame, rows):
+    """frame with rows appended, keeping frame's columns and, where the values fit, dtypes
+
+    Categorical columns gain any new labels as categories; numeric columns
+    keep their (possibly narrow) dtype unless a new value does not fit.
+    """
+    rows = rows.reindex(columns=frame.columns)
+    widened = {}
+    for column in frame.columns:
+        dtype = frame[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            new = pd.Index(rows[column].dropna().unique()).difference(dtype.categories)
+            if len(new):
+                widened[column] = frame[column].cat.add_categories(new)
+                dtype = widened[column].dtype
+            rows[column] = rows[column].astype(dtype)
+            continue
+        try:
+            cast = rows[column].astype(dtype)
+        except (ValueError, TypeError, OverflowError):
+            continue
+        if all(_same(a, b) for a, b in zip(cast, rows[column])):
+            rows[column] = cast
+    if widened:
+        frame = frame.assign(**widened)
+    return pd.concat([frame, rows], ignore_index=True)
+
+
+def _incident_key(record):
+    """(name, ISO date) identifying an incident"""
+    name, date = record.get('name'), record.get('date')
+    if not name or not date:
+        raise ValueError(f"Every incident needs a name and a date: {record}")
+    try:
+        day = str(np.datetime64(date, 'D'))
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid incident date: {date!r}") from None
+    return name.strip(), day
+
+
+def _stats_key(record):
+    if record.get('year') is None:
+        raise ValueError(f"Every yearly stat needs a year: {record}")
+    return int(record['year'])
+
+
+def _new_records(existing, records, key_of, what):
+    """Records whose key is not in existing; repeats are dropped, conflicts raise ValueError
+
+    existing is iterated once and only the records sharing a key with the
+    delta are compared, so it can be a stream over a large file.
+    """
+    delta = {}
+    for record in records:
+        key = key_of(record)
+        if key in delta:
+            raise ValueError(f"{what} listed more than once in the delta: {key}")
+        delta[key] = record
+    recorded, conflicts = set(), []
+    for current in existing:
+        key = key_of(current)
+        record = delta.get(key)
+        if record is None:
+            continue
+        recorded.add(key)
+        if not all(_same(current.get(f), record.get(f)) for f in set(current) | set(record)):
+            if key not in conflicts:
+                conflicts.append(key)
+    if conflicts:
+        raise ValueError(f"{what} already recorded with different values: {conflicts}")
+    return [record for key, record in delta.items() if key not in recorded]
+
+
+def new_incidents(existing, incidents):
+    """Incident dicts not recorded yet, matched to existing ones by (name, date)"""
+    return _new_records(existing, incidents, _incident_key, 'Incident')
+
+
+def new_yearly_stats(existing, stats):
+    """yearly_stats entries for years not recorded yet"""
+    return _new_records(existing, stats, _stats_key, 'Year')
+
+
+def read_locations_delta(source):
+    """Incidents and yearly stats of a delta: a dict like the locations document or a .json/.jsonl path"""
+    if isinstance(source, dict):
+        delta = dict(source)
+        delta[INCIDENTS_KEY] = list(delta.get(INCIDENTS_KEY, []))
+        return delta
+    delta = {}
+    delta[INCIDENTS_KEY] = list(iter_incidents(source, extras=delta))
+    return delta
+
+
+def _is_bare_array(path):
+    """Whether a .json locations file is a bare array of incidents"""
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            char = f.read(1)
+            if not char.isspace():
+                return char == '['
+
+
+def _indented(value, level):
+    """value as json.dump(indent=4) writes it nested `level` deep (first line unindented)"""
+    text = json.dumps(value, indent=4, ensure_ascii=False)
+    return text.replace('\n', '\n' + '    ' * level)
+
+
+def _write_array(f, items, level):
+    pad = '    ' * level
+    f.write('[')
+    empty = True
+    for item in items:
+        f.write(('\n' if empty else ',\n') + pad + '    ' + _indented(item, level + 1))
+        empty = False
+    f.write(']' if empty else '\n' + pad + ']')
+
+
+def _write_document(path, incidents, extras, bare):
+    """Write the locations document through a temporary file, streaming the incidents
+
+    The layout matches json.dump(indent=4) with the incidents first.
+    """
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        if bare:
+            _write_array(f, incidents, 0)
+        else:
+            f.write('{\n    ' + json.dumps(INCIDENTS_KEY) + ': ')
+            _write_array(f, incidents, 1)
+            for key, value in extras.items():
+                f.write(',\n    ' + json.dumps(key, ensure_ascii=False) + ': ' + _indented(value, 1))
+            f.write('\n}')
+    os.replace(tmp, path)
+
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as f:
+        if not f.seek(0, os.SEEK_END):
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+def append_locations_file(path, delta):
+    """Validate a locations delta against the file at path and append what is new
+
+    The recorded incidents are streamed with iter_incidents, never loaded
+    as a whole. Returns the document's other top-level values (yearly
+    stats merged) and the new records per list. A .json document is
+    rewritten atomically, streaming the old incidents across; a .jsonl
+    file only gets the new incident lines appended, so it cannot take
+    yearly stats.
+    """
+    path = Path(path)
+    unknown = [k for k in delta if k not in (INCIDENTS_KEY, STATS_KEY)]
+    if unknown:
+        raise ValueError(f"Unknown keys in the delta: {unknown}")
+    lines = path.suffix in JSON_LINES_SUFFIXES
+    bare = not lines and _is_bare_array(path)
+    extras = {}
+    added = {INCIDENTS_KEY: new_incidents(iter_incidents(path, extras), delta.get(INCIDENTS_KEY, []))}
+    added[STATS_KEY] = new_yearly_stats(extras.get(STATS_KEY, []), delta.get(STATS_KEY, []))
+    if added[STATS_KEY] and (bare or lines):
+        raise ValueError(f"{path} holds incidents only; it cannot store {STATS_KEY}")
+    if not any(added.values()):
+        return extras, added
+
+    if added[STATS_KEY]:
+        extras[STATS_KEY] = sorted(extras.get(STATS_KEY, []) + added[STATS_KEY], key=_stats_key)
+    if lines:
+        with open(path, 'a', encoding='utf-8') as f:
+            if not _ends_with_newline(path):
+                f.write('\n')
+            for record in added[INCIDENTS_KEY]:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    else:
+        _write_document(path, itertools.chain(iter_incidents(path), added[INCIDENTS_KEY]), extras, bare)
+    return extras, added
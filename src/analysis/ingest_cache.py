@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Columnar Ingest Cache - Parse a workbook once, memory-map it afterwards
+Converts Excel sheets into typed .npy column files keyed on the source file's
+size, mtime and content hash, so later loads skip openpyxl entirely. Per-column
+summary statistics live in the JSON manifest, readable without numpy. Each
+rebuild writes a new column directory and then swaps the manifest, so readers
+of the previous version keep valid files
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# numpy/pandas are imported inside the functions that touch column data, so
+# manifest-only readers (column_stats) start with the standard library alone
+CACHE_VERSION = 3
+MANIFEST_NAME = 'manifest.json'
+COLUMNS_DIR_PREFIX = 'cols-'
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def default_cache_dir(source_path):
+    """Return the cache directory used for a source file (next to the source)"""
+    source_path = Path(source_path)
+    return source_path.parent / '.cache' / source_path.stem
+
+
+def file_sha256(path):
+    """Compute the SHA-256 digest of a file without reading it all at once"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path):
+    """Return the size, mtime and content hash identifying a source file"""
+    stat = os.stat(path)
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_sha256(path),
+    }
+
+
+def _normalize_options(read_options):
+    """Round-trip reader options through JSON so they compare like the manifest"""
+    return json.loads(json.dumps(read_options or {}, sort_keys=True, default=str))
+
+
+def _read_manifest(cache_dir):
+    """Read a cache manifest, returning None when it is missing or unreadable"""
+    try:
+        with open(Path(cache_dir) / MANIFEST_NAME, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != CACHE_VERSION:
+        return None
+    return manifest
+
+
+def _write_manifest(cache_dir, manifest):
+    """Write a manifest atomically so readers never see a partial file"""
+    manifest_path = Path(cache_dir) / MANIFEST_NAME
+    tmp_path = manifest_path.with_name(f'{MANIFEST_NAME}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+
+def get_valid_manifest(source_path, cache_dir=None, read_options=None):
+    """Return the manifest if the cache still matches the source, else None
+
+    Size and mtime are checked first; the content hash is only computed when
+    the mtime changed (e.g. after a checkout), and a matching hash refreshes
+    the stored mtime instead of forcing a re-parse.
+    """
+    source_path = Path(source_path)
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir(source_path)
+    manifest = _read_manifest(cache_dir)
+    if manifest is None:
+        return None
+    if manifest.get('read_options') != _normalize_options(read_options):
+        return None
+
+    stat = os.stat(source_path)
+    source = manifest['source']
+    if stat.st_size != source['size']:
+        return None
+    if stat.st_mtime_ns == source['mtime_ns']:
+        return manifest
+
+    if file_sha256(source_path) != source['sha256']:
+        return None
+    source['mtime_ns'] = stat.st_mtime_ns
+    try:
+        _write_manifest(cache_dir, manifest)
+    except OSError:
+        pass
+    return manifest
+
+
+def _numeric_stats(series):
+    """min/max/sum/count of the non-missing values as plain JSON numbers"""
+    valid = series.dropna()
+    as_python = int if series.dtype.kind in 'iub' else float
+    return {
+        'count': int(len(valid)),
+        'sum': as_python(valid.sum()),
+        'min': as_python(valid.min()),
+        'max': as_python(valid.max()),
+    }
+
+
+def column_stats(source_path, cache_dir=None, read_options=None):
+    """Cached per-column statistics, or None when the cache is stale
+
+    Only the manifest is read, so this needs neither numpy nor pandas.
+    Returns ({name: stats or None}, manifest); empty columns are left out.
+    """
+    source_path = Path(source_path)
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir(source_path)
+    manifest = get_valid_manifest(source_path, cache_dir, read_options)
+    if manifest is None:
+        return None, None
+    stats = {entry['name']: entry.get('stats') for entry in manifest['columns']
+             if entry['kind'] != 'empty'}
+    return stats, manifest
+
+
+def _object_kind(series):
+    """'categorical' for text, 'datetime' for timestamps, else 'mixed'"""
+    import pandas as pd
+
+    values = series.cat.categories if isinstance(series.dtype, pd.CategoricalDtype) else series
+    inferred = pd.api.types.infer_dtype(values, skipna=True)
+    if inferred == 'string':
+        return 'categorical'
+    if inferred in ('datetime', 'datetime64'):
+        return 'datetime'
+    return 'mixed'
+
+
+def _datetime_values(series):
+    """datetime64 array of a datetime column, tz-aware ones as naive UTC, and its time zone"""
+    import pandas as pd
+
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series = pd.to_datetime(series)
+    tz = getattr(series.dtype, 'tz', None)
+    if tz is not None:
+        series = series.dt.tz_convert('UTC').dt.tz_localize(None)
+    return series.to_numpy(), None if tz is None else str(tz)
+
+
+def _remove_stale_columns(cache_dir, keep):
+    """Delete column directories (and version 2 loose files) not named in keep"""
+    for path in cache_dir.glob(f'{COLUMNS_DIR_PREFIX}*'):
+        if path.is_dir() and path.name not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+    for old_file in cache_dir.glob('col_*.npy'):
+        try:
+            old_file.unlink()
+        except OSError:
+            pass
+
+
+def build_cache(frame, source_path, cache_dir=None, read_options=None):
+    """Store every column of a DataFrame as a typed .npy file
+
+    Numeric columns are saved as-is, datetime columns (including object
+    columns holding only timestamps) as datetime64, text columns as int32
+    codes plus a category table and all-empty columns only as manifest
+    entries. Object columns mixing other types are recorded as 'mixed'
+    without data, so read_excel_cached parses the workbook for them.
+
+    The files go to a fresh directory and the manifest is swapped in
+    atomically. Only the directories of the previous manifest and the new
+    one are kept, so a reader that has just read the old manifest still
+    finds its files.
+    """
+    import numpy as np
+    import pandas as pd
+
+    source_path = Path(source_path)
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir(source_path)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    previous = _read_manifest(cache_dir)
+    columns_dir = Path(tempfile.mkdtemp(prefix=COLUMNS_DIR_PREFIX, dir=cache_dir))
+
+    try:
+        columns = []
+        for i, name in enumerate(frame.columns):
+            series = frame[name]
+            entry = {'name': name, 'dtype': str(series.dtype)}
+            if series.isna().all():
+                entry['kind'] = 'empty'
+            elif pd.api.types.is_datetime64_any_dtype(series):
+                entry['kind'] = 'datetime'
+            elif pd.api.types.is_numeric_dtype(series):
+                entry['kind'] = 'numeric'
+            else:
+                entry['kind'] = _object_kind(series)
+
+            if entry['kind'] in ('empty', 'mixed'):
+                columns.append(entry)
+                continue
+            entry['file'] = f'col_{i:05d}.npy'
+            if entry['kind'] == 'numeric':
+                values = series.to_numpy()
+                entry['stats'] = _numeric_stats(series)
+            elif entry['kind'] == 'datetime':
+                values, tz = _datetime_values(series)
+                if tz is not None:
+                    entry['tz'] = tz
+            else:
+                codes, categories = pd.factorize(series)
+                entry['categories'] = [str(c) for c in categories]
+                values = codes.astype(np.int32)
+            np.save(columns_dir / entry['file'], values)
+            columns.append(entry)
+
+        manifest = {
+            'version': CACHE_VERSION,
+            'source': file_fingerprint(source_path),
+            'read_options': _normalize_options(read_options),
+            'n_rows': len(frame),
+            'columns_dir': columns_dir.name,
+            'columns': columns,
+        }
+        _write_manifest(cache_dir, manifest)
+    except BaseException:
+        shutil.rmtree(columns_dir, ignore_errors=True)
+        raise
+    _remove_stale_columns(cache_dir, {columns_dir.name, (previous or {}).get('columns_dir')})
+    return manifest
+
+
+def has_mixed_columns(manifest, columns=None):
+    """Whether any (selected) column was too mixed in type to cache"""
+    return any(e['kind'] == 'mixed' for e in manifest['columns']
+               if columns is None or e['name'] in columns)
+
+
+def _column_path(cache_dir, manifest, entry):
+    return Path(cache_dir) / manifest['columns_dir'] / entry['file']
+
+
+def load_columns(source_path, cache_dir=None, columns=None, read_options=None):
+    """Memory-map cached columns without importing pandas
+
+    Returns (manifest, {name: ndarray}) or (None, None) when the cache is
+    stale. Categorical columns come back as their int32 codes, datetime
+    columns as naive datetime64 (UTC for tz-aware ones); empty and mixed
+    columns are skipped.
+    """
+    import numpy as np
+
+    source_path = Path(source_path)
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir(source_path)
+    manifest = get_valid_manifest(source_path, cache_dir, read_options)
+    if manifest is None:
+        return None, None
+
+    arrays = {}
+    for entry in manifest['columns']:
+        if columns is not None and entry['name'] not in columns:
+            continue
+        if entry['kind'] in ('empty', 'mixed'):
+            continue
+        arrays[entry['name']] = np.load(_column_path(cache_dir, manifest, entry), mmap_mode='c')
+    return manifest, arrays
+
+
+def frame_from_cache(manifest, cache_dir, columns=None, compact=False):
+    """Rebuild a DataFrame from a valid cache manifest
+
+    With compact, empty columns are left out, text columns become
+    categoricals straight from the cached codes and whole-number columns
+    are narrowed using the manifest min/max, so no object column is built.
+    Mixed-type columns are not cached (see has_mixed_columns) and raise
+    ValueError when requested.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if compact:
+        try:
+            from .compact_frames import compact_numeric
+        except ImportError:
+            from compact_frames import compact_numeric
+
+    if has_mixed_columns(manifest, columns):
+        raise ValueError("The cache has mixed-type columns; read the source instead")
+    cache_dir = Path(cache_dir)
+    n_rows = manifest['n_rows']
+    data = {}
+    empty_names = []
+    for entry in manifest['columns']:
+        name = entry['name']
+        if columns is not None and name not in columns:
+            continue
+        if entry['kind'] == 'empty':
+            if not compact:
+                empty_names.append(name)
+            continue
+        values = np.load(_column_path(cache_dir, manifest, entry), mmap_mode='c')
+        if entry['kind'] == 'datetime' and 'tz' in entry:
+            values = pd.DatetimeIndex(values).tz_localize('UTC').tz_convert(entry['tz'])
+        elif compact and entry['kind'] == 'categorical':
+            # Sorted categories keep groupby/factorize order identical to text columns
+            categorical = pd.Categorical.from_codes(values, entry['categories'])
+            values = categorical.reorder_categories(sorted(entry['categories']))
+        elif compact and 'stats' in entry:
+            values = compact_numeric(values, entry['stats'])
+        elif entry['kind'] == 'categorical':
+            categories = np.asarray(entry['categories'], dtype=object)
+            decoded = np.empty(n_rows, dtype=object)
+            missing = values < 0
+            decoded[~missing] = categories[values[~missing]]
+            decoded[missing] = np.nan
+            values = decoded
+        data[name] = values
+
+    frame = pd.DataFrame(data, copy=False)
+    if empty_names:
+        # One float block for all empty columns is far cheaper than one per column
+        empty = pd.DataFrame(np.full((n_rows, len(empty_names)), np.nan),
+                             columns=empty_names)
+        frame = pd.concat([frame, empty], axis=1)
+    order = [e['name'] for e in manifest['columns']
+             if (columns is None or e['name'] in columns) and e['name'] in frame.columns]
+    return frame[order]
+
+
+def read_excel_cached(source_path, cache_dir=None, use_cache=True, compact=False, **read_options):
+    """Drop-in replacement for pd.read_excel backed by the columnar cache
+
+    compact returns only non-empty columns with compact dtypes (see
+    compact_frames). Uncached compact reads stream the sheet and drop empty
+    columns while parsing, so its thousands of blank columns are never built.
+    """
+    import pandas as pd
+
+    if compact:
+        try:
+            from .compact_frames import compact_frame, read_excel_compact
+        except ImportError:
+            from compact_frames import compact_frame, read_excel_compact
+
+    source_path = Path(source_path)
+    if not use_cache:
+        if not compact:
+            return pd.read_excel(source_path, **read_options)
+        if source_path.suffix.lower() in ('.xlsx', '.xlsm') and set(read_options) <= {'sheet_name'}:
+            return read_excel_compact(source_path, **read_options)
+        return compact_frame(pd.read_excel(source_path, **read_options))
+
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir(source_path)
+    manifest = get_valid_manifest(source_path, cache_dir, read_options)
+    if manifest is not None and not has_mixed_columns(manifest):
+        try:
+            return frame_from_cache(manifest, cache_dir, compact=compact)
+        except FileNotFoundError:
+            pass  # a newer build replaced this version meanwhile; parse the source
+
+    # The cache stores the sheet as read_excel returns it, so parse it whole once
+    frame = pd.read_excel(source_path, **read_options)
+    if manifest is None:
+        try:
+            manifest = build_cache(frame, source_path, cache_dir, read_options)
+        except OSError as e:
+            print(f"Warning: could not write ingest cache at {cache_dir}: {e}")
+        else:
+            if compact and not has_mixed_columns(manifest):
+                del frame
+                return frame_from_cache(manifest, cache_dir, compact=compact)
+    return compact_frame(frame) if compact else frame
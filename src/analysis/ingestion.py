@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Concurrent Ingestion - Fetch and parse every configured source at once
+Local files and HTTP(S) URLs are read concurrently with asyncio, each under
+its own timeout. HTTP responses are kept in a local cache and revalidated
+with ETag/Last-Modified conditional requests. Yearly tables are merged into
+the analyzer's canonical schema; incident documents are loaded as frames
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from urllib.parse import urlparse
+
+import pandas as pd
+
+try:
+    from .incident_loader import load_locations
+    from .ingest_cache import read_excel_cached
+    from .party_periods import GOVERNMENT_TERMS, label_parties
+except ImportError:
+    from incident_loader import load_locations
+    from ingest_cache import read_excel_cached
+    from party_periods import GOVERNMENT_TERMS, label_parties
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_CACHE_DIR = PROJECT_ROOT / 'data' / '.cache' / 'http'
+DEFAULT_TIMEOUT = 30.0
+# The published Google Sheet the notebook reads
+SHEET_CSV_URL = ('https://docs.google.com/spreadsheets/d/e/2PACX-1vRuhbCUX8qty3OiS_djxG0kCEODQAms8IX22Qdg'
+                 '-XcRir2hjdETsBSlG-KSHthWPOGd_13ePM9AGMmC/pub?output=csv')
+DEFAULT_SOURCES = (
+    ('workbook', PROJECT_ROOT / 'data' / 'border-inc.xlsx'),
+    ('locations', PROJECT_ROOT / 'data' / 'border_killing_locations.json'),
+)
+
+# Column names of data/border-inc.xlsx, which the analyzer expects verbatim
+CANONICAL_COLUMNS = ('Years', 'Killed', 'Injured\xa0', 'Abducted', 'Missing\xa0', 'Rape\xa0',
+                     'Looting\xa0', 'Push\xa0In\xa0', 'Other\xa0', 'Total',
+                     'Rulling_Party', 'Rulling_Party_India')
+_COLUMN_ALIASES = {'year': 'years', 'ruling_party': 'rulling_party',
+                   'ruling_party_india': 'rulling_party_india'}
+
+
+def _column_key(name):
+    """Spelling-insensitive key: case, spaces, non-breaking spaces and '_' ignored"""
+    key = re.sub(r'[\s_]+', '_', str(name).replace('\xa0', ' ').strip().lower())
+    return _COLUMN_ALIASES.get(key, key)
+
+
+_CANONICAL_BY_KEY = {_column_key(c): c for c in CANONICAL_COLUMNS}
+
+
+def canonical_frame(frame):
+    """Rename columns to CANONICAL_COLUMNS, drop empty ones and fill missing party labels
+
+    Columns that match no canonical name are kept as they are.
+    """
+    frame = frame.dropna(axis=1, how='all')
+    frame = frame.rename(columns={c: _CANONICAL_BY_KEY.get(_column_key(c), c) for c in frame.columns})
+    missing_parties = [c for c in GOVERNMENT_TERMS if c not in frame.columns]
+    if missing_parties and 'Years' in frame.columns:
+        frame = label_parties(frame, 'Years', {c: GOVERNMENT_TERMS[c] for c in missing_parties},
+                              as_category=False)
+    return frame
+
+
+class Source:
+    """One input: a name, a path or URL, how to parse it and a timeout"""
+
+    def __init__(self, name, location, kind=None, timeout=DEFAULT_TIMEOUT, read_options=None):
+        self.name = name
+        self.location = str(location)
+        self.kind = kind or infer_kind(self.location)
+        self.timeout = timeout
+        self.read_options = dict(read_options or {})
+
+    @property
+    def scheme(self):
+        scheme = urlparse(self.location).scheme.lower()
+        # Windows drive letters parse as one-letter schemes
+        return scheme if len(scheme) > 1 else 'file'
+
+    def __repr__(self):
+        return f"Source({self.name!r}, {self.location!r}, kind={self.kind!r})"
+
+
+def infer_kind(location):
+    """'workbook', 'csv' or 'incidents' from the path or URL"""
+    parsed = urlparse(location)
+    suffix = Path(parsed.path).suffix.lower()
+    if suffix in ('.xlsx', '.xlsm', '.xls'):
+        return 'workbook'
+    if suffix in ('.json', '.jsonl', '.ndjson'):
+        return 'incidents'
+    if suffix == '.csv' or 'output=csv' in parsed.query or 'format=csv' in parsed.query:
+        return 'csv'
+    raise ValueError(f"Cannot infer the kind of source {location}; pass kind=")
+
+
+class FetchResult:
+    """Local path of a fetched source and how it was obtained"""
+
+    def __init__(self, path, status, suffix=None):
+        self.path = Path(path)
+        # 'local', 'downloaded', 'not-modified' or 'stale' (cached copy after an error)
+        self.status = status
+        self.suffix = suffix
+
+
+class HttpCache:
+    """Response bodies plus ETag/Last-Modified metadata, one file pair per URL"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def _paths(self, url, suffix):
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()[:24]
+        return self.cache_dir / f'{digest}{suffix}', self.cache_dir / f'{digest}.meta.json'
+
+    def lookup(self, url, suffix=''):
+        """(body path, metadata) of a cached response, or (None, {})"""
+        body, meta = self._paths(url, suffix)
+        if not body.exists() or not meta.exists():
+            return None, {}
+        try:
+            with open(meta, 'r') as f:
+                return body, json.load(f)
+        except (OSError, ValueError):
+            return None, {}
+
+    def store(self, url, suffix, content, headers):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        body, meta = self._paths(url, suffix)
+        # Write then rename so readers never see a partial body
+        tmp = body.with_suffix(body.suffix + '.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(content)
+        os.replace(tmp, body)
+        metadata = {'url': url, 'etag': headers.get('ETag'),
+                    'last_modified': headers.get('Last-Modified'), 'fetched_at': time.time()}
+        with open(meta, 'w') as f:
+            json.dump(metadata, f)
+        return body
+
+
+def _suffix_for(source):
+    suffix = Path(urlparse(source.location).path).suffix.lower()
+    return suffix or {'csv': '.csv', 'workbook': '.xlsx', 'incidents': '.json'}[source.kind]
+
+
+def _http_get(source, cache):
+    """Blocking conditional GET; runs in a worker thread"""
+    suffix = _suffix_for(source)
+    cached_body, metadata = cache.lookup(source.location, suffix)
+    request = urllib.request.Request(source.location)
+    if cached_body is not None:
+        if metadata.get('etag'):
+            request.add_header('If-None-Match', metadata['etag'])
+        if metadata.get('last_modified'):
+            request.add_header('If-Modified-Since', metadata['last_modified'])
+    try:
+        with urllib.request.urlopen(request, timeout=source.timeout) as response:
+            content = response.read()
+            headers = response.headers
+        return FetchResult(cache.store(source.location, suffix, content, headers), 'downloaded', suffix)
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached_body is not None:
+            return FetchResult(cached_body, 'not-modified', suffix)
+        if cached_body is not None and e.code >= 500:
+            return FetchResult(cached_body, 'stale', suffix)
+        raise
+    except (urllib.error.URLError, TimeoutError, OSError):
+        if cached_body is not None:
+            return FetchResult(cached_body, 'stale', suffix)
+        raise
+
+
+def _cached_copy(source, cache):
+    """Stale FetchResult for the cached response of an http(s) source, or None"""
+    if source.scheme not in ('http', 'https'):
+        return None
+    suffix = _suffix_for(source)
+    body, _ = cache.lookup(source.location, suffix)
+    return None if body is None else FetchResult(body, 'stale', suffix)
+
+
+async def read_file(source, cache):
+    """Reader for local paths (and file:// URLs)"""
+    parsed = urlparse(source.location)
+    path = Path(parsed.path if parsed.scheme == 'file' else source.location)
+    if not path.exists():
+        raise FileNotFoundError(f"Source {source.name} not found at {path}")
+    return FetchResult(path, 'local', path.suffix.lower())
+
+
+async def read_http(source, cache):
+    """Reader for http(s) URLs: conditional GET into the local cache"""
+    return await asyncio.to_thread(_http_get, source, cache)
+
+
+# URL scheme -> async reader(source, cache) returning a FetchResult
+READERS = {'file': read_file, 'http': read_http, 'https': read_http}
+
+
+def register_reader(scheme, reader):
+    """Add or replace the reader for a URL scheme (e.g. 's3')"""
+    READERS[scheme.lower()] = reader
+
+
+def parse_source(source, fetched):
+    """DataFrame (tables) or locations dict (incidents) from a fetched file"""
+    if source.kind == 'workbook':
+        # Downloaded workbooks get the columnar ingest cache too, keyed on their content
+        return canonical_frame(read_excel_cached(fetched.path, **source.read_options))
+    if source.kind == 'csv':
+        return canonical_frame(pd.read_csv(fetched.path, **source.read_options))
+    if source.kind == 'incidents':
+        return load_locations(fetched.path)
+    raise ValueError(f"Unknown source kind: {source.kind}")
+
+
+class SourceResult:
+    """Outcome of one source: data or error, fetch status and timing"""
+
+    def __init__(self, source, data=None, status=None, error=None, seconds=0.0):
+        self.source = source
+        self.data = data
+        self.status = status
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+async def ingest_source(source, cache):
+    """Fetch and parse one source within its timeout; errors are captured, not raised"""
+    start = time.perf_counter()
+    try:
+        reader = READERS.get(source.scheme)
+        if reader is None:
+            raise ValueError(f"No reader registered for scheme {source.scheme!r}")
+
+        async def fetch_and_parse():
+            fetched = await reader(source, cache)
+            data = await asyncio.to_thread(parse_source, source, fetched)
+            return fetched, data
+
+        fetched, data = await asyncio.wait_for(fetch_and_parse(), timeout=source.timeout)
+        return SourceResult(source, data, fetched.status, seconds=time.perf_counter() - start)
+    except asyncio.TimeoutError:
+        error = f"timed out after {source.timeout:g} s"
+        # The worker thread may still be waiting on the server; serve the cached copy instead
+        fetched = _cached_copy(source, cache)
+        if fetched is not None:
+            try:
+                data = await asyncio.to_thread(parse_source, source, fetched)
+                return SourceResult(source, data, fetched.status, seconds=time.perf_counter() - start)
+            except Exception as e:
+                error = f"{error}; cached copy unusable: {type(e).__name__}: {e}"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return SourceResult(source, status='failed', error=error, seconds=time.perf_counter() - start)
+
+
+async def ingest_async(sources, cache_dir=DEFAULT_CACHE_DIR):
+    """SourceResult for every source, fetched and parsed concurrently, in source order"""
+    cache = HttpCache(cache_dir)
+    return await asyncio.gather(*(ingest_source(source, cache) for source in sources))
+
+
+def merge_tables(frames):
+    """One canonical yearly table; for a year present in several, the first source wins"""
+    frames = [f for f in frames if f is not None and len(f)]
+    if not frames:
+        return None
+    merged = pd.concat(frames, ignore_index=True, sort=False)
+    if 'Years' in merged.columns:
+        merged = merged.drop_duplicates(subset='Years', keep='first')
+        merged = merged.sort_values('Years', kind='stable').reset_index(drop=True)
+    ordered = [c for c in CANONICAL_COLUMNS if c in merged.columns]
+    return merged[ordered + [c for c in merged.columns if c not in ordered]]
+
+
+class IngestResult:
+    """Merged yearly table, incident documents and per-source outcomes"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.table = merge_tables([r.data for r in self.results
+                                   if r.ok and isinstance(r.data, pd.DataFrame)])
+        self.locations = {r.source.name: r.data for r in self.results
+                          if r.ok and isinstance(r.data, dict)}
+
+    @property
+    def errors(self):
+        return {r.source.name: r.error for r in self.results if not r.ok}
+
+
+def ingest(sources, cache_dir=DEFAULT_CACHE_DIR):
+    """Synchronous entry point: run ingest_async and merge the results"""
+    sources = [s if isinstance(s, Source) else Source(*s) for s in sources]
+    return IngestResult(asyncio.run(ingest_async(sources, cache_dir)))
+
+
+def main(argv=None):
+    """Ingest the configured sources and report what each one produced"""
+    parser = argparse.ArgumentParser(description='Fetch and parse all data sources concurrently')
+    parser.add_argument('--source', action='append', metavar='NAME=PATH_OR_URL',
+                        help='Source to ingest (repeatable); defaults to the workbook and locations file')
+    parser.add_argument('--sheet', action='store_true', help='Also fetch the published Google Sheet CSV')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Per-source timeout in seconds')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR), help='HTTP response cache')
+    parser.add_argument('--output', help='Write the merged yearly table to this CSV')
+    args = parser.parse_args(argv)
+
+    pairs = [s.split('=', 1) for s in args.source] if args.source else list(DEFAULT_SOURCES)
+    if any(len(p) != 2 for p in pairs):
+        parser.error('--source expects NAME=PATH_OR_URL')
+    sources = [Source(name, location, timeout=args.timeout) for name, location in pairs]
+    if args.sheet:
+        sources.append(Source('sheet', SHEET_CSV_URL, kind='csv', timeout=args.timeout))
+
+    start = time.perf_counter()
+    result = ingest(sources, args.cache_dir)
+    print(f"{'source':<14} {'status':<14} {'seconds':>8}  details")
+    for r in result.results:
+        if not r.ok:
+            details = r.error
+        elif isinstance(r.data, pd.DataFrame):
+            details = f"{len(r.data)} rows, {len(r.data.columns)} columns"
+        else:
+            details = f"{len(r.data.get('incidents', []))} incidents"
+        print(f"{r.source.name:<14} {r.status:<14} {r.seconds:>8.3f}  {details}")
+    print(f"All sources done in {time.perf_counter() - start:.3f} s")
+
+    if result.table is not None:
+        print(f"Merged table: {len(result.table)} years, columns {result.table.columns.tolist()}")
+        if args.output:
+            result.table.to_csv(args.output, index=False)
+            print(f"Merged table saved to {args.output}")
+    return 1 if result.errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
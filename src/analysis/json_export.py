@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Streaming JSON Export - Compact JSON written incrementally with cache-friendly siblings
+Encodes documents chunk by chunk into the output file, optional .gz/.br
+precompressed copies and a content hash, so large payloads are never held
+as one string and can be served under a long-lived, content-addressed name
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+WRITE_BUFFER_SIZE = 1 << 16
+
+
+def typed_column(values, dtype='<f8'):
+    """Encode a numeric column as a base64 little-endian typed array
+
+    The browser decodes it with one `new Float64Array(...)` instead of
+    parsing every number from text.
+    """
+    array = np.asarray(values, dtype=dtype)
+    return {'dtype': dtype, 'b64': base64.b64encode(array.tobytes()).decode('ascii')}
+
+
+class _Sinks:
+    """Fan encoded bytes out to the file, compressors and the hash"""
+
+    def __init__(self, path, gzip_copy, brotli_copy):
+        self.paths = [path]
+        self.raw = open(path, 'wb')
+        self.digest = hashlib.sha256()
+        self.gz = None
+        self.br = None
+        self.br_file = None
+        if gzip_copy:
+            gz_path = path.with_name(path.name + '.gz')
+            self.paths.append(gz_path)
+            # mtime=0 keeps the .gz byte-identical for identical content
+            self.gz = gzip.GzipFile(gz_path, 'wb', compresslevel=9, mtime=0)
+        if brotli_copy:
+            import brotli
+            br_path = path.with_name(path.name + '.br')
+            self.paths.append(br_path)
+            self.br = brotli.Compressor(quality=11)
+            self.br_file = open(br_path, 'wb')
+
+    def write(self, data):
+        self.raw.write(data)
+        self.digest.update(data)
+        if self.gz:
+            self.gz.write(data)
+        if self.br:
+            self.br_file.write(self.br.process(data))
+
+    def close(self):
+        self.raw.close()
+        if self.gz:
+            self.gz.close()
+        if self.br:
+            self.br_file.write(self.br.finish())
+            self.br_file.close()
+
+
+def write_json_stream(obj, output_path, gzip_copy=False, brotli_copy=False, hashed_name=False):
+    """Write `obj` as compact JSON without building the whole string in memory
+
+    With hashed_name the file is stored as <stem>.<hash12><suffix> (plus any
+    precompressed siblings) for immutable HTTP caching. Returns
+    (final path, sha256 hex digest).
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+
+    encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, allow_nan=False)
+    sinks = _Sinks(tmp_path, gzip_copy, brotli_copy)
+    try:
+        buffer, size = [], 0
+        for chunk in encoder.iterencode(obj):
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= WRITE_BUFFER_SIZE:
+                sinks.write(''.join(buffer).encode('utf-8'))
+                buffer, size = [], 0
+        if buffer:
+            sinks.write(''.join(buffer).encode('utf-8'))
+    finally:
+        sinks.close()
+
+    sha256 = sinks.digest.hexdigest()
+    final_path = output_path
+    if hashed_name:
+        final_path = output_path.with_name(f'{output_path.stem}.{sha256[:12]}{output_path.suffix}')
+    for tmp in sinks.paths:
+        extra_suffix = tmp.name[len(tmp_path.name):]  # '', '.gz' or '.br'
+        os.replace(tmp, final_path.with_name(final_path.name + extra_suffix))
+    return final_path, sha256
+
+
+def prune_hashed_siblings(current_path, keep=1):
+    """Remove older content-hashed versions of a file, newest `keep` retained"""
+    current_path = Path(current_path)
+    stem = current_path.name.split('.')[0]
+    pattern = f'{stem}.*{current_path.suffix}'
+    versions = sorted((p for p in current_path.parent.glob(pattern)
+                       if p != current_path and len(p.name.split('.')) == 3),
+                      key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in versions[max(keep - 1, 0):]:
+        for sibling in (old, old.with_name(old.name + '.gz'), old.with_name(old.name + '.br')):
+            if sibling.exists():
+                sibling.unlink()
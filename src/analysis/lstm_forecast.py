@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+LSTM Forecaster - The notebook's LSTM as an importable, CPU-only forecasting model
+Training windows are strided views of the series (no per-window copies),
+training runs in seeded mini-batches with early stopping on a held-back
+tail and a fixed thread count, and a multi-output head predicts the whole
+horizon for any number of histories in one batched forward pass.
+PyTorch is optional: without it the model is reported as unavailable
+"""
+
+import argparse
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    from .backtesting import METRIC_NAMES, load_yearly_series, score_forecasts
+except ImportError:
+    from backtesting import METRIC_NAMES, load_yearly_series, score_forecasts
+
+# Architecture of the notebook's LSTMForecaster
+WINDOW = 12
+HIDDEN_SIZE = 50
+NUM_LAYERS = 2
+
+BATCH_SIZE = 8
+MAX_EPOCHS = 300
+PATIENCE = 20
+LEARNING_RATE = 1e-3
+VALIDATION_FRACTION = 0.2
+# Tiny batches gain nothing from more threads; a fixed count also keeps timings comparable
+NUM_THREADS = 1
+
+_NETWORK = None
+
+
+def _require_torch():
+    try:
+        import torch
+    except ImportError as e:
+        raise ImportError("The LSTM forecaster needs PyTorch "
+                          "(pip install torch --index-url https://download.pytorch.org/whl/cpu)") from e
+    return torch
+
+
+def torch_available():
+    try:
+        _require_torch()
+    except ImportError:
+        return False
+    return True
+
+
+def _network_class():
+    """nn.Module of the notebook's stacked LSTM, defined once torch is imported"""
+    global _NETWORK
+    if _NETWORK is None:
+        nn = _require_torch().nn
+
+        class LSTMNetwork(nn.Module):
+            """Stacked LSTM whose last hidden state maps to all `horizon` steps at once"""
+
+            def __init__(self, hidden_size, num_layers, horizon):
+                super().__init__()
+                self.lstm = nn.LSTM(input_size=1, hidden_size=hidden_size, num_layers=num_layers,
+                                    batch_first=True)
+                self.linear = nn.Linear(hidden_size, horizon)
+
+            def forward(self, x):
+                x, _ = self.lstm(x)
+                return self.linear(x[:, -1, :])
+
+        _NETWORK = LSTMNetwork
+    return _NETWORK
+
+
+@contextmanager
+def _num_threads(torch, threads):
+    previous = torch.get_num_threads()
+    torch.set_num_threads(threads)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+
+class LSTMForecaster:
+    """Min-max scaled LSTM forecaster with a fit/forecast interface like statsmodels results"""
+
+    def __init__(self, window=WINDOW, horizon=1, hidden_size=HIDDEN_SIZE, num_layers=NUM_LAYERS,
+                 batch_size=BATCH_SIZE, max_epochs=MAX_EPOCHS, patience=PATIENCE,
+                 learning_rate=LEARNING_RATE, validation_fraction=VALIDATION_FRACTION,
+                 num_threads=NUM_THREADS, bfloat16=False, seed=0):
+        """horizon is how many steps one forward pass predicts; bfloat16 runs the
+        network under CPU autocast (faster on CPUs with bf16 support, less precise)"""
+        self.window = window
+        self.horizon = horizon
+        self.hidden_size = hidden_size
+        self.num_layers = num_layers
+        self.batch_size = batch_size
+        self.max_epochs = max_epochs
+        self.patience = patience
+        self.learning_rate = learning_rate
+        self.validation_fraction = validation_fraction
+        self.num_threads = num_threads
+        self.bfloat16 = bfloat16
+        self.seed = seed
+
+        self.network = None
+        self.fit_seconds = None
+        self.epochs_run = 0
+        self.best_loss = None
+
+    def _scale(self, values):
+        return (values - self.low) / self.span
+
+    def _unscale(self, values):
+        return values * self.span + self.low
+
+    def _autocast(self, torch):
+        return torch.autocast('cpu', dtype=torch.bfloat16, enabled=self.bfloat16)
+
+    def fit(self, train):
+        """Train on a 1-D series (NaNs dropped); keeps the weights of the best validation epoch"""
+        torch = _require_torch()
+        train = np.asarray(train, dtype=np.float64)
+        train = train[~np.isnan(train)]
+        if len(train) < self.window + self.horizon + 1:
+            raise ValueError(f"Need at least {self.window + self.horizon + 1} points, got {len(train)}")
+        started = time.perf_counter()
+        self.low = float(train.min())
+        self.span = float(train.max() - train.min()) or 1.0
+
+        series = torch.as_tensor(self._scale(train), dtype=torch.float32)
+        # unfold builds the windows as a strided view; batches gather only their own rows
+        frames = series.unfold(0, self.window + self.horizon, 1)
+        n_val = int(len(frames) * self.validation_fraction)
+        n_train = len(frames) - n_val
+        # The latest windows are held back, so early stopping looks at unseen years
+        monitor = frames[n_train:] if n_val else frames
+
+        torch.manual_seed(self.seed)
+        generator = torch.Generator().manual_seed(self.seed)
+        with _num_threads(torch, self.num_threads):
+            network = _network_class()(self.hidden_size, self.num_layers, self.horizon)
+            optimizer = torch.optim.Adam(network.parameters(), lr=self.learning_rate)
+            loss_fn = torch.nn.MSELoss()
+            best_loss, best_state, stale = np.inf, None, 0
+            for epoch in range(self.max_epochs):
+                network.train()
+                for batch in torch.randperm(n_train, generator=generator).split(self.batch_size):
+                    rows = frames[batch]
+                    optimizer.zero_grad()
+                    with self._autocast(torch):
+                        predicted = network(rows[:, :self.window].unsqueeze(-1))
+                    loss = loss_fn(predicted.float(), rows[:, self.window:])
+                    loss.backward()
+                    optimizer.step()
+
+                network.eval()
+                with torch.inference_mode(), self._autocast(torch):
+                    predicted = network(monitor[:, :self.window].unsqueeze(-1))
+                loss = loss_fn(predicted.float(), monitor[:, self.window:]).item()
+                self.epochs_run = epoch + 1
+                if loss < best_loss:
+                    best_loss, stale = loss, 0
+                    best_state = {k: v.detach().clone() for k, v in network.state_dict().items()}
+                else:
+                    stale += 1
+                    if stale >= self.patience:
+                        break
+            # With NaN validation losses (a diverging fit) no epoch improved; keep the last weights
+            if best_state is not None:
+                network.load_state_dict(best_state)
+        network.eval()
+
+        self.network = network
+        self.best_loss = best_loss
+        self._history = train[-self.window:]
+        self.fit_seconds = time.perf_counter() - started
+        return self
+
+    def predict(self, histories):
+        """Next `horizon` values after each history (rows of at least `window` values)
+
+        All rows go through the network in a single forward pass.
+        """
+        if self.network is None:
+            raise RuntimeError("fit() the forecaster first")
+        torch = _require_torch()
+        histories = np.atleast_2d(np.asarray(histories, dtype=np.float64))[:, -self.window:]
+        inputs = torch.as_tensor(self._scale(histories), dtype=torch.float32).unsqueeze(-1)
+        with _num_threads(torch, self.num_threads), torch.inference_mode(), self._autocast(torch):
+            predicted = self.network(inputs).float().numpy()
+        return self._unscale(predicted.astype(np.float64))
+
+    def append(self, values):
+        """Extend the history with new observations; the weights are kept, not retrained"""
+        values = np.asarray(values, dtype=np.float64)
+        self._history = np.concatenate((self._history, values[~np.isnan(values)]))[-self.window:]
+        return self
+
+    def forecast(self, steps):
+        """`steps` values after the training data; beyond `horizon` whole blocks are fed back"""
+        history = np.array(self._history)
+        blocks = []
+        for _ in range(-(-steps // self.horizon)):
+            block = self.predict(history)[0]
+            blocks.append(block)
+            history = np.concatenate((history, block))[-self.window:]
+        return np.concatenate(blocks)[:steps]
+
+
+def evaluate_lstm(series, train_fraction=0.95, **params):
+    """Holdout metrics of the LSTM on the notebook's split, plus fit time and epochs"""
+    y = np.asarray(series, dtype=np.float64)
+    train_size = int(len(y) * train_fraction)
+    train, test = y[:train_size], y[train_size:]
+    params.setdefault('horizon', len(test))
+    model = LSTMForecaster(**params).fit(train)
+    forecast = model.forecast(len(test))
+    metrics = dict(zip(METRIC_NAMES, score_forecasts(forecast[None, :], test)[0]))
+    metrics['Fit_Seconds'] = model.fit_seconds
+    metrics['Epochs'] = model.epochs_run
+    return metrics, forecast
+
+
+def main(argv=None):
+    """Fit the LSTM on the yearly series and print its holdout metrics and fit time"""
+    parser = argparse.ArgumentParser(description='CPU LSTM forecaster for the yearly border killings')
+    parser.add_argument('--data', default=None, help='Path to border-inc.xlsx')
+    parser.add_argument('--window', type=int, default=WINDOW)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--max-epochs', type=int, default=MAX_EPOCHS)
+    parser.add_argument('--patience', type=int, default=PATIENCE)
+    parser.add_argument('--threads', type=int, default=NUM_THREADS)
+    parser.add_argument('--bfloat16', action='store_true', help='Run the network under bfloat16 autocast')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if not torch_available():
+        print("PyTorch not installed; the LSTM model is unavailable")
+        return 1
+    series = load_yearly_series(args.data)
+    metrics, forecast = evaluate_lstm(series, window=args.window, batch_size=args.batch_size,
+                                      max_epochs=args.max_epochs, patience=args.patience,
+                                      num_threads=args.threads, bfloat16=args.bfloat16, seed=args.seed)
+    print(f"Forecast: {', '.join(f'{v:.1f}' for v in forecast)}")
+    for name, value in metrics.items():
+        print(f"{name:>12}: {value:.2f}" if isinstance(value, float) else f"{name:>12}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
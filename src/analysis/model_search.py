@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Model Search - Parallel hyperparameter search for ARIMA, SARIMA and ETS models
+Candidates are fitted in a process pool, simplest first, each under a per-fit
+timeout. Within groups whose information criteria are comparable, candidates
+of higher complexity are pruned once AICc stops improving. Fits are cached on
+disk; winners are picked by forecast error on the last years of the training
+data and plug into generate_model_data.py as the Auto-* models
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import random
+import signal
+import threading
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from .backtesting import fit_model, load_yearly_series
+except ImportError:
+    from backtesting import fit_model, load_yearly_series
+
+SEARCH_CACHE_DIR = Path(__file__).parent.parent.parent / '.cache' / 'model_search'
+# Bump when fitting or scoring changes so cached fits are not reused
+SEARCH_CACHE_VERSION = 1
+DEFAULT_TIMEOUT = 20.0
+DEFAULT_VALIDATION = 3
+# Seasonal period of the notebook's SARIMA and Holt-Winters models
+SEASONAL_PERIOD = 12
+
+# Search spaces per family; kinds and params as STATSMODELS_MODELS uses them
+SEARCH_SPACES = {
+    'ARIMA': {'p': range(0, 6), 'd': range(0, 3), 'q': range(0, 4)},
+    'SARIMA': {'p': range(0, 3), 'd': (1,), 'q': range(0, 3),
+               'P': range(0, 2), 'D': range(0, 2), 'Q': range(0, 2), 'm': (SEASONAL_PERIOD,)},
+    'ETS': {'trend': (None, 'add', 'mul'), 'damped_trend': (False, True),
+            'seasonal': (None, 'add'), 'seasonal_periods': (SEASONAL_PERIOD,)},
+}
+
+# Names the winners take in the model comparison data
+AUTO_MODEL_NAMES = {'ARIMA': 'Auto-ARIMA', 'SARIMA': 'Auto-SARIMA', 'ETS': 'Auto-ETS'}
+
+
+class FitTimeout(Exception):
+    pass
+
+
+def _candidates(family, space):
+    """(kind, params) of every point of a family's search space"""
+    if family in ('ARIMA', 'SARIMA'):
+        names = ['p', 'd', 'q'] + (['P', 'D', 'Q', 'm'] if family == 'SARIMA' else [])
+        for values in itertools.product(*(space[n] for n in names)):
+            point = dict(zip(names, values))
+            params = {'order': (point['p'], point['d'], point['q'])}
+            if family == 'SARIMA':
+                if not (point['P'] or point['D'] or point['Q']):
+                    continue  # plain ARIMA, covered by that family
+                params['seasonal_order'] = (point['P'], point['D'], point['Q'], point['m'])
+            yield 'arima', params
+    elif family == 'ETS':
+        for trend, damped, seasonal, period in itertools.product(
+                space['trend'], space['damped_trend'], space['seasonal'], space['seasonal_periods']):
+            if damped and trend is None:
+                continue
+            params = {'trend': trend, 'damped_trend': damped, 'seasonal': seasonal}
+            if seasonal is not None:
+                params['seasonal_periods'] = period
+            yield 'ets', params
+    else:
+        raise ValueError(f"Unknown model family: {family}")
+
+
+def search_candidates(families=tuple(SEARCH_SPACES), strategy='grid', n_samples=None, seed=0, spaces=None):
+    """[(family, kind, params)] for a grid search, or a random sample of the grid"""
+    spaces = spaces or SEARCH_SPACES
+    candidates = [(family, kind, params) for family in families
+                  for kind, params in _candidates(family, spaces[family])]
+    if strategy == 'random':
+        candidates = random.Random(seed).sample(candidates, min(n_samples or len(candidates), len(candidates)))
+    elif strategy != 'grid':
+        raise ValueError(f"Unknown search strategy: {strategy}")
+    return candidates
+
+
+def complexity(kind, params):
+    """Number of estimated structure terms; candidates are fitted in rounds of equal complexity"""
+    if kind == 'arima':
+        p, _, q = params['order']
+        P, _, Q, _ = params.get('seasonal_order', (0, 0, 0, 0))
+        return p + q + P + Q
+    return sum(1 for key in ('trend', 'damped_trend', 'seasonal') if params.get(key))
+
+
+def comparison_group(family, kind, params):
+    """Candidates whose AICc values are comparable (same data after differencing)"""
+    if kind == 'arima':
+        _, d, _ = params['order']
+        _, D, _, m = params.get('seasonal_order', (0, 0, 0, 0))
+        return family, d, D, m
+    return family,
+
+
+def describe(kind, params):
+    """Short label such as ARIMA(2,1,0) or ETS(add, damped, add/12)"""
+    if kind == 'arima':
+        label = 'ARIMA({},{},{})'.format(*params['order'])
+        if 'seasonal_order' in params:
+            label += '({},{},{})[{}]'.format(*params['seasonal_order'])
+        return label
+    parts = [params.get('trend') or 'none']
+    if params.get('damped_trend'):
+        parts.append('damped')
+    if params.get('seasonal'):
+        parts.append(f"{params['seasonal']}/{params['seasonal_periods']}")
+    return f"ETS({', '.join(parts)})"
+
+
+def _raise_timeout(signum, frame):
+    raise FitTimeout()
+
+
+def _with_timeout(seconds, func, *args):
+    """func(*args), interrupted with FitTimeout after `seconds` where SIGALRM is available"""
+    if not seconds or not hasattr(signal, 'SIGALRM') or threading.current_thread() is not threading.main_thread():
+        return func(*args)
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        return func(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _json_float(value):
+    return None if value is None or not np.isfinite(value) else float(value)
+
+
+def evaluate_candidate(kind, params, train, validation, timeout=DEFAULT_TIMEOUT):
+    """Worker task: fit on train[:-validation], score AICc and the validation forecast
+
+    Returns a plain dict (status 'ok', 'failed' or 'timeout') so results
+    pickle and cache cheaply.
+    """
+    train = np.asarray(train, dtype=np.float64)
+    fit_part, held_out = train[:-validation], train[-validation:]
+    started = time.perf_counter()
+    result = {'status': 'ok', 'aicc': None, 'rmse': None}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            fitted = _with_timeout(timeout, fit_model, kind, params, fit_part)
+            forecast = np.asarray(fitted.forecast(validation), dtype=np.float64)
+            aicc = getattr(fitted, 'aicc', None)
+            result['aicc'] = _json_float(aicc if aicc is not None else fitted.aic)
+            result['rmse'] = _json_float(np.sqrt(np.mean((forecast - held_out) ** 2)))
+        except FitTimeout:
+            result['status'] = 'timeout'
+        except Exception as e:
+            result['status'] = 'failed'
+            result['error'] = f"{type(e).__name__}: {e}"
+    if result['status'] == 'ok' and (result['aicc'] is None or result['rmse'] is None):
+        result['status'] = 'failed'
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def _cache_key(kind, params, train, validation):
+    """Hash of everything a candidate's scores depend on"""
+    payload = json.dumps({'kind': kind, 'params': params, 'validation': validation,
+                          'train': np.asarray(train, dtype=np.float64).tolist(),
+                          'version': SEARCH_CACHE_VERSION}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _read_cached(cache_dir, key):
+    if cache_dir is None:
+        return None
+    try:
+        with open(Path(cache_dir) / f'{key}.json', 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cached(cache_dir, key, result):
+    # Timeouts depend on the machine and the limit, so only settled outcomes are kept
+    if cache_dir is None or result['status'] == 'timeout':
+        return
+    path = Path(cache_dir) / f'{key}.json'
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(result, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Warning: could not cache search result: {e}")
+
+
+class SearchResult:
+    """Scored candidates of one search and the winner of each family"""
+
+    def __init__(self, records):
+        self.records = records
+
+    def scored(self, family=None):
+        return [r for r in self.records if r['status'] == 'ok' and (family is None or r['family'] == family)]
+
+    def winners(self):
+        """{family: (kind, params)} with the lowest validation RMSE (AICc breaks ties)"""
+        best = {}
+        for record in self.scored():
+            current = best.get(record['family'])
+            if current is None or (record['rmse'], record['aicc']) < (current['rmse'], current['aicc']):
+                best[record['family']] = record
+        return {family: (best[family]['kind'], best[family]['params'])
+                for family in SEARCH_SPACES if family in best}
+
+    def auto_models(self):
+        """Winners keyed by their model comparison names, as STATSMODELS_MODELS entries"""
+        return {AUTO_MODEL_NAMES[family]: spec for family, spec in self.winners().items()}
+
+    def counts(self):
+        """Number of candidates per status ('ok', 'failed', 'timeout', 'pruned')"""
+        counts = {}
+        for record in self.records:
+            counts[record['status']] = counts.get(record['status'], 0) + 1
+        return counts
+
+    def table(self):
+        """Candidates as a DataFrame, best validation RMSE first"""
+        import pandas as pd
+
+        rows = [{'family': r['family'], 'model': describe(r['kind'], r['params']), 'status': r['status'],
+                 'aicc': r['aicc'], 'rmse': r['rmse'], 'seconds': r.get('seconds'), 'cached': r.get('cached', False)}
+                for r in self.records]
+        return pd.DataFrame(rows).sort_values(['rmse', 'aicc'], na_position='last').reset_index(drop=True)
+
+
+def search_models(train, families=tuple(SEARCH_SPACES), strategy='grid', n_samples=None, seed=0,
+                  validation=DEFAULT_VALIDATION, timeout=DEFAULT_TIMEOUT, patience=2, margin=2.0,
+                  max_workers=None, cache_dir=SEARCH_CACHE_DIR, spaces=None):
+    """Fit and score candidate models on `train`, pruning on AICc
+
+    Candidates run in rounds of increasing complexity; each round is fanned
+    out over a process pool. A comparison group stops taking more complex
+    candidates after `patience` rounds in which its best AICc did not drop by
+    more than `margin`. cache_dir=None disables the on-disk cache.
+    """
+    train = np.asarray(train, dtype=np.float64)
+    if len(train) <= validation + 2:
+        raise ValueError(f"Need more than {validation + 2} training points, got {len(train)}")
+    candidates = search_candidates(families, strategy, n_samples, seed, spaces)
+    rounds = {}
+    for family, kind, params in candidates:
+        rounds.setdefault(complexity(kind, params), []).append((family, kind, params))
+
+    best_aicc, stale = {}, {}
+    records = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for level in sorted(rounds):
+            pending, improved = [], {}
+            for family, kind, params in rounds[level]:
+                group = comparison_group(family, kind, params)
+                record = {'family': family, 'kind': kind, 'params': params, 'complexity': level}
+                if stale.get(group, 0) >= patience:
+                    record.update(status='pruned', aicc=None, rmse=None)
+                    records.append(record)
+                    continue
+                key = _cache_key(kind, params, train, validation)
+                cached = _read_cached(cache_dir, key)
+                if cached is not None:
+                    record.update(cached, cached=True)
+                    records.append(record)
+                else:
+                    pending.append((record, key, pool.submit(evaluate_candidate, kind, params, train,
+                                                             validation, timeout)))
+            for record, key, future in pending:
+                result = future.result()
+                _write_cached(cache_dir, key, result)
+                record.update(result)
+                records.append(record)
+            # Groups whose best AICc did not improve this round move towards pruning
+            for record in records:
+                if record['complexity'] == level and record['status'] == 'ok':
+                    group = comparison_group(record['family'], record['kind'], record['params'])
+                    improved.setdefault(group, False)
+                    if record['aicc'] < best_aicc.get(group, np.inf) - margin:
+                        improved[group] = True
+                    best_aicc[group] = min(best_aicc.get(group, np.inf), record['aicc'])
+            for group, better in improved.items():
+                stale[group] = 0 if better else stale.get(group, 0) + 1
+    return SearchResult(records)
+
+
+def tune_models(series, train_fraction=0.95, **kwargs):
+    """search_models on the training part of the notebook's holdout split"""
+    train = np.asarray(series, dtype=np.float64)[:int(len(series) * train_fraction)]
+    return search_models(train, **kwargs)
+
+
+def main(argv=None):
+    """Search the model spaces on the yearly series and print the winners"""
+    parser = argparse.ArgumentParser(description='Hyperparameter search for ARIMA, SARIMA and ETS models')
+    parser.add_argument('--data', default=None, help='Path to border-inc.xlsx')
+    parser.add_argument('--families', nargs='+', choices=list(SEARCH_SPACES), default=list(SEARCH_SPACES))
+    parser.add_argument('--random', type=int, metavar='N', default=None,
+                        help='Fit a random sample of N candidates instead of the full grid')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--validation', type=int, default=DEFAULT_VALIDATION,
+                        help='Years at the end of the training data used to pick winners')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Seconds allowed per fit')
+    parser.add_argument('--patience', type=int, default=2,
+                        help='Rounds without AICc improvement before a group is pruned')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--no-cache', action='store_true', help='Refit every candidate')
+    parser.add_argument('--top', type=int, default=10, help='Candidates to list')
+    args = parser.parse_args(argv)
+
+    series = load_yearly_series(args.data)
+    started = time.perf_counter()
+    result = tune_models(series, families=args.families,
+                         strategy='random' if args.random else 'grid', n_samples=args.random,
+                         seed=args.seed, validation=args.validation, timeout=args.timeout,
+                         patience=args.patience, max_workers=args.workers,
+                         cache_dir=None if args.no_cache else SEARCH_CACHE_DIR)
+    counts = ', '.join(f'{n} {status}' for status, n in sorted(result.counts().items()))
+    print(f"{len(result.records)} candidates in {time.perf_counter() - started:.1f}s ({counts})")
+    print(result.table().head(args.top).to_string(index=False))
+    print("\nWinners:")
+    for name, (kind, params) in result.auto_models().items():
+        print(f"  {name}: {describe(kind, params)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Out-of-Core Processing - Party/year aggregates over inputs larger than memory
+Streams .xlsx (openpyxl read-only), .csv and .jsonl sources in bounded row
+batches holding only the needed columns, and folds each batch into
+ChunkedAggregates; batch size follows a caller-set memory ceiling
+"""
+
+import json
+from pathlib import Path
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+try:
+    from .aggregation import ChunkedAggregates
+except ImportError:
+    from aggregation import ChunkedAggregates
+
+DEFAULT_CHUNK_ROWS = 100000
+PROBE_ROWS = 1000
+# Working memory per batch relative to its DataFrame: float copies of the
+# value columns, factorized codes and bincount temporaries
+BATCH_OVERHEAD = 4
+
+
+def chunk_rows_for_limit(bytes_per_row, memory_limit_mb):
+    """Largest batch whose working set stays under the memory ceiling"""
+    budget = memory_limit_mb * 2 ** 20
+    return max(1, int(budget // (max(bytes_per_row, 1) * BATCH_OVERHEAD)))
+
+
+def _to_frame(rows, names, parse_cells):
+    """Batch of row tuples as a DataFrame
+
+    parse_cells runs the rows through pandas' TextParser, as read_excel
+    does, so NA markers ('NULL', 'N/A', ...) and dtypes match pd.read_excel.
+    """
+    if parse_cells:
+        return TextParser([list(row) for row in rows], names=names).read()
+    return pd.DataFrame(rows, columns=names)
+
+
+def _frame_batches(rows, names, chunk_rows, parse_cells):
+    """Group an iterator of row tuples into DataFrames of `chunk_rows`"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_rows:
+            yield _to_frame(batch, names, parse_cells)
+            batch = []
+    if batch:
+        yield _to_frame(batch, names, parse_cells)
+
+
+def _xlsx_rows(path, columns, sheet_name=0):
+    """(names, row iterator) for the wanted columns of a worksheet, streamed"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+    rows = sheet.iter_rows(values_only=True)
+    header = next(rows, ())
+    positions = [i for i, name in enumerate(header)
+                 if name is not None and (columns is None or name in columns)]
+    names = [header[i] for i in positions]
+
+    def generate():
+        try:
+            for row in rows:
+                values = tuple(row[i] if i < len(row) else None for i in positions)
+                if any(v is not None for v in values):
+                    yield values
+        finally:
+            workbook.close()
+    return names, generate()
+
+
+def _jsonl_rows(path, columns):
+    """(names, row iterator) for the wanted fields of a JSON Lines file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        first = next((line for line in f if line.strip()), None)
+    if first is None:
+        return list(columns or []), iter(())
+    names = [name for name in json.loads(first) if columns is None or name in columns]
+
+    def generate():
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield tuple(record.get(name) for name in names)
+    return names, generate()
+
+
+def iter_chunks(path, columns=None, chunk_rows=None, memory_limit_mb=None, sheet_name=0):
+    """Yield DataFrame batches of `columns` from an .xlsx, .csv or .jsonl file
+
+    With memory_limit_mb the batch size is derived from the measured
+    footprint of a small probe batch; otherwise chunk_rows (or the default)
+    is used. Other columns (e.g. free-text descriptions) are never kept.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == '.csv':
+        usecols = None if columns is None else (lambda name: name in columns)
+        if memory_limit_mb:
+            probe = pd.read_csv(path, usecols=usecols, nrows=PROBE_ROWS)
+            chunk_rows = chunk_rows_for_limit(_bytes_per_row(probe), memory_limit_mb)
+        yield from pd.read_csv(path, usecols=usecols, chunksize=chunk_rows or DEFAULT_CHUNK_ROWS)
+        return
+
+    parse_cells = suffix in ('.xlsx', '.xlsm')
+    if parse_cells:
+        names, rows = _xlsx_rows(path, columns, sheet_name)
+    elif suffix in ('.jsonl', '.ndjson'):
+        names, rows = _jsonl_rows(path, columns)
+    else:
+        raise ValueError(f"Unsupported file type for chunked reading: {path.suffix}")
+
+    if memory_limit_mb:
+        # Size batches from the first rows, then continue with the same iterator
+        probe = []
+        for row in rows:
+            probe.append(row)
+            if len(probe) >= PROBE_ROWS:
+                break
+        if not probe:
+            return
+        probe_frame = _to_frame(probe, names, parse_cells)
+        chunk_rows = chunk_rows_for_limit(_bytes_per_row(probe_frame), memory_limit_mb)
+        rows = _chain(probe, rows)
+    yield from _frame_batches(rows, names, chunk_rows or DEFAULT_CHUNK_ROWS, parse_cells)
+
+
+def _chain(first, rest):
+    yield from first
+    yield from rest
+
+
+def _bytes_per_row(frame):
+    return frame.memory_usage(deep=True, index=False).sum() / max(len(frame), 1)
+
+
+def aggregate_chunked(path, keys, values, chunk_rows=None, memory_limit_mb=None, sheet_name=0):
+    """ChunkedAggregates of `values` by each of `keys`, streamed from `path`
+
+    Key and value columns missing from the file are left out, as in
+    BorderKillingsAnalyzer.get_aggregates.
+    """
+    wanted = list(dict.fromkeys([*keys, *values]))
+    aggregates = None
+    for batch in iter_chunks(path, wanted, chunk_rows, memory_limit_mb, sheet_name):
+        if aggregates is None:
+            aggregates = ChunkedAggregates([k for k in keys if k in batch.columns],
+                                           [v for v in values if v in batch.columns])
+        aggregates.add(batch)
+    if aggregates is None:
+        aggregates = ChunkedAggregates([], [])
+    return aggregates
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Party Periods - Ruling-party labels from a declarative table of government terms
+Each country's terms are sorted [start, end) date intervals; events of any
+granularity (dates or whole years) are labelled in one np.searchsorted pass
+instead of per-row Python or the UPDATE statements of docs/SQLQuery1.sql
+"""
+
+import numpy as np
+import pandas as pd
+
+# Government terms per party column: (party, start, end) with start
+# inclusive and end exclusive (None = still in power). Years outside every
+# term get the column's default label. Boundaries are 1 January so whole-year
+# rows reproduce the workbook labels; incident-level tables can use the same
+# machinery with exact term dates. (docs/SQLQuery1.sql runs the second BJP
+# term through 2003, a year the workbook labels Congress.)
+GOVERNMENT_TERMS = {
+    'Rulling_Party': {
+        'default': 'others',
+        'terms': [
+            ('BAL', '1972-01-01', '1976-01-01'),
+            ('BNP', '1979-01-01', '1982-01-01'),
+            ('BNP', '1991-01-01', '1997-01-01'),
+            ('BAL', '1997-01-01', '2001-01-01'),
+            ('BNP', '2001-01-01', '2007-01-01'),
+            ('BAL', '2009-01-01', None),
+        ],
+    },
+    'Rulling_Party_India': {
+        'default': 'Congress',
+        'terms': [
+            ('BJP', '1977-01-01', '1980-01-01'),
+            ('others', '1990-01-01', '1991-01-01'),
+            ('others', '1996-01-01', '1998-01-01'),
+            ('BJP', '1998-01-01', '2003-01-01'),
+            ('BJP', '2014-01-01', None),
+        ],
+    },
+}
+
+# Long-form names normalized to the labels used throughout the reports
+PARTY_ALIASES = {'Awami League': 'BAL', 'Bangladesh Nationalist Party': 'BNP',
+                 'Bharatiya Janata Party': 'BJP', 'Indian National Congress': 'Congress'}
+
+_OPEN_END = np.datetime64('9999-12-31', 'D')
+
+
+def normalize_party_labels(values):
+    """Map long-form party names (PARTY_ALIASES) to the report labels"""
+    series = pd.Series(values, copy=False)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        present = [c for c in series.cat.categories if c in PARTY_ALIASES]
+        if not present:
+            return series
+        renamed = series.astype(object).replace(PARTY_ALIASES)
+        return pd.Series(pd.Categorical(renamed), index=series.index, name=series.name)
+    return series.replace(PARTY_ALIASES)
+
+
+def event_days(values):
+    """Events as datetime64[D]: whole years map to 1 January of that year"""
+    if isinstance(values, pd.Series):
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values.to_numpy(dtype='datetime64[D]')
+        if pd.api.types.is_numeric_dtype(values):
+            # Also covers nullable integer years, whose NA becomes NaN
+            values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    array = np.asarray(values)
+    if array.dtype.kind == 'M':
+        return array.astype('datetime64[D]')
+    if array.dtype.kind not in 'iuf':
+        return pd.to_datetime(array).to_numpy(dtype='datetime64[D]')
+    missing = np.isnan(array) if array.dtype.kind == 'f' else np.zeros(len(array), dtype=bool)
+    years = np.where(missing, 1970, array).astype(np.int64)
+    days = (years - 1970).astype('datetime64[Y]').astype('datetime64[D]')
+    days[missing] = np.datetime64('NaT')
+    return days
+
+
+class IntervalLabeler:
+    """Labels event dates from non-overlapping [start, end) terms"""
+
+    def __init__(self, terms, default=None):
+        """terms: iterable of (label, start, end); end None leaves the term open"""
+        rows = sorted((np.datetime64(start, 'D'), _OPEN_END if end is None else np.datetime64(end, 'D'), label)
+                      for label, start, end in terms)
+        self.starts = np.array([r[0] for r in rows], dtype='datetime64[D]')
+        self.ends = np.array([r[1] for r in rows], dtype='datetime64[D]')
+        if np.any(self.ends <= self.starts):
+            raise ValueError("Every term must end after it starts")
+        if np.any(self.starts[1:] < self.ends[:-1]):
+            raise ValueError("Government terms overlap")
+        self.default = default
+        # Categorical codes of each term's label and of the default
+        self.labels = sorted({r[2] for r in rows} | ({default} if default is not None else set()))
+        code_of = {label: i for i, label in enumerate(self.labels)}
+        self._term_codes = np.array([code_of[r[2]] for r in rows], dtype=np.int32)
+        self._default_code = code_of.get(default, -1)
+
+    def codes(self, values):
+        """Label code per event (index into self.labels), -1 for unlabelled events"""
+        days = event_days(values)
+        term = np.searchsorted(self.starts, days, side='right') - 1
+        inside = (term >= 0) & (days < self.ends[np.maximum(term, 0)])
+        codes = np.where(inside, self._term_codes[np.maximum(term, 0)], self._default_code)
+        codes[np.isnat(days)] = -1
+        return codes.astype(np.int32)
+
+    def label(self, values):
+        """Labels as a Categorical (missing dates, and gaps without a default, are NaN)"""
+        return pd.Categorical.from_codes(self.codes(values), self.labels)
+
+
+def labelers(terms=None):
+    """IntervalLabeler per party column of a GOVERNMENT_TERMS-style table"""
+    terms = GOVERNMENT_TERMS if terms is None else terms
+    return {column: IntervalLabeler(spec['terms'], spec.get('default'))
+            for column, spec in terms.items()}
+
+
+def label_parties(frame, date_col='Years', terms=None, as_category=True):
+    """Copy of frame with every party column of `terms` (re)assigned from date_col"""
+    labelled = frame.copy(deep=False)
+    for column, labeler in labelers(terms).items():
+        labels = labeler.label(frame[date_col])
+        labelled[column] = labels if as_category else np.asarray(labels, dtype=object)
+    return labelled
+
+
+def year_ranges(column, terms=None):
+    """(party, first year, last year or None) per term, for year-keyed tables
+
+    Terms must start and end on 1 January.
+    """
+    spec = (GOVERNMENT_TERMS if terms is None else terms)[column]
+    ranges = []
+    for party, start, end in spec['terms']:
+        start, end = pd.Timestamp(start), None if end is None else pd.Timestamp(end)
+        if (start.month, start.day) != (1, 1) or (end is not None and (end.month, end.day) != (1, 1)):
+            raise ValueError(f"Term {party} {start.date()} does not fall on year boundaries")
+        ranges.append((party, start.year, None if end is None else end.year - 1))
+    return spec.get('default'), ranges
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Incremental Pipeline Runner - Dependency DAG with content-addressed artifacts
+Each stage's key hashes its code (with every local module it can import),
+parameters, input files and the keys of its upstream stages; stages whose
+key already has an artifact are not re-run, and independent branches
+execute concurrently
+"""
+
+import ast
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import textwrap
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+try:
+    from .ingest_cache import file_sha256
+except ImportError:
+    from ingest_cache import file_sha256
+
+
+def _module_files(module, level, base, roots):
+    """Local source files a dotted module name can refer to"""
+    if level:
+        bases = [base.parents[level - 2] if level > 1 else base]
+    else:
+        bases = [base] + [Path(r) for r in roots]
+    parts = module.split('.') if module else []
+    found = []
+    for root in bases:
+        target = root.joinpath(*parts)
+        for candidate in (target.with_suffix('.py') if parts else None, target / '__init__.py'):
+            if candidate is not None and candidate.is_file():
+                found.append(candidate.resolve())
+    return found
+
+
+def _imported_files(nodes, base, roots):
+    """Local files named by the import statements among nodes (and their children)"""
+    found = []
+    for node in nodes:
+        for child in ast.walk(node):
+            if isinstance(child, ast.Import):
+                for alias in child.names:
+                    found += _module_files(alias.name, 0, base, roots)
+            elif isinstance(child, ast.ImportFrom):
+                found += _module_files(child.module, child.level, base, roots)
+                # `from package import module` names modules, not attributes
+                for alias in child.names:
+                    name = f'{child.module}.{alias.name}' if child.module else alias.name
+                    found += _module_files(name, child.level, base, roots)
+    return found
+
+
+def import_closure(paths, roots=()):
+    """Source files reachable from `paths` through imports of local modules
+
+    Every import statement counts, including the lazy ones inside
+    functions. Names resolve against the importing file's directory and
+    `roots`; installed packages are not followed.
+    """
+    seen = set()
+    pending = [Path(p).resolve() for p in paths]
+    while pending:
+        path = pending.pop()
+        if path in seen or not path.is_file():
+            continue
+        seen.add(path)
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+        pending.extend(_imported_files([tree], path.parent, roots))
+    return sorted(seen)
+
+
+class Stage:
+    """One node of the pipeline DAG"""
+
+    def __init__(self, name, func, deps=(), params=None, inputs=(), outputs=(), code=()):
+        """`func(*dep_results, **params)`; `inputs`/`outputs` are file paths
+
+        `code` lists extra scripts the stage runs (e.g. via importlib) whose
+        imports are hashed with the stage's own.
+        """
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.params = dict(params or {})
+        self.inputs = [Path(p) for p in inputs]
+        self.outputs = [Path(p) for p in outputs]
+        self.code = [Path(p) for p in code]
+
+    def code_files(self):
+        """The defining module plus every local module the stage can import
+
+        Imports are taken from the function body and the module's top level,
+        then followed through whole modules, so a stage is invalidated by
+        edits to any helper it reaches but not by its siblings' imports.
+        """
+        try:
+            path = Path(inspect.getsourcefile(self.func)).resolve()
+            module = ast.parse(path.read_bytes(), filename=str(path))
+            function = ast.parse(textwrap.dedent(inspect.getsource(self.func)))
+        except (TypeError, OSError):
+            return import_closure(self.code)
+        top_level = [node for node in module.body
+                     if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))]
+        imported = _imported_files(top_level + [function], path.parent, ())
+        return sorted({path, *import_closure(imported + self.code)})
+
+    def code_hash(self):
+        """Hash of every source file in code_files()"""
+        digest = hashlib.sha256(self.func.__qualname__.encode('utf-8'))
+        files = self.code_files()
+        if not files:
+            digest.update(self.func.__code__.co_code)
+        for path in files:
+            digest.update(path.name.encode('utf-8'))
+            digest.update(path.read_bytes())
+        return digest.hexdigest()
+
+
+class Pipeline:
+    """Run a DAG of stages, re-executing only those whose inputs changed"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.stages = {}
+        self._file_hashes = {}
+
+    def add(self, name, func, deps=(), params=None, inputs=(), outputs=(), code=()):
+        """Register a stage; dependencies must already be registered"""
+        missing = [d for d in deps if d not in self.stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stages: {missing}")
+        self.stages[name] = Stage(name, func, deps, params, inputs, outputs, code)
+        return self
+
+    def _hash_file(self, path):
+        """Content hash of an input file, memoized for the duration of a run"""
+        if path not in self._file_hashes:
+            self._file_hashes[path] = file_sha256(path) if path.exists() else 'missing'
+        return self._file_hashes[path]
+
+    def stage_keys(self):
+        """Content address of every stage, computed without running anything"""
+        keys = {}
+        for name, stage in self.stages.items():  # insertion order is topological
+            payload = {
+                'code': stage.code_hash(),
+                'params': stage.params,
+                'inputs': {str(p): self._hash_file(p) for p in stage.inputs},
+                'outputs': [str(p) for p in stage.outputs],
+                'deps': [keys[d] for d in stage.deps],
+            }
+            encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+            keys[name] = hashlib.sha256(encoded).hexdigest()
+        return keys
+
+    def _artifact_path(self, key):
+        return self.cache_dir / key[:2] / f'{key}.pkl'
+
+    def _outputs_path(self, key):
+        return self.cache_dir / key[:2] / f'{key}.outputs.json'
+
+    def _is_fresh(self, key):
+        """A stage is fresh when its artifact exists and its output files are intact
+
+        Output hashes live in a small JSON sidecar so the check never has to
+        unpickle a (possibly large) artifact.
+        """
+        if not self._artifact_path(key).exists():
+            return False
+        try:
+            with open(self._outputs_path(key), 'r') as f:
+                outputs = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return all(Path(p).exists() and file_sha256(p) == digest
+                   for p, digest in outputs.items())
+
+    def _load(self, key):
+        with open(self._artifact_path(key), 'rb') as f:
+            return pickle.load(f)
+
+    def _store(self, stage, key, result):
+        """Write the artifact and its output-file hashes atomically"""
+        path = self._artifact_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+        # The sidecar is written last: without it the stage never counts as fresh
+        outputs = {str(p): file_sha256(p) for p in stage.outputs if p.exists()}
+        outputs_path = self._outputs_path(key)
+        tmp_path = outputs_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(outputs, f, indent=2)
+        os.replace(tmp_path, outputs_path)
+
+    def run(self, targets=None, max_workers=None, force=False):
+        """Bring `targets` (default: every stage) up to date
+
+        Returns {stage name: 'cached' | 'ran'} for the stages involved. Results
+        of fresh stages are only unpickled when a stale downstream stage needs
+        them.
+        """
+        self._file_hashes = {}
+        keys = self.stage_keys()
+
+        # Restrict to the targets and everything upstream of them
+        wanted = set()
+        stack = list(targets or self.stages)
+        while stack:
+            name = stack.pop()
+            if name not in wanted:
+                wanted.add(name)
+                stack.extend(self.stages[name].deps)
+
+        # Fresh stages are skipped; their artifacts are only read back when a
+        # stale stage downstream needs them as input
+        stale = {n for n in wanted if force or not self._is_fresh(keys[n])}
+        status = {n: ('ran' if n in stale else 'cached') for n in wanted}
+        if not stale:
+            return status
+
+        results = {}
+
+        def result_of(name):
+            if name not in results:
+                results[name] = self._load(keys[name])
+            return results[name]
+
+        def execute(name):
+            stage = self.stages[name]
+            args = [result_of(d) for d in stage.deps]
+            result = stage.func(*args, **stage.params)
+            self._store(stage, keys[name], result)
+            return result
+
+        pending = {n for n in self.stages if n in stale}
+        running = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while pending or running:
+                ready = [n for n in pending
+                         if not any(d in pending or d in running.values()
+                                    for d in self.stages[n].deps)]
+                for name in ready:
+                    pending.discard(name)
+                    running[pool.submit(execute, name)] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+        return status
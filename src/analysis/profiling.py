@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Profiling - Structured timing spans for analysis stages
+Records nested spans with wall time, row counts and (optionally) traced
+memory deltas, forwards each finished span to callbacks and exports the
+collection as JSON or a Chrome trace (chrome://tracing, Perfetto)
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+
+def null_span():
+    """No-op span used when profiling is off; yields a scratch attrs dict"""
+    return nullcontext({})
+
+
+class Profiler:
+    """Collects spans and notifies optional callbacks as each one finishes
+
+    With track_memory the profiler starts tracemalloc (if it is not already
+    running) and records the traced allocation delta of each span.
+    """
+
+    def __init__(self, callbacks=None, track_memory=False):
+        self.callbacks = list(callbacks or [])
+        self.track_memory = track_memory
+        self.spans = []
+        self._origin_ns = time.perf_counter_ns()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def add_callback(self, callback):
+        """Call `callback(span_dict)` whenever a span finishes"""
+        self.callbacks.append(callback)
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time the enclosed block; the yielded dict may be updated with attrs (e.g. rows)"""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        record = {'name': name, 'depth': len(stack),
+                  'parent': stack[-1]['name'] if stack else None, 'attrs': dict(attrs)}
+        stack.append(record)
+        if self.track_memory:
+            mem_start = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter_ns()
+        try:
+            yield record['attrs']
+        finally:
+            end = time.perf_counter_ns()
+            stack.pop()
+            record['start_us'] = (start - self._origin_ns) / 1000
+            record['duration_ms'] = (end - start) / 1e6
+            record['thread'] = threading.get_ident()
+            if self.track_memory:
+                record['memory_delta_kb'] = (tracemalloc.get_traced_memory()[0] - mem_start) / 1024
+            with self._lock:
+                self.spans.append(record)
+            for callback in self.callbacks:
+                callback(record)
+
+    def summary(self):
+        """Print the spans as an indented table in start order"""
+        print(f"\n{'stage':<44} {'ms':>10} {'rows':>8}" + (f" {'mem KB':>10}" if self.track_memory else ''))
+        for record in sorted(self.spans, key=lambda r: r['start_us']):
+            label = '  ' * record['depth'] + record['name']
+            rows = record['attrs'].get('rows', '')
+            line = f"{label:<44} {record['duration_ms']:>10.2f} {rows!s:>8}"
+            if self.track_memory:
+                line += f" {record['memory_delta_kb']:>10.1f}"
+            print(line)
+
+    def to_json(self, path):
+        """Write the spans as a JSON list"""
+        with open(path, 'w') as f:
+            json.dump({'spans': sorted(self.spans, key=lambda r: r['start_us'])}, f, indent=2, default=str)
+        return Path(path)
+
+    def to_chrome_trace(self, path):
+        """Write the spans in Chrome's trace event format (complete 'X' events)"""
+        pid = os.getpid()
+        events = []
+        for record in self.spans:
+            args = dict(record['attrs'])
+            if 'memory_delta_kb' in record:
+                args['memory_delta_kb'] = round(record['memory_delta_kb'], 1)
+            events.append({'name': record['name'], 'cat': 'analysis', 'ph': 'X',
+                           'ts': record['start_us'], 'dur': record['duration_ms'] * 1000,
+                           'pid': pid, 'tid': record['thread'], 'args': args})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+        return Path(path)
+
+    def export(self, path, fmt=None):
+        """Write JSON or a Chrome trace; fmt defaults from the file name (*.trace.json -> chrome)"""
+        if fmt is None:
+            fmt = 'chrome' if str(path).endswith('.trace.json') else 'json'
+        return self.to_chrome_trace(path) if fmt == 'chrome' else self.to_json(path)
+
+
+def profiled(name=None):
+    """Method decorator that opens a span on `self.profiler`, if one is set
+
+    The row count of `self.data_cleaned` is recorded when available. With no
+    profiler attached the wrapper costs a single attribute check.
+    """
+    def decorator(method):
+        span_name = name or method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            profiler = self.profiler
+            if profiler is None:
+                return method(self, *args, **kwargs)
+            with profiler.span(span_name) as attrs:
+                result = method(self, *args, **kwargs)
+                frame = getattr(self, 'data_cleaned', None)
+                if frame is not None:
+                    attrs['rows'] = len(frame)
+                return result
+        return wrapper
+    return decorator
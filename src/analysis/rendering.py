@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Headless Plot Rendering - Chart specs rendered off-screen, optionally in parallel
+Charts are described as plain, picklable specs and drawn on Agg canvases that
+never touch the configured GUI backend; batches can be spread over a process
+pool and charts whose spec has not changed since the last saved PNG are skipped.
+Batches sharing a layout can reuse one figure template, updated in place
+"""
+
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+CHART_STYLE = 'ggplot'
+DEFAULT_DPI = 300
+RENDER_MANIFEST = '.render_manifest.json'
+# Bump when drawing code changes so previously skipped charts are redrawn
+RENDERER_VERSION = 1
+# Resolution of the small preview images written next to exported charts
+THUMBNAIL_DPI = 40
+THUMBNAIL_SUFFIX = '.thumb'
+
+
+def bar_chart_spec(labels, values, title, xlabel, ylabel, colors,
+                   value_format='{:.0f}', label_offset=1, title_size=16, axis_label_size=12):
+    """Describe one bar panel"""
+    return {
+        'labels': [str(label) for label in labels],
+        'values': [float(v) for v in values],
+        'title': title,
+        'xlabel': xlabel,
+        'ylabel': ylabel,
+        'colors': list(colors),
+        'value_format': value_format,
+        'label_offset': label_offset,
+        'title_size': title_size,
+        'axis_label_size': axis_label_size,
+    }
+
+
+def bar_figure_spec(panels, figsize=(12, 8), rotate_labels=True):
+    """Describe a figure made of one or more stacked bar panels"""
+    return {
+        'kind': 'bars',
+        'panels': list(panels),
+        'figsize': list(figsize),
+        'rotate_labels': rotate_labels,
+        'style': CHART_STYLE,
+    }
+
+
+def trend_figure_spec(years, values, trend_values, title, figsize=(15, 8), band=None, band_label=None,
+                      segment_values=None, segments=None):
+    """Describe the yearly line chart with its fitted trend line
+
+    Optional extras (see trend_stats.py): band is a (lower, upper) pair of
+    series shaded around the trend, segment_values a piecewise per-term line
+    drawn as one piece per segment id in segments.
+    """
+    spec = {
+        'kind': 'trend',
+        'years': [float(y) for y in years],
+        'values': [float(v) for v in values],
+        'trend_values': [float(v) for v in trend_values],
+        'title': title,
+        'figsize': list(figsize),
+        'style': CHART_STYLE,
+    }
+    if band is not None:
+        spec['band'] = [[float(v) for v in side] for side in band]
+        spec['band_label'] = band_label or 'Confidence band'
+    if segment_values is not None:
+        spec['segment_values'] = [float(v) for v in segment_values]
+        spec['segments'] = [int(s) for s in segments]
+    return spec
+
+
+def spec_fingerprint(spec, dpi=DEFAULT_DPI):
+    """Hash of everything that affects the rendered image"""
+    payload = json.dumps({'spec': spec, 'dpi': dpi, 'version': RENDERER_VERSION},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _draw_bar_panel(ax, panel, rotate_labels):
+    """Draw one bar panel with value labels; returns (bars, labels) for in-place updates
+
+    Bars sit at integer positions with the party names as tick labels (the
+    image is the same as a categorical axis), so a template can relabel them.
+    """
+    positions = range(len(panel['values']))
+    bars = ax.bar(positions, panel['values'], color=panel['colors'])
+    ax.set_xticks(positions, panel['labels'])
+    _set_bar_titles(ax, panel)
+    if rotate_labels:
+        ax.tick_params(axis='x', labelrotation=45)
+    texts = []
+    for bar in bars:
+        height = bar.get_height()
+        texts.append(ax.text(bar.get_x() + bar.get_width() / 2., height + panel['label_offset'],
+                             panel['value_format'].format(height), ha='center', va='bottom'))
+    return list(bars), texts
+
+
+def _set_bar_titles(ax, panel):
+    ax.set_title(panel['title'], fontsize=panel['title_size'], fontweight='bold')
+    ax.set_xlabel(panel['xlabel'], fontsize=panel['axis_label_size'])
+    ax.set_ylabel(panel['ylabel'], fontsize=panel['axis_label_size'])
+
+
+def _update_bar_panel(ax, bars, texts, panel):
+    """Restyle an existing panel with the same number of bars for new data"""
+    colors = panel['colors']
+    for i, (bar, text, value) in enumerate(zip(bars, texts, panel['values'])):
+        bar.set_height(value)
+        bar.set_facecolor(colors[i % len(colors)])
+        text.set_position((bar.get_x() + bar.get_width() / 2., value + panel['label_offset']))
+        text.set_text(panel['value_format'].format(value))
+    ax.set_xticks(range(len(bars)), panel['labels'])
+    _set_bar_titles(ax, panel)
+    ax.relim()
+    ax.autoscale_view()
+
+
+def _draw_trend(ax, spec):
+    """Draw the yearly series and its trend line; returns both lines"""
+    line, = ax.plot(spec['years'], spec['values'],
+                    marker='o', linewidth=2, markersize=6, color='#E74C3C')
+    trend, = ax.plot(spec['years'], spec['trend_values'],
+                     '--', alpha=0.7, color='#3498DB', label='Trend Line')
+    if 'band' in spec:
+        ax.fill_between(spec['years'], *spec['band'], color='#3498DB', alpha=0.15, label=spec['band_label'])
+    if 'segment_values' in spec:
+        label = 'Trend per government term'
+        for segment in sorted(set(spec['segments'])):
+            points = [i for i, s in enumerate(spec['segments']) if s == segment]
+            ax.plot([spec['years'][i] for i in points], [spec['segment_values'][i] for i in points], '-',
+                    linewidth=1.5, alpha=0.8, color='#2C3E50', label=label)
+            label = None
+    ax.set_title(spec['title'], fontsize=16, fontweight='bold')
+    ax.set_xlabel('Year', fontsize=12)
+    ax.set_ylabel('Total Killings', fontsize=12)
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+    return line, trend
+
+
+def draw_chart(spec, fig=None):
+    """Draw a chart spec onto `fig`, or onto a new off-screen Agg figure
+
+    Passing a pyplot figure keeps interactive/notebook display working; the
+    default never involves pyplot, so nothing is registered with the GUI
+    backend and the figure is freed as soon as it goes out of scope.
+    """
+    return _draw(spec, fig)[0]
+
+
+def _draw(spec, fig=None):
+    """draw_chart returning (fig, axes, artists) so templates can update them"""
+    # matplotlib is imported here so building specs stays cheap
+    import matplotlib.style
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    with matplotlib.style.context(spec['style']):
+        if fig is None:
+            fig = Figure(figsize=spec['figsize'])
+            FigureCanvasAgg(fig)
+        if spec['kind'] == 'bars':
+            axes = list(fig.subplots(len(spec['panels']), 1, squeeze=False)[:, 0])
+            artists = [_draw_bar_panel(ax, panel, spec['rotate_labels'])
+                       for ax, panel in zip(axes, spec['panels'])]
+        elif spec['kind'] == 'trend':
+            axes = [fig.subplots()]
+            artists = _draw_trend(axes[0], spec)
+        else:
+            raise ValueError(f"Unknown chart kind: {spec['kind']}")
+        fig.tight_layout()
+    return fig, axes, artists
+
+
+def layout_key(spec):
+    """Specs with equal keys can share one ChartTemplate"""
+    if spec['kind'] == 'bars':
+        return ('bars', len(spec['panels']), tuple(spec['figsize']), spec['rotate_labels'], spec['style'])
+    return (spec['kind'], tuple(spec['figsize']), spec['style'])
+
+
+class ChartTemplate:
+    """An off-screen figure built once and updated in place for each spec of its layout
+
+    Bar heights and colors, value labels, tick labels and titles are
+    changed on the existing artists; only a panel whose bar count differs,
+    or a trend chart with a band or per-term lines before or after the
+    update, is redrawn. By default the saved image matches render_chart for the
+    same spec. With fixed_layout the layout is computed once (again only
+    when tick labels change) and the whole canvas is saved, so every image
+    has the same size and costs a single draw instead of three.
+    """
+
+    def __init__(self, spec, fixed_layout=False):
+        self.key = layout_key(spec)
+        self.style = spec['style']
+        self.fixed_layout = fixed_layout
+        self.fig, self.axes, self._artists = _draw(spec)
+        self._tick_labels = self._current_tick_labels(spec)
+        self._trend_extras = self._has_trend_extras(spec)
+
+    @staticmethod
+    def _has_trend_extras(spec):
+        return 'band' in spec or 'segment_values' in spec
+
+    @staticmethod
+    def _current_tick_labels(spec):
+        # The layout depends on which labels are shown, not on their order
+        return [tuple(sorted(panel['labels'])) for panel in spec.get('panels', [])]
+
+    def update(self, spec):
+        """Show `spec` (drawn by the constructor for the first one) on this figure"""
+        import matplotlib.style
+
+        if layout_key(spec) != self.key:
+            raise ValueError("Spec layout does not match the template")
+        tick_labels = self._current_tick_labels(spec)
+        relayout = not self.fixed_layout or tick_labels != self._tick_labels
+        self._tick_labels = tick_labels
+        with matplotlib.style.context(self.style):
+            if spec['kind'] == 'bars':
+                for i, (ax, panel) in enumerate(zip(self.axes, spec['panels'])):
+                    bars, texts = self._artists[i]
+                    if len(bars) == len(panel['values']):
+                        _update_bar_panel(ax, bars, texts, panel)
+                    else:
+                        ax.cla()
+                        self._artists[i] = _draw_bar_panel(ax, panel, spec['rotate_labels'])
+            elif self._trend_extras or self._has_trend_extras(spec):
+                # Band and per-term artists vary in number; draw the chart afresh
+                ax = self.axes[0]
+                ax.cla()
+                self._artists = _draw_trend(ax, spec)
+            else:
+                ax = self.axes[0]
+                line, trend = self._artists
+                line.set_data(spec['years'], spec['values'])
+                trend.set_data(spec['years'], spec['trend_values'])
+                ax.set_title(spec['title'], fontsize=16, fontweight='bold')
+                ax.relim()
+                ax.autoscale_view()
+            if relayout:
+                self.fig.tight_layout()
+        self._trend_extras = self._has_trend_extras(spec)
+        return self
+
+    def save(self, output_path, dpi=DEFAULT_DPI):
+        """Write the current figure; the format follows the file extension (png, svg, pdf)"""
+        self.fig.savefig(output_path, dpi=dpi, bbox_inches=None if self.fixed_layout else 'tight')
+        return str(output_path)
+
+
+def export_charts(charts, output_dir, formats=('png',), dpi=DEFAULT_DPI, thumbnails=False,
+                  thumbnail_dpi=THUMBNAIL_DPI, fixed_layout=True):
+    """Write every {name: spec} chart in each format, reusing one template per layout
+
+    Output files are named after each chart's stem ('a.png' -> 'a.svg');
+    with thumbnails a low-resolution 'a.thumb.png' preview is written too.
+    fixed_layout (see ChartTemplate) gives same-sized images and the fastest
+    batches; pass False for images identical to render_chart. Returns the
+    written paths in order.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    templates = {}
+    written = []
+    for name, spec in charts.items():
+        key = layout_key(spec)
+        template = templates.get(key)
+        if template is None:
+            template = templates[key] = ChartTemplate(spec, fixed_layout)
+        else:
+            template.update(spec)
+        stem = Path(name).stem
+        for fmt in formats:
+            written.append(template.save(output_dir / f'{stem}.{fmt}', dpi=dpi))
+        if thumbnails:
+            written.append(template.save(output_dir / f'{stem}{THUMBNAIL_SUFFIX}.png', dpi=thumbnail_dpi))
+    for template in templates.values():
+        template.fig.clear()
+    return written
+
+
+def render_chart(spec, output_path, dpi=DEFAULT_DPI):
+    """Render a chart spec straight to an image file and release the figure"""
+    fig = draw_chart(spec)
+    try:
+        fig.savefig(output_path, dpi=dpi, bbox_inches='tight')
+    finally:
+        fig.clear()
+    return str(output_path)
+
+
+def _init_worker():
+    """Pool initializer: never let a worker pick up a GUI backend"""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _load_manifest(output_dir):
+    try:
+        with open(Path(output_dir) / RENDER_MANIFEST, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(output_dir, manifest):
+    path = Path(output_dir) / RENDER_MANIFEST
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def render_charts(charts, output_dir, dpi=DEFAULT_DPI, max_workers=None, skip_unchanged=True):
+    """Render {filename: spec} into output_dir, in parallel where possible
+
+    Returns (rendered, skipped) lists of file names. A chart is skipped when
+    its PNG exists and was produced from an identical spec and dpi.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = _load_manifest(output_dir) if skip_unchanged else {}
+
+    pending, skipped = {}, []
+    for name, spec in charts.items():
+        fingerprint = spec_fingerprint(spec, dpi)
+        if skip_unchanged and manifest.get(name) == fingerprint and (output_dir / name).exists():
+            skipped.append(name)
+        else:
+            pending[name] = (spec, fingerprint)
+
+    if max_workers is None:
+        max_workers = min(len(pending), os.cpu_count() or 1)
+
+    rendered_in_pool = False
+    if max_workers > 1 and len(pending) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as pool:
+                futures = [pool.submit(render_chart, spec, output_dir / name, dpi)
+                           for name, (spec, _) in pending.items()]
+                for future in futures:
+                    future.result()
+            rendered_in_pool = True
+        except (OSError, BrokenProcessPool) as e:
+            print(f"Parallel rendering unavailable ({e}), rendering serially")
+    if not rendered_in_pool:
+        for name, (spec, _) in pending.items():
+            render_chart(spec, output_dir / name, dpi)
+
+    for name, (_, fingerprint) in pending.items():
+        manifest[name] = fingerprint
+    _save_manifest(output_dir, manifest)
+    return list(pending), skipped
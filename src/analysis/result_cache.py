@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Result Cache - Memoized analyzer results with data-version invalidation
+An LRU map keyed by method, arguments and a data version stamp. The stamp
+advances when the watched DataFrame is replaced or mutated, so stale
+results are never served and simply age out of the bounded cache
+"""
+
+import copy
+import functools
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_SIZE = 128
+_MISSING = object()
+
+
+class ResultCache:
+    """Bounded least-recently-used mapping with hit/miss counters"""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Cached value for key (marked most recently used), or default"""
+        value = self._entries.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store value, evicting the least recently used entries past maxsize"""
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Remove and return the value for key (default when absent)"""
+        return self._entries.pop(key, default)
+
+    def items(self):
+        """(key, value) pairs from least to most recently used, without touching the counters"""
+        return list(self._entries.items())
+
+    def clear(self):
+        self._entries.clear()
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._entries), 'maxsize': self.maxsize}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _array_key(series):
+    """Identity of a column's storage: numpy data pointer or extension array object"""
+    values = series.array
+    if isinstance(values, pd.arrays.NumpyExtensionArray):
+        return values.to_numpy().__array_interface__['data'][0]
+    return id(values)
+
+
+class FrameVersion:
+    """Generation counter that advances whenever the watched DataFrame changes
+
+    The columns seen at the last check are held, so under pandas
+    Copy-on-Write (the default from pandas 3.0) any in-place write copies
+    the affected column and its storage identity changes. Each check costs
+    O(columns), not O(rows). Without Copy-on-Write, replaced frames and
+    added or dropped columns are still detected; call bump() after editing
+    values in place.
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self._held = None
+        self._signature = None
+
+    def bump(self):
+        """Force a new generation (after a reload or an untracked edit)"""
+        self.generation += 1
+        self._held = None
+        self._signature = None
+
+    def check(self, frame):
+        """Current generation for frame, advancing it if the frame changed"""
+        if frame is None:
+            signature, held = None, None
+        else:
+            held = [frame.iloc[:, i] for i in range(frame.shape[1])]
+            signature = (id(frame), frame.shape, tuple(frame.columns),
+                         tuple(_array_key(column) for column in held))
+        if signature != self._signature:
+            self.generation += 1
+            self._signature = signature
+            self._held = held
+        return self.generation
+
+
+def _copy_result(result):
+    """Independent copy so callers cannot alter what the cache holds"""
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return result.copy()
+    if isinstance(result, tuple):
+        return tuple(_copy_result(item) for item in result)
+    if isinstance(result, (dict, list, np.ndarray)):
+        return copy.deepcopy(result)
+    return result
+
+
+def memo_key(owner, name, args=(), kwargs=None):
+    """Cache key of owner.name(*args, **kwargs) at owner's current data version"""
+    return (name, tuple(args), tuple(sorted((kwargs or {}).items())), owner.data_version())
+
+
+def memoized(name=None):
+    """Method decorator caching results in `self.result_cache`
+
+    The key is (name, args, kwargs, self.data_version()). Calls with
+    unhashable arguments, or with no cache attached, run uncached.
+    """
+    def decorator(method):
+        cache_name = name or method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self.result_cache
+            if cache is None:
+                return method(self, *args, **kwargs)
+            key = memo_key(self, cache_name, args, kwargs)
+            try:
+                result = cache.get(key, _MISSING)
+            except TypeError:
+                return method(self, *args, **kwargs)
+            if result is _MISSING:
+                result = method(self, *args, **kwargs)
+                cache.put(key, result)
+            return _copy_result(result)
+        return wrapper
+    return decorator
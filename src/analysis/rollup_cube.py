@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Rollup Cube - Dense pre-aggregated sums and counts over year x party x region
+Rows are folded once into NumPy arrays with one axis per dimension, so any
+grouping or filter over those dimensions is answered by slicing and summing
+cells instead of regrouping rows. New rows (e.g. a new year) are appended
+in place, years already folded in are not counted twice, and the cube
+persists to a single .npz file
+"""
+
+import argparse
+import copy
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .ingest_cache import default_cache_dir, read_excel_cached
+    from .party_periods import label_parties
+except ImportError:
+    from ingest_cache import default_cache_dir, read_excel_cached
+    from party_periods import label_parties
+
+YEAR_KEY = 'Years'
+WORKBOOK_DIMENSIONS = ('Years', 'Rulling_Party', 'Rulling_Party_India')
+INCIDENT_DIMENSIONS = ('Years', 'Rulling_Party', 'Rulling_Party_India', 'district')
+CUBE_FORMAT = 'rollup-cube/v1'
+CUBE_FILE = 'rollup_cube.npz'
+STATS = ('sum', 'count', 'mean', 'rows')
+
+
+def district_of(location):
+    """'Patgram, Lalmonirhat' -> 'Lalmonirhat' (the last comma-separated part)"""
+    if not isinstance(location, str) or not location.strip():
+        return None
+    return location.rsplit(',', 1)[-1].strip()
+
+
+class RollupCube:
+    """sum and non-missing count of each value per cell, plus rows per cell
+
+    Arrays have one axis per dimension (labels in arrival order) and, for
+    sums and counts, a trailing axis per value column. Rows with a missing
+    dimension label are left out, as groupby does. The labels of the `key`
+    dimension (the year) that have been folded in are remembered, so
+    appending the same rows again does not double-count them.
+    """
+
+    def __init__(self, dimensions, values, key=YEAR_KEY):
+        self.dimensions = list(dimensions)
+        self.values = list(values)
+        self.key = key if key in self.dimensions else None
+        self.folded = set()
+        self._labels = [[] for _ in self.dimensions]
+        self._index = [{} for _ in self.dimensions]
+        shape = (0,) * len(self.dimensions)
+        self.sums = np.zeros(shape + (len(self.values),))
+        self.counts = np.zeros(shape + (len(self.values),), dtype=np.int64)
+        self.rows = np.zeros(shape, dtype=np.int64)
+        self.n_rows = 0
+
+    @classmethod
+    def from_frame(cls, frame, dimensions=WORKBOOK_DIMENSIONS, values=('Killed',), key=YEAR_KEY):
+        """Cube over the dimensions and values present in frame"""
+        cube = cls([d for d in dimensions if d in frame.columns],
+                   [v for v in values if v in frame.columns], key)
+        return cube.append(frame)
+
+    @property
+    def shape(self):
+        return self.rows.shape
+
+    def copy(self):
+        """Independent cube that can be appended to without touching this one"""
+        return copy.deepcopy(self)
+
+    def labels(self, dimension):
+        """Labels of one dimension in axis order"""
+        return list(self._labels[self.dimensions.index(dimension)])
+
+    def _codes(self, axis, column):
+        """Axis positions of a column's labels, adding unseen labels (-1 for missing)"""
+        codes, uniques = pd.factorize(column)
+        index, labels = self._index[axis], self._labels[axis]
+        # One slot per distinct label plus a trailing -1 that factorize's -1 codes pick up
+        mapping = np.full(len(uniques) + 1, -1, dtype=np.int64)
+        for i, label in enumerate(uniques.tolist()):
+            position = index.get(label)
+            if position is None:
+                position = index[label] = len(labels)
+                labels.append(label)
+            mapping[i] = position
+        return mapping[codes]
+
+    def _grow(self):
+        """Zero-pad the arrays to the current label counts"""
+        target = tuple(len(labels) for labels in self._labels)
+        pad = [(0, t - s) for s, t in zip(self.rows.shape, target)]
+        if any(after for _, after in pad):
+            self.rows = np.pad(self.rows, pad)
+            self.sums = np.pad(self.sums, pad + [(0, 0)])
+            self.counts = np.pad(self.counts, pad + [(0, 0)])
+
+    def _unfolded(self, frame):
+        """Rows whose key is not in the cube yet
+
+        Rows of an already folded key are skipped when their row count and
+        value sums match the cube; otherwise they raise ValueError.
+        """
+        seen = frame[self.key].isin(list(self.folded)).to_numpy()
+        if not seen.any():
+            return frame
+        repeated = frame[seen]
+        repeated = repeated[repeated[self.dimensions].notna().all(axis=1)]
+        conflicts = []
+        for label, rows in repeated.groupby(self.key, sort=True, observed=True):
+            where = {self.key: label}
+            same = len(rows) == self.query(by=(), where=where, stat='rows') and all(
+                np.isclose(rows[v].sum(), self.query(v, where=where))
+                and rows[v].count() == self.query(v, where=where, stat='count')
+                for v in self.values if v in rows.columns)
+            if not same:
+                conflicts.append(_json_label(label))
+        if conflicts:
+            raise ValueError(f"{self.key} already in the cube with different totals: {conflicts}")
+        return frame[~seen]
+
+    def append(self, frame):
+        """Fold new rows into the cube; new labels (years, districts, ...) extend the axes
+
+        Every dimension column is required; a missing value column counts as
+        all missing. Rows of a year that is already folded in are skipped
+        (see _unfolded), so appending the same rows twice changes nothing.
+        """
+        if self.key is not None:
+            frame = self._unfolded(frame)
+        if not len(frame):
+            return self
+        codes = [self._codes(axis, frame[dim]) for axis, dim in enumerate(self.dimensions)]
+        self._grow()
+        valid = np.logical_and.reduce([c >= 0 for c in codes]) if codes else np.ones(len(frame), bool)
+        cells = np.ravel_multi_index([c[valid] for c in codes], self.shape) if codes else np.zeros(valid.sum(), int)
+        n_cells = self.rows.size
+        self.rows += np.bincount(cells, minlength=n_cells).reshape(self.shape)
+        flat_sums = self.sums.reshape(n_cells, len(self.values))
+        flat_counts = self.counts.reshape(n_cells, len(self.values))
+        for j, value in enumerate(self.values):
+            if value not in frame.columns:
+                continue
+            column = frame[value].to_numpy(dtype=np.float64, na_value=np.nan)[valid]
+            present = ~np.isnan(column)
+            flat_sums[:, j] += np.bincount(cells[present], weights=column[present], minlength=n_cells)
+            flat_counts[:, j] += np.bincount(cells[present], minlength=n_cells)
+        self.n_rows += int(valid.sum())
+        if self.key is not None:
+            self.folded.update(_json_label(label) for label in frame[self.key].dropna().unique())
+        return self
+
+    def _selection(self, dimension, condition):
+        """Axis positions matching a filter: a label, a list of labels or a (low, high) range"""
+        labels = self._labels[self.dimensions.index(dimension)]
+        if isinstance(condition, tuple) and len(condition) == 2:
+            low, high = condition
+            return [i for i, label in enumerate(labels)
+                    if (low is None or label >= low) and (high is None or label <= high)]
+        wanted = set(condition) if isinstance(condition, (list, set, frozenset)) else {condition}
+        return [i for i, label in enumerate(labels) if label in wanted]
+
+    def query(self, value=None, by=(), where=None, stat='sum'):
+        """Aggregate over the cells selected by `where`, grouped by the `by` dimensions
+
+        where maps dimensions to a label, a list of labels or an inclusive
+        (low, high) range, e.g. {'Years': (1991, 2000)}. stat is 'sum',
+        'count' (non-missing values), 'mean' or 'rows'. Returns a scalar
+        without `by`, otherwise a Series indexed by the `by` labels (a
+        MultiIndex for several), sorted, with empty cells left out.
+        """
+        if stat not in STATS:
+            raise ValueError(f"Unknown stat: {stat}")
+        by = [by] if isinstance(by, str) else list(by)
+        for dim in by + list(where or {}):
+            if dim not in self.dimensions:
+                raise ValueError(f"Unknown dimension: {dim}")
+        value = value or (self.values[0] if self.values else None)
+        selections = [np.arange(n) for n in self.shape]
+        for dim, condition in (where or {}).items():
+            selections[self.dimensions.index(dim)] = np.asarray(self._selection(dim, condition), dtype=np.intp)
+
+        def reduce(array):
+            sub = array[np.ix_(*selections)] if selections else array
+            keep = [self.dimensions.index(d) for d in by]
+            drop = tuple(i for i in range(len(self.dimensions)) if i not in keep)
+            if not keep:
+                return sub.sum()
+            # The summed array keeps its axes in cube order; reorder them as `by` lists them
+            return np.transpose(sub.sum(axis=drop), np.argsort(np.argsort(keep)))
+
+        if stat == 'rows':
+            result = reduce(self.rows)
+        else:
+            j = self.values.index(value)
+            sums, counts = reduce(self.sums[..., j]), reduce(self.counts[..., j])
+            if stat == 'sum':
+                result = sums
+            elif stat == 'count':
+                result = counts
+            else:
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    result = sums / counts
+        if not by:
+            return result.item() if hasattr(result, 'item') else result
+
+        axes = []
+        for dim in by:
+            axis = self.dimensions.index(dim)
+            axes.append(np.asarray(self._labels[axis], dtype=object)[selections[axis]])
+        index = pd.MultiIndex.from_product(axes, names=by) if len(by) > 1 else pd.Index(axes[0], name=by[0])
+        series = pd.Series(np.ravel(result), index=index, name='rows' if stat == 'rows' else value)
+        # Cells without any row are not groups (groupby would not list them)
+        occupied = np.ravel(reduce(self.rows)) > 0
+        return series[occupied].sort_index()
+
+    def save(self, path):
+        """Write the cube to one .npz file (atomically)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {'format': CUBE_FORMAT, 'dimensions': self.dimensions, 'values': self.values,
+                'labels': [[_json_label(label) for label in labels] for labels in self._labels],
+                'n_rows': self.n_rows, 'key': self.key,
+                'folded': sorted(self.folded, key=str)}
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(f, sums=self.sums, counts=self.counts, rows=self.rows, meta=np.array(json.dumps(meta)))
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Read a cube written by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('format') != CUBE_FORMAT:
+                raise ValueError(f"{path} is not a {CUBE_FORMAT} file")
+            cube = cls(meta['dimensions'], meta['values'], meta.get('key', YEAR_KEY))
+            cube.sums, cube.counts, cube.rows = data['sums'], data['counts'], data['rows']
+        cube._labels = [list(labels) for labels in meta['labels']]
+        cube._index = [{label: i for i, label in enumerate(labels)} for labels in cube._labels]
+        cube.n_rows = meta['n_rows']
+        if cube.key is not None:
+            # Files written before 'folded' was stored: every year on the axis was folded in
+            cube.folded = set(meta.get('folded', cube.labels(cube.key)))
+        return cube
+
+
+def _json_label(label):
+    """numpy scalars as plain JSON values"""
+    return label.item() if hasattr(label, 'item') else label
+
+
+def incident_frame_for_cube(incidents):
+    """Incident rows with Years, both party labels and district columns for INCIDENT_DIMENSIONS"""
+    dates = pd.to_datetime(incidents['date'])
+    frame = pd.DataFrame({
+        'date': dates,
+        'Years': dates.dt.year.astype('Int64'),
+        'district': incidents['location'].astype(object).map(district_of),
+        'incidents': 1,
+    })
+    return label_parties(frame, 'date', as_category=False)
+
+
+def incident_cube(incidents):
+    """Cube of incident counts per year, party and district"""
+    return RollupCube.from_frame(incident_frame_for_cube(incidents), INCIDENT_DIMENSIONS, ('incidents',))
+
+
+def _year_range(text):
+    first, _, last = text.partition('-')
+    return int(first), int(last or first)
+
+
+def main(argv=None):
+    """Build (or extend) the workbook cube, save it and print totals"""
+    parser = argparse.ArgumentParser(description='Pre-aggregate killings per year and ruling party')
+    parser.add_argument('--data', default=str(Path(__file__).parent.parent.parent / 'data' / 'border-inc.xlsx'))
+    parser.add_argument('--cube', help=f'Cube file (default: {CUBE_FILE} in the workbook cache directory)')
+    parser.add_argument('--append', action='store_true',
+                        help='Fold the years of --data that are not in the existing cube into it')
+    parser.add_argument('--by', nargs='+', default=['Rulling_Party'], help='Dimensions to group by')
+    parser.add_argument('--years', type=_year_range, help='Restrict to FIRST-LAST')
+    parser.add_argument('--value', default='Killed')
+    parser.add_argument('--stat', choices=STATS, default='sum')
+    args = parser.parse_args(argv)
+
+    path = Path(args.cube) if args.cube else default_cache_dir(args.data) / CUBE_FILE
+    frame = read_excel_cached(args.data, compact=True)
+    if args.append and path.exists():
+        cube = RollupCube.load(path)
+        try:
+            cube.append(frame)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+    else:
+        cube = RollupCube.from_frame(frame, values=('Killed', 'Injured\xa0', 'Injured'))
+    cube.save(path)
+    print(f"Cube {'x'.join(map(str, cube.shape))} over {', '.join(cube.dimensions)} "
+          f"({cube.n_rows} rows) saved to {path}")
+    where = {'Years': args.years} if args.years else None
+    print(cube.query(args.value, by=args.by, where=where, stat=args.stat).to_string())
+
+
+if __name__ == "__main__":
+    main()
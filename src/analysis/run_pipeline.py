@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Nightly Report Pipeline - Incremental regeneration of every published artifact
+Models load -> clean -> aggregate -> plot/export for the workbook report, the
+interactive incident visualizations and the model comparison JSON as one DAG;
+only stages whose data or code changed since the last run are re-executed
+"""
+
+import argparse
+import importlib.util
+import time
+from pathlib import Path
+
+try:
+    from .pipeline import Pipeline
+except ImportError:
+    from pipeline import Pipeline
+
+ANALYSIS_DIR = Path(__file__).parent
+PROJECT_ROOT = ANALYSIS_DIR.parent.parent
+DEFAULT_WORKBOOK = PROJECT_ROOT / 'data' / 'border-inc.xlsx'
+DEFAULT_LOCATIONS = PROJECT_ROOT / 'data' / 'border_killing_locations.json'
+DEFAULT_CACHE_DIR = PROJECT_ROOT / '.cache' / 'pipeline'
+MODEL_DATA_SCRIPT = PROJECT_ROOT / 'generate_model_data.py'
+
+PLOT_FILES = (
+    'killings_by_india_party.png',
+    'killings_by_bangladesh_party.png',
+    'average_killings_comparison.png',
+    'killings_trend_over_time.png',
+)
+
+
+# --- Stage functions: each receives its upstream results positionally ---
+
+def load_workbook(workbook_path):
+    """Load the raw workbook through the columnar ingest cache"""
+    try:
+        from .ingest_cache import read_excel_cached
+    except ImportError:
+        from ingest_cache import read_excel_cached
+    return read_excel_cached(workbook_path)
+
+
+def clean_workbook(frame):
+    """Drop columns that are entirely empty"""
+    return frame.dropna(axis=1, how='all')
+
+
+def aggregate_workbook(cleaned):
+    """Shared aggregates and the chart specs derived from them"""
+    try:
+        from .border_killings_analysis import BorderKillingsAnalyzer
+    except ImportError:
+        from border_killings_analysis import BorderKillingsAnalyzer
+    analyzer = BorderKillingsAnalyzer()
+    analyzer.data_cleaned = cleaned
+    avg_india, avg_bd = analyzer.calculate_average_killings()
+    return {
+        'avg_india': avg_india,
+        'avg_bd': avg_bd,
+        'chart_specs': analyzer.chart_specs(),
+    }
+
+
+def render_plots(aggregates, plots_dir, dpi):
+    """Render the report charts"""
+    try:
+        from .rendering import render_charts
+    except ImportError:
+        from rendering import render_charts
+    rendered, _ = render_charts(aggregates['chart_specs'], plots_dir, dpi=dpi)
+    return [str(Path(plots_dir) / name) for name in rendered]
+
+
+def load_locations(locations_path):
+    """Load the incident locations document"""
+    try:
+        from .generate_visualizations import load_locations as load
+    except ImportError:
+        from generate_visualizations import load_locations as load
+    return load(locations_path)
+
+
+def export_map(data, output_dir):
+    """Write the interactive incident map"""
+    try:
+        from .generate_visualizations import write_map
+    except ImportError:
+        from generate_visualizations import write_map
+    return write_map(data, output_dir)
+
+
+def export_tiles(data, output_dir):
+    """Write the incident tiles and the tiled map page"""
+    try:
+        from .generate_visualizations import write_tiles_map
+    except ImportError:
+        from generate_visualizations import write_tiles_map
+    return write_tiles_map(data, output_dir)
+
+
+def export_trend(data, output_dir):
+    """Write the interactive yearly trend chart"""
+    try:
+        from .generate_visualizations import write_trend
+    except ImportError:
+        from generate_visualizations import write_trend
+    return write_trend(data, output_dir)
+
+
+def export_model_data(output_path):
+    """Write model_comparison_data.json via the root-level generator script"""
+    spec = importlib.util.spec_from_file_location('generate_model_data', MODEL_DATA_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    module.save_data(Path(output_path))
+    return str(output_path)
+
+
+def build_pipeline(workbook_path=DEFAULT_WORKBOOK, locations_path=DEFAULT_LOCATIONS,
+                   output_dir=PROJECT_ROOT, cache_dir=DEFAULT_CACHE_DIR, dpi=300):
+    """Assemble the report DAG
+
+    Stage code is hashed with every local module it can import (see
+    pipeline.Stage.code_files), so editing e.g. rendering.py invalidates
+    exactly the stages that use it; inputs only list data files.
+    """
+    output_dir = Path(output_dir)
+    plots_dir = output_dir / 'plots'
+    docs_dir = output_dir / 'docs'
+    model_data_path = output_dir / 'model_comparison_data.json'
+
+    pipeline = Pipeline(cache_dir)
+    pipeline.add('load_workbook', load_workbook,
+                 params={'workbook_path': str(workbook_path)},
+                 inputs=[workbook_path])
+    pipeline.add('clean_workbook', clean_workbook, deps=['load_workbook'])
+    pipeline.add('aggregate_workbook', aggregate_workbook, deps=['clean_workbook'])
+    pipeline.add('render_plots', render_plots, deps=['aggregate_workbook'],
+                 params={'plots_dir': str(plots_dir), 'dpi': dpi},
+                 outputs=[plots_dir / name for name in PLOT_FILES])
+    pipeline.add('load_locations', load_locations,
+                 params={'locations_path': str(locations_path)},
+                 inputs=[locations_path])
+    pipeline.add('export_map', export_map, deps=['load_locations'],
+                 params={'output_dir': str(docs_dir)},
+                 outputs=[docs_dir / 'border_killing_map.html'])
+    pipeline.add('export_tiles', export_tiles, deps=['load_locations'],
+                 params={'output_dir': str(docs_dir)},
+                 outputs=[docs_dir / 'border_killing_tile_map.html',
+                          docs_dir / 'incident_tiles' / 'index.json'])
+    pipeline.add('export_trend', export_trend, deps=['load_locations'],
+                 params={'output_dir': str(docs_dir)},
+                 outputs=[docs_dir / 'border_killing_trend.html'])
+    pipeline.add('export_model_data', export_model_data,
+                 params={'output_path': str(model_data_path)},
+                 inputs=[workbook_path],
+                 outputs=[model_data_path],
+                 code=[MODEL_DATA_SCRIPT])
+    return pipeline
+
+
+def main(argv=None):
+    """Run the report pipeline incrementally"""
+    parser = argparse.ArgumentParser(description='Incremental regeneration of all report artifacts')
+    parser.add_argument('--output-dir', default=str(PROJECT_ROOT),
+                        help='Root for plots/, docs/ and model_comparison_data.json')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                        help='Content-addressed artifact store')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Maximum number of stages run concurrently')
+    parser.add_argument('--force', action='store_true', help='Re-run every stage')
+    parser.add_argument('stages', nargs='*', help='Only bring these stages up to date')
+    args = parser.parse_args(argv)
+
+    pipeline = build_pipeline(output_dir=args.output_dir, cache_dir=args.cache_dir)
+    start = time.perf_counter()
+    status = pipeline.run(targets=args.stages or None, max_workers=args.workers, force=args.force)
+    elapsed = time.perf_counter() - start
+
+    print("\n=== PIPELINE SUMMARY ===")
+    for name in pipeline.stages:
+        if name in status:
+            print(f"{name:<22} {status[name]}")
+    print(f"Finished in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Spatial Tiles - Zoom-level clusters of incident locations in web-map tiles
+Buckets incidents by lat/lon into z/x/y slippy-map tiles, pre-aggregates
+each zoom level into grid clusters and writes one small JSON file per
+non-empty tile, so the map only downloads what is in view
+"""
+
+import json
+import math
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .json_export import write_json_stream
+except ImportError:
+    from json_export import write_json_stream
+
+TILE_DIRNAME = 'incident_tiles'
+TILE_INDEX_NAME = 'index.json'
+TILED_MAP_FILENAME = 'border_killing_tile_map.html'
+MIN_ZOOM = 5
+MAX_ZOOM = 12
+# Each tile is split into CLUSTER_GRID x CLUSTER_GRID cells; incidents sharing a cell are merged
+CLUSTER_GRID = 8
+MAX_LATITUDE = 85.0511287798  # Web Mercator limit
+POINT_FIELDS = ('name', 'date', 'location', 'description')
+
+
+def mercator_fraction(lat, lon):
+    """Position of each coordinate on the unit Web Mercator square (x, y in [0, 1))"""
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE)
+    lon = np.asarray(lon, dtype=np.float64)
+    x = (lon + 180.0) / 360.0
+    sin_lat = np.sin(np.radians(lat))
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return np.clip(x, 0.0, np.nextafter(1.0, 0)), np.clip(y, 0.0, np.nextafter(1.0, 0))
+
+
+def tile_coords(lat, lon, zoom, grid=1):
+    """Integer tile (grid=1) or cluster-cell coordinates at `zoom`"""
+    x, y = mercator_fraction(lat, lon)
+    scale = (1 << zoom) * grid
+    return (x * scale).astype(np.int64), (y * scale).astype(np.int64)
+
+
+def _incident_columns(incidents):
+    """Coordinate and year arrays of the incidents that have a location
+
+    Accepts the typed DataFrame from incident_loader or a list of dicts.
+    """
+    if not isinstance(incidents, pd.DataFrame):
+        incidents = pd.DataFrame(list(incidents))
+    if incidents.empty:
+        return incidents, np.empty(0), np.empty(0), np.empty(0, dtype=np.int64)
+    located = incidents[incidents['lat'].notna() & incidents['lon'].notna()].reset_index(drop=True)
+    dates = pd.to_datetime(located['date'], errors='coerce')
+    year = dates.dt.year.fillna(0).to_numpy(dtype=np.int64)
+    located = located.assign(date=dates.dt.strftime('%Y-%m-%d'))
+    return located, located['lat'].to_numpy(dtype=np.float64), located['lon'].to_numpy(dtype=np.float64), year
+
+
+def cluster_zoom(lat, lon, year, zoom, grid=CLUSTER_GRID):
+    """Merge incidents per cluster cell at one zoom level
+
+    Returns the cell coordinates and per-cluster count, centroid and year
+    range, plus each incident's cluster number, all from one np.unique pass.
+    """
+    cx, cy = tile_coords(lat, lon, zoom, grid)
+    cells = cx * ((1 << zoom) * grid) + cy
+    unique_cells, inverse = np.unique(cells, return_inverse=True)
+    count = np.bincount(inverse)
+    centroid_lat = np.bincount(inverse, weights=lat) / count
+    centroid_lon = np.bincount(inverse, weights=lon) / count
+    first_year = np.full(len(unique_cells), np.iinfo(np.int64).max)
+    last_year = np.full(len(unique_cells), np.iinfo(np.int64).min)
+    np.minimum.at(first_year, inverse, year)
+    np.maximum.at(last_year, inverse, year)
+    side = (1 << zoom) * grid
+    return {
+        'cell_x': unique_cells // side,
+        'cell_y': unique_cells % side,
+        'count': count,
+        'lat': centroid_lat,
+        'lon': centroid_lon,
+        'first_year': first_year,
+        'last_year': last_year,
+        'inverse': inverse,
+    }
+
+
+def build_tiles(incidents, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM, grid=CLUSTER_GRID):
+    """{(z, x, y): tile document} for every non-empty tile in the zoom range
+
+    Cells holding a single incident (and every incident at max_zoom) are
+    emitted as points with their details; larger cells become clusters.
+    """
+    located, lat, lon, year = _incident_columns(incidents)
+    tiles = {}
+    if not len(located):
+        return tiles
+    details = _point_details(located)
+    for zoom in range(min_zoom, max_zoom + 1):
+        _add_zoom_tiles(tiles, lat, lon, year, details, zoom, grid, zoom == max_zoom)
+    return tiles
+
+
+def _point_details(located):
+    return {field: located[field].astype(object).where(located[field].notna(), None).to_numpy()
+            for field in POINT_FIELDS if field in located}
+
+
+def _add_zoom_tiles(tiles, lat, lon, year, details, zoom, grid, points_only):
+    """Add the tile documents of one zoom level; points_only explodes every cluster"""
+    clusters = cluster_zoom(lat, lon, year, zoom, grid)
+    tile_x = clusters['cell_x'] // grid
+    tile_y = clusters['cell_y'] // grid
+    explode = np.ones_like(clusters['count'], dtype=bool) if points_only else clusters['count'] == 1
+
+    for c in np.flatnonzero(~explode):
+        doc = tiles.setdefault((zoom, int(tile_x[c]), int(tile_y[c])), {'clusters': [], 'points': []})
+        doc['clusters'].append({
+            'lat': round(float(clusters['lat'][c]), 5),
+            'lon': round(float(clusters['lon'][c]), 5),
+            'count': int(clusters['count'][c]),
+            'years': [int(clusters['first_year'][c]), int(clusters['last_year'][c])],
+        })
+
+    point_rows = np.flatnonzero(explode[clusters['inverse']])
+    for i in point_rows:
+        c = clusters['inverse'][i]
+        doc = tiles.setdefault((zoom, int(tile_x[c]), int(tile_y[c])), {'clusters': [], 'points': []})
+        point = {'lat': float(lat[i]), 'lon': float(lon[i])}
+        point.update({field: values[i] for field, values in details.items()})
+        doc['points'].append(point)
+
+
+def write_tiles(incidents, output_dir, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM, grid=CLUSTER_GRID):
+    """Write <output_dir>/incident_tiles/{z}/{x}/{y}.json plus the tile index
+
+    The index lists the non-empty tiles per zoom and the data bounds, so the
+    map never requests tiles that do not exist. Returns the index path.
+    """
+    tile_dir = Path(output_dir) / TILE_DIRNAME
+    if tile_dir.exists():
+        shutil.rmtree(tile_dir)  # drop tiles that no longer have incidents
+    tiles = build_tiles(incidents, min_zoom, max_zoom, grid)
+
+    available = {}
+    for (z, x, y), doc in tiles.items():
+        write_json_stream(doc, tile_dir / str(z) / str(x) / f'{y}.json')
+        available.setdefault(str(z), []).append(f'{x}/{y}')
+
+    _, lat, lon, _ = _incident_columns(incidents)
+    index = {
+        'min_zoom': min_zoom,
+        'max_zoom': max_zoom,
+        'incidents': int(len(lat)),
+        'bounds': _bounds(lat, lon),
+        'tiles': {z: sorted(keys) for z, keys in available.items()},
+    }
+    index_path = _write_index(index, tile_dir)
+    print(f"Wrote {len(tiles)} incident tiles for zooms {min_zoom}-{max_zoom} to {tile_dir}")
+    return index_path
+
+
+def _bounds(lat, lon):
+    if not len(lat):
+        return None
+    return [[float(lat.min()), float(lon.min())], [float(lat.max()), float(lon.max())]]
+
+
+def _write_index(index, tile_dir):
+    tile_dir.mkdir(parents=True, exist_ok=True)
+    index_path = tile_dir / TILE_INDEX_NAME
+    with open(index_path, 'w') as f:
+        json.dump(index, f)
+    return index_path
+
+
+def _near(records, lat, lon, zoom):
+    """Records with a location inside one of the zoom-level tiles of lat/lon"""
+    side = 1 << zoom
+    x, y = tile_coords(lat, lon, zoom)
+    wanted = set((x * side + y).tolist())
+    for record in records:
+        if record.get('lat') is None or record.get('lon') is None:
+            continue
+        rx, ry = tile_coords(record['lat'], record['lon'], zoom)
+        if int(rx) * side + int(ry) in wanted:
+            yield record
+
+
+def update_tiles(incidents, new_incidents, output_dir, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM, grid=CLUSTER_GRID):
+    """Rewrite only the tiles that contain one of new_incidents (already part of incidents)
+
+    A tile's clusters and points depend only on the incidents inside it,
+    so each touched tile is rebuilt from its own incidents and comes out
+    as write_tiles would write it. incidents may be a DataFrame or an
+    iterable of incident dicts; dicts are filtered to the min_zoom tiles
+    around the new incidents as they stream past, so only those are held
+    in memory. Without an index for the same zoom range everything is
+    written. Returns the index path.
+    """
+    tile_dir = Path(output_dir) / TILE_DIRNAME
+    index_path = tile_dir / TILE_INDEX_NAME
+    index = None
+    if index_path.exists():
+        with open(index_path) as f:
+            index = json.load(f)
+    if index is None or (index['min_zoom'], index['max_zoom']) != (min_zoom, max_zoom):
+        if not isinstance(incidents, pd.DataFrame):
+            incidents = list(incidents)
+        return write_tiles(incidents, output_dir, min_zoom, max_zoom, grid)
+
+    _, new_lat, new_lon, _ = _incident_columns(new_incidents)
+    if not isinstance(incidents, pd.DataFrame):
+        # Every tile at a higher zoom nests inside its min_zoom tile
+        incidents = list(_near(incidents, new_lat, new_lon, min_zoom))
+    located, lat, lon, year = _incident_columns(incidents)
+    details = _point_details(located)
+    written = 0
+    for zoom in range(min_zoom, max_zoom + 1):
+        side = 1 << zoom
+        new_x, new_y = tile_coords(new_lat, new_lon, zoom)
+        x, y = tile_coords(lat, lon, zoom)
+        inside = np.flatnonzero(np.isin(x * side + y, new_x * side + new_y))
+        tiles = {}
+        _add_zoom_tiles(tiles, lat[inside], lon[inside], year[inside],
+                        {field: values[inside] for field, values in details.items()},
+                        zoom, grid, zoom == max_zoom)
+        keys = set(index['tiles'].get(str(zoom), []))
+        for (z, tx, ty), doc in tiles.items():
+            write_json_stream(doc, tile_dir / str(z) / str(tx) / f'{ty}.json')
+            keys.add(f'{tx}/{ty}')
+        written += len(tiles)
+        if keys:
+            index['tiles'][str(zoom)] = sorted(keys)
+    index['incidents'] = int(index.get('incidents', 0) + len(new_lat))
+    bounds = [b for b in (index.get('bounds'), _bounds(new_lat, new_lon)) if b]
+    index['bounds'] = _bounds(np.array([p[0] for b in bounds for p in b]),
+                              np.array([p[1] for b in bounds for p in b]))
+    _write_index(index, tile_dir)
+    print(f"Updated {written} incident tiles for zooms {min_zoom}-{max_zoom} in {tile_dir}")
+    return index_path
+
+
+MAP_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8">
+  <title>Border Killing Incidents</title>
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css">
+  <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+  <style>
+    html, body, #map { height: 100%; margin: 0; }
+    .cluster { background: rgba(239, 85, 59, 0.85); border-radius: 50%; color: #fff;
+               font: bold 12px sans-serif; display: flex; align-items: center; justify-content: center; }
+  </style>
+</head>
+<body>
+<div id="map"></div>
+<script>
+  const TILE_ROOT = "__TILE_ROOT__";
+  const map = L.map("map");
+  L.tileLayer("https://{s}.basemaps.cartocdn.com/light_all/{z}/{x}/{y}.png", {
+    attribution: "&copy; OpenStreetMap contributors &copy; CARTO",
+  }).addTo(map);
+
+  const loaded = new Map();  // "z/x/y" -> layer group
+  let index = null;
+
+  function tileRange(bounds, z) {
+    const n = 2 ** z;
+    const toX = (lon) => Math.floor(((lon + 180) / 360) * n);
+    const toY = (lat) => {
+      const r = (Math.max(Math.min(lat, 85.0511), -85.0511) * Math.PI) / 180;
+      return Math.floor(((1 - Math.log(Math.tan(r) + 1 / Math.cos(r)) / Math.PI) / 2) * n);
+    };
+    return {
+      x0: toX(bounds.getWest()), x1: toX(bounds.getEast()),
+      y0: toY(bounds.getNorth()), y1: toY(bounds.getSouth()),
+    };
+  }
+
+  // Tile JSON may come from a fetched source, so its strings are only ever set as text
+  function textNode(tag, value) {
+    const node = document.createElement(tag);
+    node.textContent = value == null ? "" : String(value);
+    return node;
+  }
+
+  function popupContent(p) {
+    const popup = document.createElement("div");
+    popup.append(textNode("b", p.name), document.createElement("br"),
+                 textNode("span", `${p.date} - ${p.location}`), document.createElement("br"),
+                 textNode("span", p.description));
+    return popup;
+  }
+
+  function tileLayer(doc) {
+    const group = L.layerGroup();
+    for (const c of doc.clusters) {
+      const size = 24 + 6 * Math.log2(c.count);
+      L.marker([c.lat, c.lon], {
+        icon: L.divIcon({ className: "cluster", html: textNode("span", c.count), iconSize: [size, size] }),
+      }).bindTooltip(textNode("span", `${c.count} incidents (${c.years[0]}-${c.years[1]})`)).addTo(group);
+    }
+    for (const p of doc.points) {
+      L.circleMarker([p.lat, p.lon], { radius: 7, color: "#EF553B", fillOpacity: 0.8 })
+        .bindPopup(popupContent(p))
+        .addTo(group);
+    }
+    return group;
+  }
+
+  async function refresh() {
+    const z = Math.min(Math.max(map.getZoom(), index.min_zoom), index.max_zoom);
+    const available = new Set(index.tiles[z] || []);
+    const r = tileRange(map.getBounds(), z);
+    const wanted = new Set();
+    for (let x = r.x0; x <= r.x1; x++) {
+      for (let y = r.y0; y <= r.y1; y++) {
+        if (available.has(`${x}/${y}`)) wanted.add(`${z}/${x}/${y}`);
+      }
+    }
+    for (const [key, layer] of loaded) {
+      if (!wanted.has(key)) { map.removeLayer(layer); loaded.delete(key); }
+    }
+    await Promise.all([...wanted].filter((key) => !loaded.has(key)).map(async (key) => {
+      const placeholder = L.layerGroup();
+      loaded.set(key, placeholder);  // reserve so concurrent refreshes skip it
+      const doc = await (await fetch(`${TILE_ROOT}/${key}.json`)).json();
+      // A later refresh may have dropped and re-reserved the key meanwhile; only
+      // the fetch that still owns the reservation adds its layer
+      if (loaded.get(key) === placeholder) {
+        loaded.set(key, tileLayer(doc).addTo(map));
+      }
+    }));
+  }
+
+  fetch(`${TILE_ROOT}/index.json`).then((r) => r.json()).then((data) => {
+    index = data;
+    if (index.bounds) map.fitBounds(index.bounds, { padding: [30, 30] });
+    else map.setView([23.7, 90.4], index.min_zoom);
+    map.on("moveend", refresh);
+    refresh();
+  });
+</script>
+</body>
+</html>
+"""
+
+
+def write_tiled_map(incidents, output_dir, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM):
+    """Write the tiles and a Leaflet page that fetches only the tiles in view"""
+    write_tiles(incidents, output_dir, min_zoom, max_zoom)
+    map_path = Path(output_dir) / TILED_MAP_FILENAME
+    with open(map_path, 'w') as f:
+        f.write(MAP_TEMPLATE.replace('__TILE_ROOT__', TILE_DIRNAME))
+    print(f"Tiled map saved to {map_path}")
+    return str(map_path)
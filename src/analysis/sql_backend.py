@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+SQL Query Backend - The docs/SQLQuery1.sql queries on an embedded SQLite table
+Loads the incident table into SQLite (in memory or a file, no server) with
+indexes on year and both party columns, can reassign the party columns
+from the government-term table and exposes its canned queries plus
+arbitrary filtered selects as a Python API
+"""
+
+import argparse
+import re
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from .ingest_cache import read_excel_cached
+    from .party_periods import GOVERNMENT_TERMS, year_ranges
+except ImportError:
+    from ingest_cache import read_excel_cached
+    from party_periods import GOVERNMENT_TERMS, year_ranges
+
+TABLE = 'border_incidents'
+INDEXED_COLUMNS = ('Year', 'Rulling_Party', 'Rulling_Party_India')
+
+# Workbook headers differ from the SQL column names ('Years', non-breaking spaces)
+_RENAMES = {'Years': 'Year'}
+_FILTER_OPERATORS = {'': '=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<=', 'ne': '!='}
+
+
+def sql_column_name(name):
+    """Workbook column name as a SQL identifier ('Push\\xa0In\\xa0' -> 'Push_In')"""
+    name = re.sub(r'\s+', '_', str(name).replace('\xa0', ' ').strip())
+    return _RENAMES.get(name, name)
+
+
+def _quoted(columns):
+    return ', '.join(f'"{c}"' for c in columns)
+
+
+def _sql_type(series):
+    if pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return 'INTEGER'
+    if pd.api.types.is_numeric_dtype(series):
+        return 'REAL'
+    return 'TEXT'
+
+
+def _python_value(value):
+    """numpy scalars and NA markers as sqlite3-bindable Python values"""
+    if value is None or value is pd.NA or (isinstance(value, float) and value != value):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+
+class IncidentDatabase:
+    """border_incidents in SQLite with the canned queries of docs/SQLQuery1.sql"""
+
+    def __init__(self, path=':memory:'):
+        """Open (or create) the database at path; ':memory:' keeps it in RAM"""
+        self.path = str(path)
+        self.connection = sqlite3.connect(self.path)
+
+    @classmethod
+    def from_frame(cls, frame, path=':memory:'):
+        db = cls(path)
+        db.load_frame(frame)
+        return db
+
+    @classmethod
+    def from_workbook(cls, data_path, path=':memory:', use_cache=True):
+        """Load border-inc.xlsx (through the ingest cache) into a new database"""
+        frame = read_excel_cached(data_path, use_cache=use_cache, compact=True)
+        return cls.from_frame(frame, path)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def columns(self):
+        """Column names of the incident table"""
+        return [row[1] for row in self.connection.execute(f'PRAGMA table_info({TABLE})')]
+
+    def load_frame(self, frame, chunk_rows=50000):
+        """Replace the table with frame's non-empty columns and build the indexes"""
+        frame = frame.dropna(axis=1, how='all')
+        names = [sql_column_name(c) for c in frame.columns]
+        definitions = ', '.join(f'"{n}" {_sql_type(frame[c])}' for n, c in zip(names, frame.columns))
+        placeholders = ', '.join('?' * len(names))
+        with self.connection:
+            self.connection.execute(f'DROP TABLE IF EXISTS {TABLE}')
+            self.connection.execute(f'CREATE TABLE {TABLE} ({definitions})')
+            for start in range(0, len(frame), chunk_rows):
+                chunk = frame.iloc[start:start + chunk_rows].astype(object)
+                rows = ([_python_value(v) for v in row] for row in chunk.itertuples(index=False))
+                self.connection.executemany(f'INSERT INTO {TABLE} VALUES ({placeholders})', rows)
+            # Indexes are built after the bulk insert, which is faster than maintaining them
+            for column in INDEXED_COLUMNS:
+                if column in names:
+                    self.connection.execute(
+                        f'CREATE INDEX IF NOT EXISTS idx_{column.lower()} ON {TABLE} ("{column}")')
+            self.connection.execute('ANALYZE')
+        return len(frame)
+
+    def sql(self, statement, params=()):
+        """Run any SELECT and return the result as a DataFrame"""
+        return pd.read_sql_query(statement, self.connection, params=params)
+
+    def _scalar(self, statement, params=()):
+        return self.connection.execute(statement, params).fetchone()[0]
+
+    def _where(self, filters):
+        """WHERE clause and parameters for filters like Year__gt=1999, Rulling_Party='BNP'
+
+        A list or tuple value becomes IN (...), None becomes IS NULL.
+        """
+        known = set(self.columns)
+        clauses, params = [], []
+        for key, value in filters.items():
+            column, _, op = key.partition('__')
+            if column not in known:
+                raise ValueError(f"Unknown column: {column}")
+            if op not in _FILTER_OPERATORS:
+                raise ValueError(f"Unknown filter operator: {op}")
+            if value is None:
+                clauses.append(f'"{column}" IS {"NOT " if op == "ne" else ""}NULL')
+            elif isinstance(value, (list, tuple)) and op == '':
+                clauses.append(f'"{column}" IN ({", ".join("?" * len(value))})')
+                params.extend(_python_value(v) for v in value)
+            else:
+                clauses.append(f'"{column}" {_FILTER_OPERATORS[op]} ?')
+                params.append(_python_value(value))
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def _check_column(self, column):
+        if column not in self.columns:
+            raise ValueError(f"Unknown column: {column}")
+
+    def select(self, columns=None, order_by=None, limit=None, **filters):
+        """Rows matching every filter, e.g. select(['Year', 'Killed'], Year__gt=1999)"""
+        for column in columns or []:
+            self._check_column(column)
+        fields = _quoted(columns) if columns else '*'
+        where, params = self._where(filters)
+        statement = f'SELECT {fields} FROM {TABLE}{where}'
+        if order_by:
+            self._check_column(order_by)
+            statement += f' ORDER BY "{order_by}"'
+        if limit is not None:
+            statement += f' LIMIT {int(limit)}'
+        return self.sql(statement, params)
+
+    def aggregate(self, func, column, **filters):
+        """sum/avg/min/max/count of column over the filtered rows"""
+        func = func.lower()
+        if func not in ('sum', 'avg', 'min', 'max', 'count'):
+            raise ValueError(f"Unsupported aggregate: {func}")
+        self._check_column(column)
+        where, params = self._where(filters)
+        return self._scalar(f'SELECT {func}("{column}") FROM {TABLE}{where}', params)
+
+    def average(self, column='Killed', **filters):
+        return self.aggregate('avg', column, **filters)
+
+    def total(self, column='Killed', **filters):
+        return self.aggregate('sum', column, **filters)
+
+    def above_average(self, column='Killed', fields=('Killed', 'Year', 'Rulling_Party')):
+        """Rows whose column exceeds its overall average"""
+        self._check_column(column)
+        for field in fields:
+            self._check_column(field)
+        return self.sql(f'SELECT {_quoted(fields)} FROM {TABLE} '
+                        f'WHERE "{column}" > (SELECT avg("{column}") FROM {TABLE})')
+
+    def average_by_party(self, party_col='Rulling_Party', column='Killed', **filters):
+        """Average of column per party, as the per-party avg() queries compute it"""
+        self._check_column(party_col)
+        self._check_column(column)
+        where, params = self._where(filters)
+        return self.sql(f'SELECT "{party_col}", avg("{column}") AS "Avg_{column}" FROM {TABLE}{where} '
+                        f'GROUP BY "{party_col}" ORDER BY "{party_col}"', params)
+
+    def assign_party_periods(self):
+        """Overwrite both party columns with UPDATEs like the script's, from GOVERNMENT_TERMS
+
+        The workbook already carries both columns; this labels tables that
+        lack them. party_periods.label_parties does the same on a DataFrame.
+        """
+        names = set(self.columns)
+        with self.connection:
+            for party_col in GOVERNMENT_TERMS:
+                default, periods = year_ranges(party_col)
+                if party_col not in names:
+                    self.connection.execute(f'ALTER TABLE {TABLE} ADD "{party_col}" TEXT')
+                    self.connection.execute(
+                        f'CREATE INDEX IF NOT EXISTS idx_{party_col.lower()} ON {TABLE} ("{party_col}")')
+                self.connection.execute(f'UPDATE {TABLE} SET "{party_col}" = NULL')
+                for party, first, last in periods:
+                    if last is None:
+                        self.connection.execute(f'UPDATE {TABLE} SET "{party_col}" = ? WHERE Year >= ?',
+                                                (party, first))
+                    else:
+                        self.connection.execute(
+                            f'UPDATE {TABLE} SET "{party_col}" = ? WHERE Year BETWEEN ? AND ?',
+                            (party, first, last))
+                self.connection.execute(f'UPDATE {TABLE} SET "{party_col}" = ? WHERE "{party_col}" IS NULL',
+                                        (default,))
+
+    def query_plan(self, statement, params=()):
+        """SQLite's EXPLAIN QUERY PLAN lines, e.g. to confirm an index is used"""
+        return [row[-1] for row in self.connection.execute(f'EXPLAIN QUERY PLAN {statement}', params)]
+
+
+def canned_report(db):
+    """The queries of docs/SQLQuery1.sql as (description, result) pairs"""
+    return [
+        ('Rows with above-average killings', db.above_average()),
+        ('Average killings', db.average()),
+        ('Average killings by Bangladesh ruling party', db.average_by_party('Rulling_Party')),
+        ('Average killings by India ruling party', db.average_by_party('Rulling_Party_India')),
+        ('Average rape after 1999, BNP', db.average('Rape', Year__gt=1999, Rulling_Party='BNP')),
+        ('Average rape after 1999, others', db.average('Rape', Year__gt=1999, Rulling_Party='others')),
+        ('Total killed 2002-2012', db.total('Killed', Year__gt=2001, Year__lt=2013)),
+        ('Total injured 2002-2012', db.total('Injured', Year__gt=2001, Year__lt=2013)),
+        ('Total killed after 2010', db.total('Killed', Year__gt=2010)),
+        ('Average missing after 1999, BNP', db.average('Missing', Year__gt=1999, Rulling_Party='BNP')),
+    ]
+
+
+def main(argv=None):
+    """Load the workbook into SQLite and print the canned queries"""
+    parser = argparse.ArgumentParser(description='Run the docs/SQLQuery1.sql queries on an embedded database')
+    parser.add_argument('--data', default=str(Path(__file__).parent.parent.parent / 'data' / 'border-inc.xlsx'))
+    parser.add_argument('--db', default=':memory:', help='SQLite file to create (default: in memory)')
+    parser.add_argument('--assign-periods', action='store_true',
+                        help='Recompute the party columns from the government-term table')
+    args = parser.parse_args(argv)
+
+    with IncidentDatabase.from_workbook(args.data, args.db) as db:
+        if args.assign_periods:
+            db.assign_party_periods()
+        for description, result in canned_report(db):
+            print(f"\n=== {description.upper()} ===")
+            print(result.to_string(index=False) if isinstance(result, pd.DataFrame) else result)
+
+
+if __name__ == "__main__":
+    main()
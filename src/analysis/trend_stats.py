@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Trend Statistics - Least-squares trends from moment sums, without per-fit polyfit
+Global, rolling-window and per-segment (e.g. per government term) slopes are
+read off cumulative sums in O(n); bootstrap confidence bands and permutation
+tests fit thousands of resamples at once as batched array operations
+"""
+
+import numpy as np
+
+DEFAULT_RESAMPLES = 2000
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _xy(x, y):
+    """x and y as float arrays with the pairs containing NaN dropped"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    return x[keep], y[keep]
+
+
+def _fit_from_sums(n, sx, sy, sxx, sxy):
+    """Slopes and intercepts from (arrays of) n, Σx, Σy, Σx², Σxy; NaN where x does not vary"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sxx_c = sxx - sx * sx / n
+        slopes = np.where(sxx_c > 0, (sxy - sx * sy / n) / sxx_c, np.nan)
+        intercepts = (sy - slopes * sx) / n
+    return slopes, intercepts
+
+
+def linear_fit(x, y):
+    """(slope, intercept) of the least-squares line, as np.polyfit(x, y, 1) returns them"""
+    x, y = _xy(x, y)
+    # Centering keeps the sums well conditioned for calendar years
+    x0, y0 = x.mean(), y.mean()
+    xc, yc = x - x0, y - y0
+    slope, intercept = _fit_from_sums(len(x), xc.sum(), yc.sum(), xc @ xc, xc @ yc)
+    return float(slope), float(intercept + y0 - slope * x0)
+
+
+def fitted_line(x, slope, intercept):
+    return intercept + slope * np.asarray(x, dtype=np.float64)
+
+
+def rolling_slopes(x, y, window):
+    """Slope and intercept of every `window` consecutive points
+
+    Element i is the fit over points i .. i + window - 1, so there are
+    len(x) - window + 1 fits, all taken from differences of cumulative sums.
+    """
+    x, y = _xy(x, y)
+    if window < 2 or window > len(x):
+        raise ValueError(f"window must be between 2 and {len(x)}")
+    x0, y0 = x.mean(), y.mean()
+    xc, yc = x - x0, y - y0
+
+    def windowed(values):
+        total = np.concatenate(([0.0], np.cumsum(values)))
+        return total[window:] - total[:-window]
+
+    slopes, intercepts = _fit_from_sums(window, windowed(xc), windowed(yc), windowed(xc * xc), windowed(xc * yc))
+    return slopes, intercepts + y0 - slopes * x0
+
+
+def segment_ids(labels):
+    """Run number of each element: consecutive equal labels share a segment"""
+    labels = np.asarray(labels)
+    if not len(labels):
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(([0], np.cumsum(labels[1:] != labels[:-1]))).astype(np.int64)
+
+
+def segmented_fits(x, y, segments):
+    """Slope and intercept per segment id (0 .. max); NaN for single-point segments"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    segments = np.asarray(segments, dtype=np.int64)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    x, y, segments = x[keep], y[keep], segments[keep]
+    x0, y0 = x.mean(), y.mean()
+    xc, yc = x - x0, y - y0
+    size = int(segments.max()) + 1 if len(segments) else 0
+
+    def sums(weights=None):
+        return np.bincount(segments, weights=weights, minlength=size)
+
+    slopes, intercepts = _fit_from_sums(sums(), sums(xc), sums(yc), sums(xc * xc), sums(xc * yc))
+    return slopes, intercepts + y0 - slopes * x0
+
+
+def piecewise_line(x, segments, slopes, intercepts):
+    """Each point's value on its own segment's line"""
+    segments = np.asarray(segments, dtype=np.int64)
+    return intercepts[segments] + slopes[segments] * np.asarray(x, dtype=np.float64)
+
+
+def _batches(total, batch_size):
+    for start in range(0, total, batch_size):
+        yield min(batch_size, total - start)
+
+
+def bootstrap_fits(x, y, n_resamples=DEFAULT_RESAMPLES, seed=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Slopes and intercepts of n_resamples case-resampled fits
+
+    Each batch draws a (batch, n) index matrix and reduces it to moment
+    sums along axis 1, so memory stays at batch_size x n values.
+    """
+    x, y = _xy(x, y)
+    n = len(x)
+    x0, y0 = x.mean(), y.mean()
+    xc, yc = x - x0, y - y0
+    rng = np.random.default_rng(seed)
+    slopes, intercepts = [], []
+    for size in _batches(n_resamples, batch_size):
+        index = rng.integers(0, n, size=(size, n))
+        xs, ys = xc[index], yc[index]
+        s, i = _fit_from_sums(n, xs.sum(axis=1), ys.sum(axis=1),
+                              np.einsum('ij,ij->i', xs, xs), np.einsum('ij,ij->i', xs, ys))
+        slopes.append(s)
+        intercepts.append(i + y0 - s * x0)
+    if not slopes:
+        return np.zeros(0), np.zeros(0)
+    return np.concatenate(slopes), np.concatenate(intercepts)
+
+
+def confidence_band(x, slopes, intercepts, level=0.95, batch_size=DEFAULT_BATCH_SIZE):
+    """(lower, upper) percentile band of the resampled lines at each x"""
+    x = np.asarray(x, dtype=np.float64)
+    valid = ~np.isnan(slopes)
+    slopes, intercepts = slopes[valid], intercepts[valid]
+    alpha = (1 - level) / 2
+    lower, upper = np.empty(len(x)), np.empty(len(x))
+    # Column batches keep the (resamples x points) prediction matrix near batch_size² values
+    columns = max(1, batch_size * batch_size // max(len(slopes), 1))
+    for start in range(0, len(x), columns):
+        block = intercepts[:, None] + slopes[:, None] * x[None, start:start + columns]
+        lower[start:start + columns], upper[start:start + columns] = np.quantile(block, [alpha, 1 - alpha], axis=0)
+    return lower, upper
+
+
+def permutation_test(x, y, n_permutations=DEFAULT_RESAMPLES, seed=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Two-sided p-value of the observed slope against slopes of shuffled y
+
+    With x fixed the slope is linear in y, so a batch of permutations is a
+    single (batch, n) @ (n,) product.
+    """
+    x, y = _xy(x, y)
+    xc = x - x.mean()
+    sxx = xc @ xc
+    if sxx == 0:
+        return np.nan
+    observed = abs((y - y.mean()) @ xc / sxx)
+    rng = np.random.default_rng(seed)
+    extreme = 0
+    for size in _batches(n_permutations, batch_size):
+        shuffled = y[np.argsort(rng.random((size, len(y))), axis=1)]
+        # Small tolerance so exact ties with the observed slope count as extreme
+        extreme += int(np.count_nonzero(np.abs(shuffled @ xc / sxx) >= observed * (1 - 1e-12)))
+    return (extreme + 1) / (n_permutations + 1)
+
+
+def trend_statistics(x, y, segments=None, window=None, n_resamples=DEFAULT_RESAMPLES, level=0.95, seed=0):
+    """Trend summary for plotting and reports
+
+    Always has the global 'slope', 'intercept' and fitted 'trend' values;
+    n_resamples > 0 adds a bootstrap 'band' at `level`, a 'slope_interval'
+    and a permutation 'p_value'. segments (one id per point) adds
+    'segment_slopes' and the 'piecewise' line; window adds 'rolling_slopes'.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    slope, intercept = linear_fit(x, y)
+    stats = {'slope': slope, 'intercept': intercept, 'trend': fitted_line(x, slope, intercept)}
+    if n_resamples:
+        slopes, intercepts = bootstrap_fits(x, y, n_resamples, seed)
+        stats['band'] = confidence_band(x, slopes, intercepts, level)
+        alpha = (1 - level) / 2
+        stats['slope_interval'] = tuple(np.nanquantile(slopes, [alpha, 1 - alpha]).tolist())
+        stats['p_value'] = permutation_test(x, y, n_resamples, seed)
+    if segments is not None:
+        seg_slopes, seg_intercepts = segmented_fits(x, y, segments)
+        stats['segment_slopes'] = seg_slopes
+        stats['piecewise'] = piecewise_line(x, segments, seg_slopes, seg_intercepts)
+    if window:
+        stats['rolling_slopes'] = rolling_slopes(x, y, window)[0]
+    return stats
@@ -0,0 +1,10 @@
+"""Make the flat analysis scripts importable the way they import each other"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ANALYSIS_DIR = PROJECT_ROOT / 'src' / 'analysis'
+for path in (ANALYSIS_DIR, PROJECT_ROOT):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregation import STATS, GroupedAggregates
+
+
+def party_frame(n=200):
+    rng = np.random.default_rng(0)
+    killed = rng.integers(0, 60, n).astype(float)
+    killed[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame({
+        'Years': rng.integers(1996, 2024, n),
+        'Rulling_Party': rng.choice(['BAL', 'BNP', 'Caretaker', None], n),
+        'Killed': killed,
+        'Injured': rng.integers(0, 40, n),
+    })
+
+
+@pytest.mark.parametrize('key', ['Years', 'Rulling_Party'])
+@pytest.mark.parametrize('stat', STATS)
+def test_stats_match_pandas_groupby(key, stat):
+    frame = party_frame()
+    aggregates = GroupedAggregates(frame, ['Years', 'Rulling_Party'], ['Killed', 'Injured'])
+    for value in aggregates.values:
+        expected = frame.groupby(key)[value].agg(stat)
+        pd.testing.assert_series_equal(aggregates.stat(key, value, stat), expected,
+                                       check_dtype=False, check_index_type=False)
+
+
+def test_integer_sums_stay_integer():
+    aggregates = GroupedAggregates(party_frame(), ['Rulling_Party'], ['Killed', 'Injured'])
+    assert aggregates.stat('Rulling_Party', 'Injured', 'sum').dtype == np.int64
+    assert aggregates.stat('Rulling_Party', 'Killed', 'sum').dtype == np.float64
+    table = aggregates.table('Rulling_Party', 'Injured')
+    assert list(table.columns) == list(STATS)
+    assert list(table.index) == ['BAL', 'BNP', 'Caretaker']
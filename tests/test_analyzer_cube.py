@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+from border_killings_analysis import BorderKillingsAnalyzer
+
+NEW_YEAR = pd.DataFrame({'Years': [2030], 'Killed': [5],
+                         'Rulling_Party': ['BAL'], 'Rulling_Party_India': ['BJP']})
+
+
+def test_rollup_cube_returns_an_independent_copy(tmp_path):
+    analyzer = BorderKillingsAnalyzer(compact=True, cache_dir=tmp_path / 'cache')
+    assert analyzer.load_data()
+    cube = analyzer.rollup_cube()
+    rows = cube.n_rows
+    cube.append(NEW_YEAR)
+    assert analyzer.rollup_cube().n_rows == rows
+    assert analyzer.rollup_cube() is not analyzer.rollup_cube()
+
+    analyzer.append_data(NEW_YEAR)
+    assert analyzer.rollup_cube().n_rows == rows + 1
+    assert analyzer.rollup_cube().query('Killed', where={'Years': 2030}) == 5.0
+
+
+def test_rollup_cube_needs_the_table_in_memory(tmp_path):
+    analyzer = BorderKillingsAnalyzer(memory_limit_mb=64, cache_dir=tmp_path / 'cache')
+    assert analyzer.load_data()
+    assert analyzer.rollup_cube() is None
+
+
+def test_chunked_append_skips_years_already_aggregated(tmp_path):
+    analyzer = BorderKillingsAnalyzer(memory_limit_mb=64, cache_dir=tmp_path / 'cache')
+    assert analyzer.load_data()
+    assert analyzer.append_data(NEW_YEAR) == 1
+    rows = analyzer.get_aggregates().n_rows
+    assert analyzer.append_data(NEW_YEAR) == 0
+    assert analyzer.get_aggregates().n_rows == rows
+    with pytest.raises(ValueError, match='2030'):
+        analyzer.append_data(NEW_YEAR.assign(Killed=6))
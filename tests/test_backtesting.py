@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting import (METRIC_NAMES, MOVING_AVERAGE_WINDOW, SES_ALPHA_GRID, actual_matrix,
+                         baseline_forecasts, run_backtest, score_forecasts, window_matrix)
+
+HORIZON = 3
+
+
+def yearly_values(n=30):
+    rng = np.random.default_rng(1)
+    return 60 + np.cumsum(rng.normal(0, 4, n)).clip(1)
+
+
+def ses_level(train):
+    best = None
+    for alpha in SES_ALPHA_GRID:
+        level, sse = train[0], 0.0
+        for obs in train[1:]:
+            sse += (obs - level) ** 2
+            level += alpha * (obs - level)
+        if best is None or sse < best[0]:
+            best = (sse, level)
+    return best[1]
+
+
+def loop_forecasts(train):
+    """The baselines of one origin, fitted the slow way"""
+    steps = np.arange(1, HORIZON + 1)
+    x = np.arange(len(train))
+    slope, intercept = np.polyfit(x, train, 1)
+    log_slope, log_intercept = np.polyfit(x, np.log(train), 1)
+    return {
+        'Naive': np.full(HORIZON, train[-1]),
+        'Average': np.full(HORIZON, train.mean()),
+        'Moving Avg': np.full(HORIZON, train[-MOVING_AVERAGE_WINDOW:].mean()),
+        'SES': np.full(HORIZON, ses_level(train)),
+        'Linear Trend': intercept + slope * (len(train) - 1 + steps),
+        'Exponential Trend': np.exp(log_intercept + log_slope * (len(train) - 1 + steps)),
+    }
+
+
+@pytest.mark.parametrize('window', [None, 8])
+def test_window_matrix_matches_slicing(window):
+    y = yearly_values()
+    origins = np.arange(10, len(y))
+    windows = window_matrix(y, origins, window)
+    for row, t in zip(windows, origins):
+        train = y[:t] if window is None else y[t - window:t]
+        np.testing.assert_array_equal(row[~np.isnan(row)], train)
+    actual = actual_matrix(y, origins, HORIZON)
+    np.testing.assert_array_equal(actual[0], y[10:10 + HORIZON])
+    assert np.isnan(actual[-1, 1:]).all()
+
+
+@pytest.mark.parametrize('window', [None, 8])
+def test_baseline_kernels_match_a_per_origin_loop(window):
+    y = yearly_values()
+    origins = np.arange(10, len(y))
+    forecasts = baseline_forecasts(y, origins, HORIZON, window)
+    for i, t in enumerate(origins):
+        train = y[:t] if window is None else y[t - window:t]
+        for name, expected in loop_forecasts(train).items():
+            np.testing.assert_allclose(forecasts[name][i], expected, rtol=1e-9, err_msg=name)
+
+
+def test_exponential_trend_is_undefined_for_non_positive_history():
+    y = yearly_values()
+    y[3] = 0.0
+    forecasts = baseline_forecasts(y, [10], HORIZON)
+    assert np.isnan(forecasts['Exponential Trend']).all()
+    assert not np.isnan(forecasts['Linear Trend']).any()
+
+
+def reference_metrics(forecast, actual):
+    keep = ~np.isnan(forecast) & ~np.isnan(actual)
+    forecast, actual = forecast[keep], actual[keep]
+    error = actual - forecast
+    mse = np.mean(error ** 2)
+    nonzero = actual != 0
+    return [np.mean(np.abs(error)), mse, np.sqrt(mse),
+            np.mean(np.abs(error[nonzero] / actual[nonzero])) * 100,
+            1 - np.sum(error ** 2) / np.sum((actual - actual.mean()) ** 2)]
+
+
+def test_score_forecasts_matches_the_metric_formulas():
+    rng = np.random.default_rng(2)
+    actual = rng.normal(40, 10, (12, HORIZON))
+    actual[0, 0] = 0.0
+    actual[-1, 1:] = np.nan
+    forecasts = actual + rng.normal(0, 5, (3, 12, HORIZON))
+    forecasts[1, 2, :] = np.nan
+    scores = score_forecasts(forecasts, actual)
+    assert scores.shape == (3, len(METRIC_NAMES))
+    for model, row in zip(forecasts, scores):
+        np.testing.assert_allclose(row, reference_metrics(model.ravel(), actual.ravel()))
+
+
+def test_run_backtest_metrics_by_horizon():
+    series = pd.Series(yearly_values(), index=range(1994, 2024))
+    result = run_backtest(series, horizon=HORIZON, include_statsmodels=False)
+    assert list(result.origin_labels) == list(range(2004, 2024))
+    by_horizon = result.metrics(by_horizon=True)
+    assert sorted(set(by_horizon['Horizon'])) == [1, 2, 3]
+    assert list(result.metrics().columns) == list(METRIC_NAMES)
+    with pytest.raises(ValueError):
+        run_backtest(series[:5], include_statsmodels=False)
@@ -0,0 +1,50 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks.synthetic import make_workbook_frame
+from border_killings_analysis import BorderKillingsAnalyzer
+import cli
+from cli import main, summarize_cached
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / 'border-inc.xlsx'
+    frame = make_workbook_frame(120, seed=2)
+    frame.to_excel(path, index=False)
+    return path
+
+
+def summary_lines(output):
+    lines = output.splitlines()
+    return lines[lines.index('=== SUMMARY STATISTICS ===') + 1:]
+
+
+def test_summarize_cached_matches_get_summary_stats(workbook, capsys):
+    assert summarize_cached(workbook) is None  # nothing cached yet
+    analyzer = BorderKillingsAnalyzer(workbook)
+    assert analyzer.load_data()
+    capsys.readouterr()
+    analyzer.get_summary_stats()
+    expected = summary_lines(capsys.readouterr().out)
+    assert summarize_cached(workbook) == expected
+    assert main(['summary', '--data', str(workbook)]) == 0
+    assert summary_lines(capsys.readouterr().out) == expected
+
+
+def test_cached_summary_does_not_import_pandas(workbook):
+    assert BorderKillingsAnalyzer(workbook).load_data()
+    script = (f"import sys; sys.path.insert(0, {str(Path(cli.__file__).parent)!r}); import cli; "
+              f"cli.main(['summary', '--data', {str(workbook)!r}]); "
+              "print(sorted(m for m in ('numpy', 'pandas', 'matplotlib') if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    assert 'Total killings' in result.stdout
+    assert result.stdout.splitlines()[-1] == '[]'
+
+
+def test_summary_reports_a_missing_workbook(tmp_path, capsys):
+    assert main(['summary', '--data', str(tmp_path / 'missing.xlsx')]) == 1
+    assert 'not found' in capsys.readouterr().out
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_workbook_frame
+from compact_frames import compact_frame, compact_numeric, read_excel_compact, smallest_int_dtype
+
+
+@pytest.mark.parametrize('minimum, maximum, expected', [
+    (0, 255, np.uint8), (0, 256, np.uint16), (-1, 127, np.int8), (-129, 0, np.int16),
+    (0, 2 ** 40, np.uint64), (-2 ** 40, 1, np.int64),
+])
+def test_smallest_int_dtype(minimum, maximum, expected):
+    assert smallest_int_dtype(minimum, maximum) == np.dtype(expected)
+
+
+def test_compact_numeric_keeps_values():
+    np.testing.assert_array_equal(compact_numeric(np.array([3, 200, 7])), [3, 200, 7])
+    assert compact_numeric(np.array([3, 200, 7])).dtype == np.uint8
+    assert compact_numeric(np.array([1.0, 2.5])).dtype == np.float64
+    with_missing = compact_numeric(np.array([4.0, np.nan, 300.0]))
+    assert str(with_missing.dtype) == 'UInt16'
+    assert with_missing.isna().tolist() == [False, True, False]
+    assert with_missing[2] == 300
+
+
+def test_compact_frame_round_trips_the_workbook_values():
+    frame = make_workbook_frame(400, seed=6).assign(Empty=np.nan)
+    compact = compact_frame(frame)
+    assert 'Empty' not in compact.columns
+    assert isinstance(compact['Rulling_Party'].dtype, pd.CategoricalDtype)
+    assert compact['Years'].dtype == np.uint16
+    assert compact.memory_usage(deep=True).sum() < frame.memory_usage(deep=True).sum()
+    for column in compact.columns:
+        if column.startswith('Rulling'):
+            assert compact[column].tolist() == frame[column].tolist(), column
+        else:
+            pd.testing.assert_series_equal(compact[column].astype('float64'), frame[column].astype('float64'))
+
+def test_read_excel_compact_matches_read_excel(tmp_path):
+    path = tmp_path / 'sheet.xlsx'
+    frame = make_workbook_frame(150, seed=7)
+    frame.insert(3, 'Blank', np.nan)
+    frame.to_excel(path, index=False)
+    expected = compact_frame(pd.read_excel(path))
+    pd.testing.assert_frame_equal(read_excel_compact(path), expected)
@@ -0,0 +1,98 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+pytest.importorskip('statsmodels')
+
+from forecast_service import ForecastService, WarmModel, make_handler
+
+MODELS = {
+    'Naive': ('baseline', {'name': 'Naive'}),
+    'ARIMA': ('arima', {'order': (1, 1, 0)}),
+    'Holt': ('ets', {'trend': 'add'}),
+}
+
+
+def yearly_series(n=40):
+    rng = np.random.default_rng(0)
+    return 50 + np.cumsum(rng.normal(0, 3, n))
+
+
+def test_warm_hit_does_not_refit():
+    service = ForecastService(models=MODELS)
+    service.register('s', yearly_series())
+    requests = [{'series_id': 's', 'model': name, 'horizon': [1, 3]} for name in MODELS]
+    first = service.predict(requests)
+    assert service.fits == len(MODELS)
+    assert service.predict(requests) == first
+    assert service.fits == len(MODELS)
+    assert service.info()['cache']['hits'] >= len(MODELS)
+
+
+@pytest.mark.parametrize('name', ['ARIMA', 'Holt'])
+def test_append_moves_the_model_and_tracks_a_full_refit(name):
+    y = yearly_series()
+    service = ForecastService(models=MODELS)
+    service.register('s', y[:-1])
+    service.predict([{'series_id': 's', 'model': name, 'horizon': 3}])
+    service.append('s', y[-1:])
+    result = service.predict([{'series_id': 's', 'model': name, 'horizon': 3}])[0]
+    assert (service.fits, service.extensions) == (1, 1)
+    assert result['n_obs'] == len(y)
+    kind, params = MODELS[name]
+    np.testing.assert_allclose(result['forecasts']['3'], WarmModel(kind, params, y).forecast(3), rtol=0.02)
+
+
+def test_longer_request_series_extends_the_prefix_model():
+    y = yearly_series()
+    service = ForecastService(models=MODELS)
+    service.forecast(y[:-2], 'Holt', 2)
+    service.forecast(y, 'Holt', 2)
+    assert (service.fits, service.extensions) == (1, 1)
+
+
+@pytest.fixture
+def server():
+    service = ForecastService(models=MODELS)
+    service.register('s', yearly_series())
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(service))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def post(httpd, path, payload):
+    host, port = httpd.server_address[:2]
+    request = urllib.request.Request(f'http://{host}:{port}{path}', data=json.dumps(payload).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_http_forecast(server):
+    status, body = post(server, '/forecast', {'series_id': 's', 'model': 'Naive', 'horizon': [1, 2]})
+    assert status == 200
+    assert sorted(body['results'][0]['forecasts']) == ['1', '2']
+
+
+@pytest.mark.parametrize('payload', [
+    {'series_id': 's', 'model': 'Naive', 'horizon': '12'},
+    {'series_id': 's', 'model': 'Naive', 'horizon': 0},
+    {'series': [], 'model': 'Naive', 'horizon': 1},
+    {'series': [3.0], 'model': 'Naive', 'horizon': 1},
+    {'series_id': 'missing', 'model': 'Naive'},
+    {'series_id': 's', 'model': 'Unknown'},
+])
+def test_http_bad_request(server, payload):
+    status, body = post(server, '/forecast', payload)
+    assert status == 400
+    assert body['error']
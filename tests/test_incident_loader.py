@@ -0,0 +1,49 @@
+import io
+import json
+
+import pytest
+
+from incident_loader import IncidentColumns, _iter_array, _StreamReader
+
+INCIDENTS = [
+    {'name': 'Abé "Tiklu"', 'date': '2024-01-28', 'location': 'Patgram', 'lat': 26.3167, 'lon': -89.0167,
+     'description': 'Line one\nline two \\ done', 'tags': [True, False, None], 'score': -1.5e-3},
+    {'name': 'Swarna Das', 'date': '2023-09-01', 'location': None, 'lat': None, 'lon': None},
+]
+
+
+class CountingReader(io.StringIO):
+    """StringIO that records how many characters were read"""
+
+    consumed = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.consumed += len(chunk)
+        return chunk
+
+
+@pytest.mark.parametrize('ensure_ascii', [True, False])
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 8, 13])
+def test_values_split_across_chunks(chunk_size, ensure_ascii):
+    text = json.dumps(INCIDENTS, ensure_ascii=ensure_ascii, indent=2)
+    reader = _StreamReader(io.StringIO(text), chunk_size=chunk_size)
+    assert list(_iter_array(reader)) == INCIDENTS
+
+
+def test_syntax_error_does_not_read_to_the_end():
+    text = '[{"name": "a", "date": nope}, ' + ', '.join(['{"name": "b"}'] * 10000) + ']'
+    f = CountingReader(text)
+    with pytest.raises(json.JSONDecodeError):
+        list(_iter_array(_StreamReader(f, chunk_size=64)))
+    assert f.consumed <= 128
+
+
+def test_append_after_to_frame():
+    columns = IncidentColumns()
+    columns.append(INCIDENTS[0])
+    frame = columns.to_frame()
+    columns.append(INCIDENTS[1])
+    assert len(frame) == 1 and frame['lat'].tolist() == [26.3167]
+    assert columns.to_frame()['location'].tolist()[0] == 'Patgram'
+    assert len(columns.to_frame()) == 2
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from incremental import append_locations_file
+
+INCIDENTS = [
+    {'name': 'A', 'date': '2024-01-22', 'location': 'Jessore', 'lat': 23.17, 'lon': 88.98},
+    {'name': 'B', 'date': '2024-02-03', 'location': 'Lalmonirhat', 'lat': 26.32, 'lon': 89.02},
+    {'name': 'C', 'date': '2024-03-11', 'location': 'Chapainawabganj', 'lat': 24.6, 'lon': 88.27},
+]
+STATS = [{'year': 2023, 'killed': 31}, {'year': 2024, 'killed': 30}]
+
+
+def write_document(path, incidents, stats):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'incidents': incidents, 'yearly_stats': stats}, f, indent=4, ensure_ascii=False)
+
+
+def test_append_twice_keeps_layout_and_skips_repeats(tmp_path):
+    path = tmp_path / 'locations.json'
+    write_document(path, INCIDENTS[:2], STATS[:1])
+    delta = {'incidents': INCIDENTS[1:], 'yearly_stats': STATS[1:]}
+    extras, added = append_locations_file(path, delta)
+    assert added == {'incidents': INCIDENTS[2:], 'yearly_stats': STATS[1:]}
+    assert extras['yearly_stats'] == STATS
+    expected = json.dumps({'incidents': INCIDENTS, 'yearly_stats': STATS}, indent=4, ensure_ascii=False)
+    assert path.read_text(encoding='utf-8') == expected
+
+    _, added = append_locations_file(path, delta)
+    assert added == {'incidents': [], 'yearly_stats': []}
+    assert path.read_text(encoding='utf-8') == expected
+
+
+def test_append_rejects_conflicting_incident(tmp_path):
+    path = tmp_path / 'locations.json'
+    write_document(path, INCIDENTS, STATS)
+    before = path.read_text(encoding='utf-8')
+    changed = dict(INCIDENTS[1], location='Patgram')
+    with pytest.raises(ValueError, match="'B'"):
+        append_locations_file(path, {'incidents': [changed]})
+    assert path.read_text(encoding='utf-8') == before
@@ -0,0 +1,60 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from ingest_cache import build_cache, frame_from_cache, has_mixed_columns, read_excel_cached
+
+
+def sample_frame():
+    return pd.DataFrame({
+        'Years': [2019, 2020, 2021],
+        'Killed': [41.0, 51.0, None],
+        'Party': ['BAL', 'BAL', None],
+        'Reported': pd.to_datetime(['2020-01-05', '2021-01-07', None]),
+        'Checked': pd.Series([datetime.datetime(2020, 2, 1), None, datetime.datetime(2022, 3, 4)],
+                             dtype=object),
+        'Local': pd.to_datetime(['2020-01-05 10:00', '2021-01-07 11:30', None]).tz_localize('Asia/Dhaka'),
+    })
+
+
+def test_datetime_columns_stay_typed(tmp_path):
+    source = tmp_path / 'source.xlsx'
+    source.write_bytes(b'placeholder')
+    frame = sample_frame()
+    manifest = build_cache(frame, source, tmp_path / 'cache')
+    cached = frame_from_cache(manifest, tmp_path / 'cache')
+    assert not has_mixed_columns(manifest)
+    assert pd.api.types.is_datetime64_any_dtype(cached['Checked'])
+    pd.testing.assert_series_equal(cached['Reported'], frame['Reported'], check_dtype=False)
+    pd.testing.assert_series_equal(cached['Checked'], pd.to_datetime(frame['Checked']), check_dtype=False)
+    pd.testing.assert_series_equal(cached['Local'], frame['Local'], check_dtype=False)
+    assert cached['Party'].tolist()[:2] == ['BAL', 'BAL']
+
+
+def test_mixed_object_column_is_read_from_the_source(tmp_path):
+    source = tmp_path / 'mixed.xlsx'
+    pd.DataFrame({'Years': [2019, 2020], 'Note': [12, 'late report']}).to_excel(source, index=False)
+    cache_dir = tmp_path / 'cache'
+    for _ in range(2):
+        frame = read_excel_cached(source, cache_dir)
+        assert frame['Note'].tolist() == [12, 'late report']
+    manifest = build_cache(frame, source, cache_dir)
+    assert has_mixed_columns(manifest)
+    with pytest.raises(ValueError):
+        frame_from_cache(manifest, cache_dir)
+    assert frame_from_cache(manifest, cache_dir, columns=['Years'])['Years'].tolist() == [2019, 2020]
+
+
+def test_rebuild_keeps_the_previous_version_readable(tmp_path):
+    source = tmp_path / 'source.xlsx'
+    source.write_bytes(b'placeholder')
+    cache_dir = tmp_path / 'cache'
+    first = build_cache(sample_frame(), source, cache_dir)
+    second = build_cache(sample_frame().assign(Years=[2022, 2023, 2024]), source, cache_dir)
+    assert first['columns_dir'] != second['columns_dir']
+    assert frame_from_cache(first, cache_dir)['Years'].tolist() == [2019, 2020, 2021]
+    third = build_cache(sample_frame(), source, cache_dir)
+    assert not (cache_dir / first['columns_dir']).exists()
+    assert frame_from_cache(second, cache_dir)['Years'].tolist() == [2022, 2023, 2024]
+    assert frame_from_cache(third, cache_dir)['Years'].tolist() == [2019, 2020, 2021]
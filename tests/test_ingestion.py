@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ingestion import HttpCache, Source, ingest_source
+
+CSV = b'Years,Killed\n2019,41\n2020,51\n'
+ETAG = '"v1"'
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(self.server.delay)
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(CSV)))
+        self.end_headers()
+        self.wfile.write(CSV)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.delay = 0.0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def url_of(httpd):
+    host, port = httpd.server_address[:2]
+    return f'http://{host}:{port}/sheet.csv'
+
+
+def fetch(url, cache, timeout=5.0):
+    return asyncio.run(ingest_source(Source('sheet', url, kind='csv', timeout=timeout), cache))
+
+
+def test_download_then_not_modified(server, tmp_path):
+    cache = HttpCache(tmp_path)
+    first = fetch(url_of(server), cache)
+    assert first.ok and first.status == 'downloaded'
+    assert first.data['Killed'].tolist() == [41, 51]
+    second = fetch(url_of(server), cache)
+    assert second.ok and second.status == 'not-modified'
+    assert second.data['Years'].tolist() == [2019, 2020]
+
+
+def test_stale_copy_when_server_is_down(server, tmp_path):
+    cache = HttpCache(tmp_path)
+    url = url_of(server)
+    assert fetch(url, cache).status == 'downloaded'
+    server.shutdown()
+    server.server_close()
+    result = fetch(url, cache)
+    assert result.ok and result.status == 'stale'
+    assert result.data['Killed'].tolist() == [41, 51]
+
+
+def test_timeout_falls_back_to_cached_copy(server, tmp_path):
+    cache = HttpCache(tmp_path)
+    assert fetch(url_of(server), cache).status == 'downloaded'
+    server.delay = 1.0
+    result = fetch(url_of(server), cache, timeout=0.2)
+    assert result.ok and result.status == 'stale'
+    assert result.data['Years'].tolist() == [2019, 2020]
+
+
+def test_timeout_without_cached_copy_fails(server, tmp_path):
+    server.delay = 1.0
+    result = fetch(url_of(server), HttpCache(tmp_path), timeout=0.2)
+    assert not result.ok and result.status == 'failed'
+    assert 'timed out' in result.error
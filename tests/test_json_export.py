@@ -0,0 +1,52 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+
+import numpy as np
+import pytest
+
+from json_export import WRITE_BUFFER_SIZE, prune_hashed_siblings, typed_column, write_json_stream
+
+
+@pytest.mark.parametrize('dtype', ['<f8', '<f4', '<i4'])
+def test_typed_column_round_trip(dtype):
+    values = [1.5, -2.0, 3.25, 0.0] if dtype != '<i4' else [1, -2, 3, 0]
+    column = typed_column(values, dtype)
+    assert column['dtype'] == dtype
+    decoded = np.frombuffer(base64.b64decode(column['b64']), dtype=column['dtype'])
+    np.testing.assert_array_equal(decoded, values)
+
+
+def test_typed_column_keeps_nan_out_of_the_json_text():
+    column = typed_column([12.5, np.nan])
+    text = json.dumps(column, allow_nan=False)
+    decoded = np.frombuffer(base64.b64decode(json.loads(text)['b64']), dtype='<f8')
+    assert decoded[0] == 12.5 and np.isnan(decoded[1])
+
+
+def test_stream_matches_compact_dumps_and_gzip_sibling(tmp_path):
+    document = {'labels': [f'Model {i}' for i in range(WRITE_BUFFER_SIZE // 8)], 'name': 'Régime'}
+    expected = json.dumps(document, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    path, sha256 = write_json_stream(document, tmp_path / 'data.json', gzip_copy=True, hashed_name=True)
+    assert path.name == f'data.{sha256[:12]}.json'
+    assert path.read_bytes() == expected
+    assert sha256 == hashlib.sha256(expected).hexdigest()
+    assert gzip.decompress(path.with_name(path.name + '.gz').read_bytes()) == expected
+    assert sorted(p.name for p in tmp_path.iterdir()) == [path.name, path.name + '.gz']
+
+
+def test_stream_rejects_nan(tmp_path):
+    with pytest.raises(ValueError):
+        write_json_stream({'value': float('nan')}, tmp_path / 'data.json')
+
+
+def test_prune_keeps_only_the_current_version(tmp_path):
+    old, _ = write_json_stream({'v': 1}, tmp_path / 'data.json', gzip_copy=True, hashed_name=True)
+    os.utime(old, (0, 0))
+    current, _ = write_json_stream({'v': 2}, tmp_path / 'data.json', gzip_copy=True, hashed_name=True)
+    (tmp_path / 'data_manifest.json').write_text('{}')
+    prune_hashed_siblings(current)
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        ['data_manifest.json', current.name, current.name + '.gz'])
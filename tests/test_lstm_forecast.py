@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip('torch')
+
+from lstm_forecast import LSTMForecaster
+
+
+def small_forecaster(**params):
+    return LSTMForecaster(window=4, horizon=2, hidden_size=4, num_layers=1, max_epochs=3, **params)
+
+
+def test_fit_and_forecast_shapes():
+    series = np.sin(np.arange(40) / 3.0) * 10 + 30
+    model = small_forecaster().fit(series)
+    assert model.epochs_run >= 1
+    assert model.forecast(5).shape == (5,)
+    assert model.predict(np.vstack([series[-4:], series[-8:-4]])).shape == (2, 2)
+
+
+def test_fit_survives_nan_validation_losses():
+    series = np.arange(40, dtype=np.float64)
+    # An infinite learning rate drives every weight, and so every validation loss, to NaN
+    model = small_forecaster(learning_rate=float('inf')).fit(series)
+    assert model.best_loss == np.inf
+    assert model.forecast(2).shape == (2,)
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from model_search import SEARCH_SPACES, complexity, describe, search_candidates, search_models
+
+TINY_SPACE = {'ARIMA': {'p': range(0, 4), 'd': (1,), 'q': (0,)}}
+
+
+def yearly_series(n=30):
+    rng = np.random.default_rng(5)
+    return 70 + np.cumsum(rng.normal(-0.5, 4, n))
+
+
+def test_candidates_skip_duplicate_structures():
+    candidates = search_candidates()
+    sarima = [params for family, _, params in candidates if family == 'SARIMA']
+    assert all(any(params['seasonal_order'][:3]) for params in sarima)
+    ets = [params for family, _, params in candidates if family == 'ETS']
+    assert not any(params['damped_trend'] and params['trend'] is None for params in ets)
+    assert len({describe(kind, params) for _, kind, params in candidates}) == len(candidates)
+    assert len([c for c in candidates if c[0] == 'ARIMA']) == len(SEARCH_SPACES['ARIMA']['p']) * 3 * 4
+
+
+def test_random_strategy_samples_the_grid():
+    grid = search_candidates()
+    sample = search_candidates(strategy='random', n_samples=12, seed=1)
+    assert len(sample) == 12 and all(c in grid for c in sample)
+    assert sample == search_candidates(strategy='random', n_samples=12, seed=1)
+    with pytest.raises(ValueError):
+        search_candidates(strategy='bayes')
+
+
+@pytest.mark.parametrize('kind, params, expected_complexity, label', [
+    ('arima', {'order': (2, 1, 1)}, 3, 'ARIMA(2,1,1)'),
+    ('arima', {'order': (1, 1, 0), 'seasonal_order': (1, 0, 1, 12)}, 3, 'ARIMA(1,1,0)(1,0,1)[12]'),
+    ('ets', {'trend': 'add', 'damped_trend': True, 'seasonal': 'add', 'seasonal_periods': 12}, 3,
+     'ETS(add, damped, add/12)'),
+    ('ets', {'trend': None, 'damped_trend': False, 'seasonal': None}, 0, 'ETS(none)'),
+])
+def test_complexity_and_labels(kind, params, expected_complexity, label):
+    assert complexity(kind, params) == expected_complexity
+    assert describe(kind, params) == label
+
+
+def test_search_prunes_and_caches(tmp_path):
+    pytest.importorskip('statsmodels')
+    train = yearly_series()
+    options = dict(families=('ARIMA',), spaces=TINY_SPACE, patience=1, margin=1e9, max_workers=2)
+    first = search_models(train, cache_dir=tmp_path, **options)
+    statuses = {r['params']['order'][0]: r['status'] for r in first.records}
+    # Round 1 cannot beat round 0 by the margin, so the group is pruned after it
+    assert statuses == {0: 'ok', 1: 'ok', 2: 'pruned', 3: 'pruned'}
+    assert len(list(tmp_path.glob('*.json'))) == 2
+    assert list(first.auto_models()) == ['Auto-ARIMA']
+
+    second = search_models(train, cache_dir=tmp_path, **options)
+    fitted = [r for r in second.records if r['status'] == 'ok']
+    assert len(fitted) == 2 and all(r['cached'] for r in fitted)
+    assert [(r['aicc'], r['rmse']) for r in fitted] == [(r['aicc'], r['rmse']) for r in first.scored()]
+    assert second.winners() == first.winners()
+
+
+def test_search_without_pruning_fits_every_candidate():
+    pytest.importorskip('statsmodels')
+    result = search_models(yearly_series(), families=('ARIMA',), spaces=TINY_SPACE, patience=10,
+                           max_workers=2, cache_dir=None)
+    assert result.counts() == {'ok': 4}
+    table = result.table()
+    assert table['rmse'].is_monotonic_increasing
+    assert describe(*result.winners()['ARIMA']) == table['model'][0]
+    with pytest.raises(ValueError):
+        search_models(yearly_series(5), cache_dir=None)
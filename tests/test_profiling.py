@@ -0,0 +1,102 @@
+import json
+import threading
+
+import pytest
+
+from profiling import Profiler, null_span, profiled
+
+
+def nested_spans(profiler):
+    with profiler.span('load', source='xlsx') as attrs:
+        with profiler.span('read'):
+            pass
+        with profiler.span('clean') as inner:
+            inner['rows'] = 53
+        attrs['rows'] = 53
+
+
+def test_spans_record_nesting_and_attrs():
+    finished = []
+    profiler = Profiler(callbacks=[lambda record: finished.append(record['name'])])
+    nested_spans(profiler)
+    assert finished == ['read', 'clean', 'load']
+    spans = {record['name']: record for record in profiler.spans}
+    assert [(spans[n]['depth'], spans[n]['parent']) for n in ('load', 'read', 'clean')] == [
+        (0, None), (1, 'load'), (1, 'load')]
+    assert spans['load']['attrs'] == {'source': 'xlsx', 'rows': 53}
+    assert spans['clean']['attrs'] == {'rows': 53}
+    load, read, clean = spans['load'], spans['read'], spans['clean']
+    assert load['start_us'] <= read['start_us'] <= clean['start_us']
+    assert load['duration_ms'] >= read['duration_ms'] + clean['duration_ms']
+
+
+def test_span_is_recorded_when_the_block_raises():
+    profiler = Profiler()
+    with pytest.raises(KeyError):
+        with profiler.span('outer'):
+            with profiler.span('inner'):
+                raise KeyError('Years')
+    assert [r['name'] for r in profiler.spans] == ['inner', 'outer']
+    with profiler.span('after'):
+        pass
+    assert profiler.spans[-1]['depth'] == 0
+
+
+def test_threads_keep_separate_stacks():
+    profiler = Profiler()
+
+    def work():
+        with profiler.span('worker'):
+            pass
+
+    with profiler.span('main'):
+        worker = threading.Thread(target=work)
+        worker.start()
+        worker.join()
+    spans = {record['name']: record for record in profiler.spans}
+    assert (spans['worker']['depth'], spans['worker']['parent']) == (0, None)
+    assert spans['worker']['thread'] != spans['main']['thread']
+
+
+def test_chrome_trace_shape(tmp_path):
+    profiler = Profiler(track_memory=True)
+    nested_spans(profiler)
+    path = profiler.export(tmp_path / 'run.trace.json')
+    trace = json.loads(path.read_text())
+    assert trace['displayTimeUnit'] == 'ms'
+    events = trace['traceEvents']
+    assert sorted(e['name'] for e in events) == ['clean', 'load', 'read']
+    for event in events:
+        assert event['ph'] == 'X' and event['cat'] == 'analysis'
+        assert {'ts', 'dur', 'pid', 'tid', 'args'} <= set(event)
+        assert 'memory_delta_kb' in event['args']
+    load = next(e for e in events if e['name'] == 'load')
+    for child in (e for e in events if e['name'] != 'load'):
+        assert load['ts'] <= child['ts'] and child['ts'] + child['dur'] <= load['ts'] + load['dur']
+
+
+def test_json_export_is_in_start_order(tmp_path):
+    profiler = Profiler()
+    nested_spans(profiler)
+    spans = json.loads(profiler.export(tmp_path / 'run.json').read_text())['spans']
+    assert [s['name'] for s in spans] == ['load', 'read', 'clean']
+
+
+class Stage:
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.data_cleaned = [1, 2, 3]
+
+    @profiled('stage')
+    def run(self):
+        return 'done'
+
+
+def test_profiled_method_with_and_without_profiler():
+    assert Stage(None).run() == 'done'
+    profiler = Profiler()
+    assert Stage(profiler).run() == 'done'
+    assert profiler.spans[0]['name'] == 'stage'
+    assert profiler.spans[0]['attrs'] == {'rows': 3}
+    with null_span() as attrs:
+        attrs['rows'] = 1
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('matplotlib')
+
+from rendering import RENDER_MANIFEST, ChartTemplate, bar_chart_spec, bar_figure_spec, draw_chart, render_charts, \
+    trend_figure_spec
+
+YEARS = [2018, 2019, 2020, 2021]
+
+
+def trend_spec(values, band=False, segments=False):
+    trend = np.linspace(values[0], values[-1], len(values))
+    return trend_figure_spec(
+        YEARS, values, trend, f'Trend {values[0]}', figsize=(6, 4),
+        band=(trend - 3, trend + 3) if band else None,
+        segment_values=trend + 1 if segments else None,
+        segments=[0, 0, 1, 1] if segments else None)
+
+
+@pytest.mark.parametrize('first, second', [
+    (trend_spec([14, 18, 25, 17], band=True, segments=True), trend_spec([30, 35, 28, 40])),
+    (trend_spec([30, 35, 28, 40]), trend_spec([14, 18, 25, 17], band=True)),
+    (trend_spec([14, 18, 25, 17], segments=True), trend_spec([30, 35, 28, 40], band=True)),
+])
+def test_trend_template_update_matches_fresh_draw(first, second):
+    template = ChartTemplate(first)
+    template.update(second)
+    updated, fresh = template.axes[0], draw_chart(second).axes[0]
+    assert len(updated.lines) == len(fresh.lines)
+    assert len(updated.collections) == len(fresh.collections)
+    for a, b in zip(updated.lines, fresh.lines):
+        np.testing.assert_array_equal(a.get_xydata(), b.get_xydata())
+    assert ([t.get_text() for t in updated.get_legend().get_texts()]
+            == [t.get_text() for t in fresh.get_legend().get_texts()])
+    assert updated.get_title() == fresh.get_title()
+
+
+def bar_spec(values):
+    panel = bar_chart_spec(['BAL', 'BNP'], values, 'Killed by party', 'Party', 'Killed', ['red', 'blue'])
+    return bar_figure_spec([panel], figsize=(4, 3))
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_render_charts_skips_unchanged_specs(tmp_path, max_workers):
+    charts = {'trend.png': trend_spec([14, 18, 25, 17]), 'party.png': bar_spec([30, 12])}
+    rendered, skipped = render_charts(charts, tmp_path, dpi=30, max_workers=max_workers)
+    assert (sorted(rendered), skipped) == (['party.png', 'trend.png'], [])
+    assert all((tmp_path / name).stat().st_size for name in charts)
+    assert (tmp_path / RENDER_MANIFEST).exists()
+
+    charts['party.png'] = bar_spec([30, 13])
+    rendered, skipped = render_charts(charts, tmp_path, dpi=30, max_workers=max_workers)
+    assert (rendered, skipped) == (['party.png'], ['trend.png'])
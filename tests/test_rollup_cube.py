@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rollup_cube import RollupCube
+
+
+def workbook_frame(years=(2019, 2020, 2021)):
+    return pd.DataFrame({
+        'Years': list(years),
+        'Killed': [41, 51, 17][:len(years)],
+        'Rulling_Party': ['BAL'] * len(years),
+        'Rulling_Party_India': ['BJP'] * len(years),
+    })
+
+
+def test_repeated_append_does_not_double_count(tmp_path):
+    frame = workbook_frame()
+    path = RollupCube.from_frame(frame).save(tmp_path / 'cube.npz')
+    for _ in range(2):
+        RollupCube.load(path).append(frame).save(path)
+    cube = RollupCube.load(path)
+    assert cube.n_rows == 3
+    assert cube.query('Killed', by='Rulling_Party').to_dict() == {'BAL': 109.0}
+    assert cube.query('Killed', where={'Years': 2020}) == 51.0
+
+
+def test_append_folds_only_new_years():
+    cube = RollupCube.from_frame(workbook_frame((2019, 2020)))
+    cube.append(workbook_frame((2019, 2020, 2021)))
+    assert sorted(cube.folded) == [2019, 2020, 2021]
+    np.testing.assert_array_equal(cube.query('Killed', by='Years').to_numpy(), [41, 51, 17])
+
+
+def test_append_rejects_conflicting_year():
+    cube = RollupCube.from_frame(workbook_frame())
+    changed = workbook_frame().assign(Killed=[41, 52, 17])
+    with pytest.raises(ValueError, match='2020'):
+        cube.append(changed)
+    assert cube.query('Killed', where={'Years': 2020}) == 51.0
@@ -0,0 +1,73 @@
+import json
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from spatial_tiles import TILE_DIRNAME, build_tiles, tile_coords, update_tiles, write_tiles
+
+MIN_ZOOM, MAX_ZOOM, GRID = 5, 9, 4
+
+
+def incidents(n=60, seed=3):
+    rng = np.random.default_rng(seed)
+    records = [{'name': f'Victim {i}', 'date': f'{rng.integers(2001, 2024)}-0{rng.integers(1, 10)}-15',
+                'location': 'Border', 'lat': float(rng.uniform(21.0, 26.5)),
+                'lon': float(rng.uniform(88.0, 92.5))} for i in range(n)]
+    records.append({'name': 'Unknown place', 'date': '2010-01-01', 'location': None, 'lat': None, 'lon': None})
+    return records
+
+
+def slippy_tile(lat, lon, zoom):
+    n = 2 ** zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return x, y
+
+
+@pytest.mark.parametrize('lat, lon', [(23.81, 90.41), (26.32, 89.02), (-33.87, 151.21), (90.0, 0.0)])
+def test_tile_coords_match_the_slippy_map_formula(lat, lon):
+    for zoom in (0, 5, 12):
+        x, y = tile_coords(lat, lon, zoom)
+        expected = slippy_tile(min(lat, 85.0511), lon, zoom)
+        assert (int(x), int(y)) == (expected[0], min(expected[1], 2 ** zoom - 1))
+
+
+def test_every_zoom_accounts_for_each_located_incident_once():
+    records = incidents()
+    tiles = build_tiles(records, MIN_ZOOM, MAX_ZOOM, GRID)
+    for zoom in range(MIN_ZOOM, MAX_ZOOM + 1):
+        cells = Counter()
+        for record in records[:-1]:
+            x, y = tile_coords(record['lat'], record['lon'], zoom, GRID)
+            cells[int(x), int(y)] += 1
+        docs = [doc for (z, _, _), doc in tiles.items() if z == zoom]
+        counts = sorted([c['count'] for doc in docs for c in doc['clusters']]
+                        + [1] * sum(len(doc['points']) for doc in docs))
+        if zoom == MAX_ZOOM:
+            assert counts == [1] * (len(records) - 1)
+        else:
+            assert counts == sorted(cells.values())
+
+
+def test_tile_keys_hold_their_own_incidents():
+    tiles = build_tiles(incidents(), MIN_ZOOM, MAX_ZOOM, GRID)
+    for (z, x, y), doc in tiles.items():
+        for point in doc['points']:
+            assert tuple(map(int, tile_coords(point['lat'], point['lon'], z))) == (x, y)
+
+
+def tile_files(output_dir):
+    tile_dir = output_dir / TILE_DIRNAME
+    return {str(p.relative_to(tile_dir)): json.loads(p.read_text()) for p in tile_dir.rglob('*.json')}
+
+
+def test_update_matches_a_full_rewrite(tmp_path):
+    records = incidents()
+    write_tiles(records[:-6], tmp_path / 'updated', MIN_ZOOM, MAX_ZOOM, GRID)
+    update_tiles(iter(records), records[-6:], tmp_path / 'updated', MIN_ZOOM, MAX_ZOOM, GRID)
+    write_tiles(records, tmp_path / 'full', MIN_ZOOM, MAX_ZOOM, GRID)
+    updated, full = tile_files(tmp_path / 'updated'), tile_files(tmp_path / 'full')
+    assert full['index.json']['incidents'] == len(records) - 1
+    assert updated == full
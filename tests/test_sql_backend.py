@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_workbook_frame
+from party_periods import label_parties
+from sql_backend import IncidentDatabase, canned_report, sql_column_name
+
+
+@pytest.fixture
+def frame():
+    return make_workbook_frame(300, seed=8)
+
+
+@pytest.fixture
+def db(frame):
+    with IncidentDatabase.from_frame(frame) as db:
+        yield db
+
+
+def renamed(frame):
+    return frame.rename(columns=sql_column_name)
+
+
+def pandas_report(frame):
+    """The same queries as canned_report, answered by pandas"""
+    t = renamed(frame)
+    after_1999 = t['Year'] > 1999
+    return [
+        t.loc[t['Killed'] > t['Killed'].mean(), ['Killed', 'Year', 'Rulling_Party']].reset_index(drop=True),
+        t['Killed'].mean(),
+        t.groupby('Rulling_Party')['Killed'].mean(),
+        t.groupby('Rulling_Party_India')['Killed'].mean(),
+        t.loc[after_1999 & (t['Rulling_Party'] == 'BNP'), 'Rape'].mean(),
+        t.loc[after_1999 & (t['Rulling_Party'] == 'others'), 'Rape'].mean(),
+        t.loc[t['Year'].between(2002, 2012), 'Killed'].sum(),
+        t.loc[t['Year'].between(2002, 2012), 'Injured'].sum(),
+        t.loc[t['Year'] > 2010, 'Killed'].sum(),
+        t.loc[after_1999 & (t['Rulling_Party'] == 'BNP'), 'Missing'].mean(),
+    ]
+
+
+def test_sql_column_names():
+    assert sql_column_name('Push\xa0In\xa0') == 'Push_In'
+    assert sql_column_name('Years') == 'Year'
+    assert sql_column_name('Injured\xa0') == 'Injured'
+
+
+def test_canned_report_matches_pandas(db, frame):
+    report = canned_report(db)
+    expected = pandas_report(frame)
+    assert len(report) == len(expected)
+    for (description, result), reference in zip(report, expected):
+        if isinstance(reference, pd.DataFrame):
+            pd.testing.assert_frame_equal(result, reference, check_dtype=False, obj=description)
+        elif isinstance(reference, pd.Series):
+            np.testing.assert_allclose(result.iloc[:, 1], reference.to_numpy(), err_msg=description)
+            assert result.iloc[:, 0].tolist() == reference.index.tolist()
+        else:
+            np.testing.assert_allclose(result, reference, err_msg=description)
+
+
+def test_select_filters(db, frame):
+    t = renamed(frame)
+    rows = db.select(['Year', 'Killed'], order_by='Year', Year__gte=2000, Rulling_Party=['BAL', 'BNP'])
+    expected = t.loc[(t['Year'] >= 2000) & t['Rulling_Party'].isin(['BAL', 'BNP']), ['Year', 'Killed']]
+    assert sorted(map(tuple, rows.to_numpy())) == sorted(map(tuple, expected.to_numpy()))
+    assert db.aggregate('count', 'Rape', Rape=None) == 0
+    assert db.aggregate('count', 'Year', Rape=None) == t['Rape'].isna().sum()
+    with pytest.raises(ValueError):
+        db.select(['Unknown'])
+    with pytest.raises(ValueError):
+        db.select(Year__between=2000)
+
+
+def test_year_filters_use_the_index(db):
+    plan = ' '.join(db.query_plan('SELECT avg(Killed) FROM border_incidents WHERE Year > ?', (1999,)))
+    assert 'idx_year' in plan
+
+
+def test_assign_party_periods_matches_label_parties(db, frame):
+    db.assign_party_periods()
+    labelled = renamed(label_parties(frame, 'Years', as_category=False))
+    stored = db.select(['Rulling_Party', 'Rulling_Party_India'])
+    assert stored['Rulling_Party'].tolist() == labelled['Rulling_Party'].tolist()
+    assert stored['Rulling_Party_India'].tolist() == labelled['Rulling_Party_India'].tolist()
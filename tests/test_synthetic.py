@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import (COUNT_COLUMNS, FIRST_YEAR, LAST_YEAR, make_workbook_frame, write_incidents,
+                                  yearly_stats)
+from incident_loader import load_incident_frame
+
+WORKBOOK_COLUMNS = ['Years', *COUNT_COLUMNS, 'Total', 'Rulling_Party', 'Rulling_Party_India']
+
+
+def test_workbook_frame_is_seeded_and_shaped_like_the_workbook():
+    frame = make_workbook_frame(500, seed=4)
+    pd.testing.assert_frame_equal(frame, make_workbook_frame(500, seed=4))
+    assert not frame.equals(make_workbook_frame(500, seed=5))
+    assert frame.columns.tolist() == WORKBOOK_COLUMNS
+    assert frame['Years'].between(FIRST_YEAR, LAST_YEAR).all()
+    assert frame['Years'].is_monotonic_increasing
+    assert (frame['Total'] == frame[list(COUNT_COLUMNS)].sum(axis=1)).all()
+    # A ruling party holds for the whole year
+    assert (frame.groupby('Years')[['Rulling_Party', 'Rulling_Party_India']].nunique() == 1).all().all()
+
+
+def test_yearly_stats_match_the_killed_totals():
+    frame = make_workbook_frame(300)
+    stats = yearly_stats(frame)
+    assert sum(s['killed'] for s in stats) == frame['Killed'].sum()
+    assert [s['year'] for s in stats] == sorted(frame['Years'].unique())
+
+
+@pytest.mark.parametrize('n', [0, 7, 250])
+def test_incidents_stream_to_jsonl(tmp_path, n, monkeypatch):
+    monkeypatch.setattr('benchmarks.synthetic.JSONL_CHUNK_ROWS', 100)
+    path = write_incidents(n, tmp_path / 'incidents.jsonl', seed=1)
+    assert path.read_text() == write_incidents(n, tmp_path / 'again.jsonl', seed=1).read_text()
+    frame = load_incident_frame(path)
+    assert len(frame) == n
+    if n:
+        assert frame['name'].tolist()[-1] == f'Incident {n - 1}'
+        assert frame['lat'].notna().all()
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from trend_stats import (bootstrap_fits, confidence_band, linear_fit, permutation_test, rolling_slopes,
+                         segment_ids, segmented_fits, trend_statistics)
+
+YEARS = np.arange(1972, 2025, dtype=np.float64)
+
+
+def killings(seed=0):
+    rng = np.random.default_rng(seed)
+    return 80 - 0.9 * (YEARS - YEARS[0]) + rng.normal(0, 12, len(YEARS))
+
+
+def test_linear_fit_matches_polyfit_on_calendar_years():
+    y = killings()
+    np.testing.assert_allclose(linear_fit(YEARS, y), np.polyfit(YEARS, y, 1), rtol=1e-10)
+
+
+def test_linear_fit_drops_missing_pairs():
+    y = killings()
+    y[[3, 20]] = np.nan
+    keep = ~np.isnan(y)
+    np.testing.assert_allclose(linear_fit(YEARS, y), np.polyfit(YEARS[keep], y[keep], 1), rtol=1e-10)
+
+
+@pytest.mark.parametrize('window', [2, 5, 53])
+def test_rolling_slopes_match_polyfit_per_window(window):
+    y = killings()
+    slopes, intercepts = rolling_slopes(YEARS, y, window)
+    assert len(slopes) == len(YEARS) - window + 1
+    for i, (slope, intercept) in enumerate(zip(slopes, intercepts)):
+        expected = np.polyfit(YEARS[i:i + window], y[i:i + window], 1)
+        np.testing.assert_allclose((slope, intercept), expected, rtol=1e-8, atol=1e-8)
+    with pytest.raises(ValueError):
+        rolling_slopes(YEARS, y, 1)
+
+
+def test_segmented_fits_match_polyfit_per_term():
+    y = killings()
+    labels = np.repeat(['BAL', 'BNP', 'BAL', 'others', 'BAL'], [10, 15, 5, 1, 22])
+    segments = segment_ids(labels)
+    assert segments.max() == 4
+    slopes, intercepts = segmented_fits(YEARS, y, segments)
+    for s in range(segments.max() + 1):
+        mask = segments == s
+        if mask.sum() == 1:
+            assert np.isnan(slopes[s])
+        else:
+            np.testing.assert_allclose((slopes[s], intercepts[s]), np.polyfit(YEARS[mask], y[mask], 1),
+                                       rtol=1e-8)
+
+
+def test_bootstrap_fits_match_polyfit_on_the_same_resamples():
+    y = killings()
+    slopes, intercepts = bootstrap_fits(YEARS, y, n_resamples=25, seed=3, batch_size=10)
+    rng = np.random.default_rng(3)
+    index = np.concatenate([rng.integers(0, len(YEARS), size=(size, len(YEARS))) for size in (10, 10, 5)])
+    for row, slope, intercept in zip(index, slopes, intercepts):
+        np.testing.assert_allclose((slope, intercept), np.polyfit(YEARS[row], y[row], 1), rtol=1e-8)
+
+
+def test_band_contains_the_fit_and_the_trend_is_significant():
+    y = killings()
+    stats = trend_statistics(YEARS, y, n_resamples=500, seed=1)
+    lower, upper = stats['band']
+    assert np.all(lower <= stats['trend']) and np.all(stats['trend'] <= upper)
+    assert stats['slope_interval'][0] < stats['slope'] < stats['slope_interval'][1]
+    assert stats['p_value'] < 0.01
+    slopes, intercepts = bootstrap_fits(YEARS, y, 500, seed=1)
+    np.testing.assert_allclose(confidence_band(YEARS, slopes, intercepts, batch_size=7), stats['band'])
+
+
+def test_permutation_p_value_without_trend():
+    rng = np.random.default_rng(4)
+    p = permutation_test(YEARS, rng.normal(30, 5, len(YEARS)), n_permutations=999, seed=2)
+    assert 0.05 < p <= 1
+    assert np.isnan(permutation_test(np.ones(5), np.arange(5.0)))